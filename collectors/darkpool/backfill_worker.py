@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Dark pool backfill through the ``trading.backfill_jobs`` queue.
+
+Enqueue the windows the coverage index reports as missing, then start as many
+workers as the API budget allows, on one host or several:
+
+    python -m collectors.darkpool.backfill_worker enqueue --days 7 --symbols SPY QQQ TSLA
+    python -m collectors.darkpool.backfill_worker work --processes 3
+    python -m collectors.darkpool.backfill_worker report
+
+Workers claim one (symbol, window) job at a time with ``FOR UPDATE SKIP
+LOCKED`` and exit once the queue is drained. Re-running ``work`` after an
+interruption resumes from the table.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+
+import pytz
+
+from collectors.darkpool_collector import DarkPoolCollector
+from collectors.utils import backfill_jobs
+from collectors.utils.credit_ledger import LOW
+from collectors.utils.logging_config import log_collector_summary
+
+logger = logging.getLogger(__name__)
+
+COLLECTOR = 'darkpool'
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_missing(collector: DarkPoolCollector, symbols, start_time: datetime, end_time: datetime,
+                    window: timedelta = backfill_jobs.DEFAULT_WINDOW) -> int:
+    """Queue jobs for every window the coverage index reports as missing."""
+    raw_conn = collector.engine.raw_connection()
+    try:
+        backfill_jobs.ensure_table(raw_conn)
+        raw_conn.commit()
+        created = 0
+        for symbol in symbols:
+            windows = []
+            for missing_start, missing_end in collector._get_missing_windows(symbol, start_time, end_time):
+                windows.extend(backfill_jobs.split_windows(missing_start, missing_end, window))
+            created += backfill_jobs.enqueue(raw_conn, COLLECTOR, [symbol], windows)
+            logger.info(f"Queued {symbol}: {len(windows)} missing windows")
+        return created
+    finally:
+        raw_conn.close()
+
+
+def run_worker(collector: DarkPoolCollector, worker_id: str) -> dict:
+    """
+    Claim and run jobs until the queue is drained.
+
+    Returns:
+        Dict with jobs done/failed and rows fetched/inserted by this worker
+    """
+    totals = {'jobs_done': 0, 'jobs_failed': 0, 'rows_fetched': 0, 'rows_inserted': 0}
+    started = datetime.utcnow()
+    collector.credit_priority = LOW  # Refused before live collection as the daily cap nears
+    raw_conn = collector.engine.raw_connection()
+    try:
+        while True:
+            job = backfill_jobs.claim(raw_conn, COLLECTOR, worker_id)
+            if job is None:
+                break
+            logger.info(f"[{worker_id}] {job.symbol} {job.window_start} -> {job.window_end} (attempt {job.attempts})")
+            job_start = time.monotonic()
+            try:
+                stats = collector._collect_window(job.symbol, job.window_start, job.window_end)
+                if not stats['stalled']:
+                    collector._mark_window_covered(job.symbol, job.window_start, job.window_end)
+            except Exception as e:
+                logger.error(f"[{worker_id}] job {job.id} failed: {str(e)}")
+                backfill_jobs.fail(raw_conn, job.id, str(e))
+                totals['jobs_failed'] += 1
+                continue
+            backfill_jobs.complete(raw_conn, job.id, stats['fetched'], stats['inserted'], time.monotonic() - job_start)
+            totals['jobs_done'] += 1
+            totals['rows_fetched'] += stats['fetched']
+            totals['rows_inserted'] += stats['inserted']
+    finally:
+        raw_conn.close()
+
+    log_collector_summary(
+        collector_name=COLLECTOR,
+        start_time=started,
+        end_time=datetime.utcnow(),
+        items_collected=totals['rows_inserted'],
+        task_type='backfill_worker',
+        status='completed',
+        details={'worker_id': worker_id, **totals}
+    )
+    return totals
+
+
+def _worker_process(worker_id: str) -> dict:
+    # Each process needs its own engine and HTTP session
+    return run_worker(DarkPoolCollector(), worker_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Dark pool backfill job queue')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    enqueue_parser = subparsers.add_parser('enqueue', help='Queue missing windows')
+    enqueue_parser.add_argument('--days', type=int, default=7, help='Days to look back (default: 7)')
+    enqueue_parser.add_argument('--symbols', nargs='+', help='Symbols (default: collector symbols)')
+    enqueue_parser.add_argument('--window-minutes', type=int, default=60, help='Job window size (default: 60)')
+
+    work_parser = subparsers.add_parser('work', help='Run workers until the queue is drained')
+    work_parser.add_argument('--processes', type=int, default=1, help='Worker processes on this host (default: 1)')
+
+    subparsers.add_parser('report', help='Print queue progress and worker throughput')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.command == 'enqueue':
+        collector = DarkPoolCollector()
+        end_time = datetime.now(pytz.UTC)
+        start_time = end_time - timedelta(days=args.days)
+        created = enqueue_missing(collector, args.symbols or collector.symbols, start_time, end_time,
+                                  timedelta(minutes=args.window_minutes))
+        print(f"Queued {created} new jobs")
+    elif args.command == 'work':
+        worker_ids = [f"{default_worker_id()}-{i}" for i in range(args.processes)]
+        if args.processes == 1:
+            results = [_worker_process(worker_ids[0])]
+        else:
+            with multiprocessing.Pool(args.processes) as pool:
+                results = pool.map(_worker_process, worker_ids)
+        for worker_id, totals in zip(worker_ids, results):
+            print(f"{worker_id}: {totals}")
+    else:
+        collector = DarkPoolCollector()
+        raw_conn = collector.engine.raw_connection()
+        try:
+            print(json.dumps(backfill_jobs.report(raw_conn, COLLECTOR), indent=2, default=str))
+        finally:
+            raw_conn.close()
+
+
+if __name__ == '__main__':
+    main()
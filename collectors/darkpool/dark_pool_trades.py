@@ -9,11 +9,11 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
-from tenacity import retry, stop_after_attempt, wait_exponential
 from pathlib import Path
 
 from collectors.schema_validation import DarkPoolSchemaValidator
 from config.db_config import get_db_config
+from collectors.utils.http_client import UWClient
 
 # Configure logging
 logging.basicConfig(
@@ -48,7 +48,8 @@ def get_target_date(use_today: bool = False) -> datetime:
         return now
     return now - timedelta(days=1)
 
-@retry(stop=stop_after_attempt(MAX_RETRIES), wait=wait_exponential(multiplier=1, min=4, max=10))
+client = UWClient(headers=DEFAULT_HEADERS, base_url=DARKPOOL_ENDPOINT, max_retries=MAX_RETRIES, backoff=4)
+
 def fetch_trades_chunk(symbol: str, start_time: datetime, end_time: datetime) -> Optional[pd.DataFrame]:
     """Fetch trades for a specific time chunk with retry logic."""
     params = {
@@ -59,14 +60,7 @@ def fetch_trades_chunk(symbol: str, start_time: datetime, end_time: datetime) ->
     }
     
     try:
-        response = requests.get(
-            f"{DARKPOOL_ENDPOINT}/recent",
-            headers=DEFAULT_HEADERS,
-            params=params,
-            timeout=REQUEST_TIMEOUT
-        )
-        response.raise_for_status()
-        data = response.json()
+        data = client.get_json('/recent', params=params, timeout=REQUEST_TIMEOUT)
         
         if not data or "data" not in data or not data["data"]:
             return None
@@ -9,12 +9,18 @@ import psycopg2
 from psycopg2 import OperationalError
 from flow_analysis.scripts.darkpool_collector import DarkPoolCollector
 from flow_analysis.config.api_config import (
-    UW_BASE_URL, DARKPOOL_TICKER_ENDPOINT, DEFAULT_HEADERS, REQUEST_TIMEOUT
+    UW_BASE_URL, DARKPOOL_TICKER_ENDPOINT
 )
 import requests
 from typing import Dict, List, Optional
+from urllib.parse import urlencode
 import logging
 from psycopg2.extras import execute_values
+from collectors.utils.cache_store import NO_EXPIRY, cache_store
+from collectors.utils.credit_ledger import LOW
+from collectors.utils.rate_limiter import shared_limiter
+from collectors.utils.time_buckets import TimeBuckets
+from collectors.utils.window_planner import WindowPlanner
 
 # Add the project root to the Python path
 import sys
@@ -63,30 +69,38 @@ def test_db_connection():
         print(f"\nUnexpected error: {str(e)}")
         return False
 
+API_PAGE_LIMIT = 500  # Max trades per /darkpool/{ticker} response
+# Pages of closed windows, in the same cache as collectors.darkpool_collector
+WINDOW_CACHE_PATH = 'cache/darkpool.sqlite3'
+WINDOW_CACHE_MAX_BYTES = 256 * 1024 * 1024
+window_buckets = TimeBuckets(timedelta(days=1))
+window_cache = cache_store(WINDOW_CACHE_PATH, max_bytes=WINDOW_CACHE_MAX_BYTES)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class DarkPoolBackfillCollector(DarkPoolCollector):
+    def __init__(self, db_conn=None):
+        super().__init__(db_conn)
+        # Backfills share the process-wide UW budget with the live collectors,
+        # and stop short of the daily credit cap to leave room for them
+        limiter = shared_limiter('uw')
+        self.client.throttle = limiter.acquire
+        self.client.observe = limiter.observe
+        self.client.reserve = self.credits.reserver('darkpool_backfill', LOW)
+
     def _make_request(self, endpoint: str) -> Optional[Dict]:
-        """Make API request with improved error handling and logging."""
+        """Make API request through the shared client with improved error handling and logging."""
         try:
             logger.info(f"Making request to: {endpoint}")
-            response = requests.get(
-                endpoint,
-                headers=DEFAULT_HEADERS,
-                timeout=REQUEST_TIMEOUT
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                logger.info(f"Received response with {len(data.get('data', []))} trades")
-                return data
-            else:
-                logger.error(f"API request failed with status {response.status_code}")
-                logger.error(f"Response: {response.text}")
-                return None
-                
+            data = self.client.get_json(endpoint)
+            logger.info(f"Received response with {len(data.get('data', []))} trades")
+            return data
+        except requests.exceptions.HTTPError as e:
+            logger.error(f"API request failed with status {e.response.status_code}")
+            logger.error(f"Response: {e.response.text}")
+            return None
         except Exception as e:
             logger.error(f"Error making request: {str(e)}")
             return None
@@ -236,8 +250,42 @@ class DarkPoolBackfillCollector(DarkPoolCollector):
             self.logger.error(f"Error details: {str(e)}")
             raise
 
+def fetch_window(collector, symbol, window_start, window_end):
+    """
+    Fetch one capped page of trades for [window_start, window_end); the client retries transient errors.
+
+    Closed windows are served from the window cache once fetched, so a repeated
+    backfill over the same days costs no API credits.
+    """
+    cache_key = window_buckets.key('darkpool', window_start, window_end, {'symbol': symbol, 'limit': API_PAGE_LIMIT})
+    if cache_key is not None:
+        rows = window_cache.get(cache_key)
+        if rows is not None:
+            return rows
+    params = urlencode({
+        'newer_than': window_start.isoformat(),
+        'older_than': window_end.isoformat(),
+        'limit': API_PAGE_LIMIT
+    })
+    endpoint = f"{UW_BASE_URL}{DARKPOOL_TICKER_ENDPOINT.format(ticker=symbol)}?{params}"
+    response = collector._make_request(endpoint)
+    if response is None:
+        raise RuntimeError(f"API request failed for {symbol} at {window_start}")
+    rows = response.get('data') or []
+    if cache_key is not None:
+        try:
+            window_cache.set(cache_key, rows, ttl=NO_EXPIRY)
+        except Exception as e:
+            logger.warning(f"Window cache write error: {str(e)}")
+    return rows
+
 def backfill_symbol(collector, symbol, start_time, end_time):
-    """Backfill trades for a specific symbol."""
+    """
+    Backfill trades for a specific symbol.
+
+    Window sizes adapt to trade density: responses at the API limit are
+    bisected and refetched, sparse ones are merged with their neighbours.
+    """
     # Convert times to UTC for consistent comparison
     start_time = start_time.replace(tzinfo=pytz.UTC)
     end_time = end_time.replace(tzinfo=pytz.UTC)
@@ -249,84 +297,43 @@ def backfill_symbol(collector, symbol, start_time, end_time):
         logger.warning("Time window exceeds 24 hours, adjusting to last 24 hours")
         start_time = end_time - timedelta(hours=24)
     
-    current_time = start_time
     total_trades = 0
-    retry_count = 0
-    max_retries = 3
+    planner = WindowPlanner(
+        lambda window_start, window_end: fetch_window(collector, symbol, window_start, window_end),
+        limit=API_PAGE_LIMIT
+    )
     
-    while current_time < end_time:
-        try:
-            # Use the historical endpoint
-            endpoint = f"{UW_BASE_URL}{DARKPOOL_TICKER_ENDPOINT.format(ticker=symbol)}"
-            logger.info(f"Making request to: {endpoint}")
-            
-            response = collector._make_request(endpoint)
-            
-            if response is None:
-                logger.error(f"API request failed for {symbol} at {current_time}")
-                time.sleep(1)  # Rate limiting
-                continue
-                
-            if not response.get('data'):
-                logger.warning(f"No trades data received for {symbol} at {current_time}")
-                logger.debug(f"API Response: {response}")
-                time.sleep(1)  # Rate limiting
+    try:
+        for window in planner.walk(start_time, end_time):
+            if not window.rows:
+                logger.debug(f"No trades for {symbol} in window {window.start} -> {window.end}")
                 continue
             
             # Process trades
-            trades = collector._process_trades(response['data'])
+            trades = collector._process_trades(window.rows)
             
             # Handle timezone conversion for executed_at
             if 'executed_at' in trades.columns:
-                try:
-                    # First convert to datetime if not already
-                    trades['executed_at'] = pd.to_datetime(trades['executed_at'])
-                    
-                    # Check if timestamps are timezone-aware
-                    if trades['executed_at'].dt.tz is None:
-                        # If naive, localize to UTC
-                        trades['executed_at'] = trades['executed_at'].dt.tz_localize('UTC')
-                    else:
-                        # If already timezone-aware, convert to UTC
-                        trades['executed_at'] = trades['executed_at'].dt.tz_convert('UTC')
-                        
-                    logger.info(f"Successfully converted timestamps to UTC")
-                except Exception as e:
-                    logger.error(f"Error converting timestamps: {str(e)}")
-                    continue
+                trades['executed_at'] = pd.to_datetime(trades['executed_at'])
+                if trades['executed_at'].dt.tz is None:
+                    trades['executed_at'] = trades['executed_at'].dt.tz_localize('UTC')
+                else:
+                    trades['executed_at'] = trades['executed_at'].dt.tz_convert('UTC')
             
-            # Filter trades by time - only keep trades from last 24 hours
-            trades = trades[trades['executed_at'] >= start_time]
-            trades = trades[trades['executed_at'] < end_time]
+            # Filter trades to the window
+            trades = trades[trades['executed_at'] >= window.start]
+            trades = trades[trades['executed_at'] < window.end]
             
             if not trades.empty:
                 # Save to database
                 collector.save_trades_to_db(trades)
                 total_trades += len(trades)
-                logger.info(f"Saved {len(trades)} {symbol} trades for {current_time}")
-                retry_count = 0  # Reset retry count on success
-            else:
-                logger.warning(f"No trades found for {symbol} in time window {current_time}")
-                logger.debug(f"Raw API response data: {response['data'][:2] if response['data'] else 'No data'}")
-            
-            # Move to next time window
-            current_time += timedelta(minutes=5)
-            
-            # Rate limiting
-            time.sleep(1)
-            
-        except Exception as e:
-            logger.error(f"Error processing trades for {symbol}: {str(e)}")
-            logger.error(f"Error type: {type(e).__name__}")
-            retry_count += 1
-            if retry_count >= max_retries:
-                logger.warning(f"Max retries reached for {symbol} at {current_time}, moving to next time window")
-                current_time += timedelta(minutes=5)
-                retry_count = 0
-            time.sleep(1)
-            continue
+                logger.info(f"Saved {len(trades)} {symbol} trades for {window.start} -> {window.end}")
+    except Exception as e:
+        logger.error(f"Error processing trades for {symbol}: {str(e)}")
+        logger.error(f"Error type: {type(e).__name__}")
     
-    logger.info(f"Backfill complete for {symbol}. Total trades saved: {total_trades}")
+    logger.info(f"Backfill complete for {symbol}. Total trades saved: {total_trades} ({planner.stats()})")
     return total_trades
 
 def main():
@@ -5,15 +5,30 @@ import sys
 import time
 import logging
 import argparse
+import queue
+import threading
+from collections import Counter
+from operator import attrgetter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import pytz
-import requests
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from dotenv import load_dotenv
 from tqdm import tqdm
 from collectors.utils.logging_config import (
     log_heartbeat, log_collector_summary, log_error, log_warning, log_info
 )
+from collectors.utils.bulk_copy import copy_merge
+from collectors.utils.cache_store import NO_EXPIRY, cache_store
+from collectors.utils.credit_ledger import HIGH, LOW, CreditLedger, credit_ledger
+from collectors.utils.db_pool import engine_stats, get_engine
+from collectors.utils.http_client import UWClient, latency_stats
+from collectors.utils.rate_limiter import shared_limiter
+from collectors.utils.watermarks import WatermarkStore, watermark_store, batch_watermarks
+from collectors.utils.coverage import CoverageIndex, batch_coverage
+from collectors.utils.recent_ids import recent_ids
+from collectors.utils.records import DarkPoolTrade, decode, decode_records, loads
+from collectors.utils.time_buckets import TimeBuckets
 
 # Set up logging
 logging.basicConfig(
@@ -26,9 +41,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Column order used for both the COPY and the row-by-row write paths
+TRADE_COLUMNS = list(DarkPoolTrade.__slots__) + ['collection_time']
+TRADE_SYMBOL_INDEX = TRADE_COLUMNS.index('symbol')
+TRADE_EXECUTED_AT_INDEX = TRADE_COLUMNS.index('executed_at')
+TRACKING_ID = attrgetter('tracking_id')
+WINDOW_CACHE_PATH = 'cache/darkpool.sqlite3'  # Pages of closed (backfill) windows
+WINDOW_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
 class DarkPoolCollector:
-    def __init__(self, api_key=None, db_url=None):
-        """Initialize the collector with API key and database URL."""
+    def __init__(self, api_key=None, db_url=None, engine=None, session=None):
+        """
+        Initialize the collector with API key and database URL.
+
+        A long-running host (see ``collectors.supervisor``) can pass a shared
+        SQLAlchemy ``engine`` and ``requests.Session``; by default the
+        collector uses the process-wide DB pool and keep-alive HTTP session.
+        """
         # Debug: Print environment variables
         env_file = os.getenv('ENV_FILE', '.env')
         logger.info(f"Loading environment from: {env_file}")
@@ -68,161 +97,470 @@ class DarkPoolCollector:
         self.db_url = db_url or f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}?sslmode={db_sslmode}"
         logger.info(f"Using database: {db_host}:{db_port}/{db_name}")
             
-        self.engine = create_engine(self.db_url)
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Authorization': f'Bearer {self.api_key}',
-            'Accept': 'application/json'
-        })
+        self.engine = engine or get_engine(self.db_url)
         
         # Production settings
         self.symbols = ['SPY', 'QQQ', 'TSLA']  # Core symbols to track
         self.lookback_minutes = 10  # Look back 10 minutes to ensure no missed trades
         self.max_retries = 3
         self.retry_delay = 5  # seconds
-        
-    def _get_existing_data_ranges(self, symbol):
-        """Get time ranges where data already exists for a symbol."""
-        query = """
-        SELECT 
-            date_trunc('hour', executed_at) as hour_start,
-            date_trunc('hour', executed_at) + interval '1 hour' as hour_end
-        FROM trading.darkpool_trades 
-        WHERE symbol = :symbol
-        GROUP BY date_trunc('hour', executed_at)
-        ORDER BY hour_start
-        """
-        with self.engine.connect() as conn:
-            result = conn.execute(text(query), {"symbol": symbol})
-            return [(row[0].replace(tzinfo=pytz.UTC), row[1].replace(tzinfo=pytz.UTC)) 
-                   for row in result]
-    
-    def _is_time_range_covered(self, start_time, end_time, existing_ranges):
-        """Check if a time range is already covered by existing data."""
-        current = start_time
-        while current < end_time:
-            hour_end = current + timedelta(hours=1)
-            if not any(r[0] <= current < r[1] for r in existing_ranges):
-                return False
-            current = hour_end
-        return True
+        self.bulk_write = True  # COPY batches through a staging table instead of per-row INSERTs
+        self.page_limit = 500  # Max trades per API page
+        self.pipeline_depth = 4  # Pages buffered between the fetcher and the DB writer
+        self.concurrent = True  # Collect symbols in parallel, sharing one API rate budget
+        self.max_workers = len(self.symbols)
+        self.rate_limiter = shared_limiter('uw')
+        self.credits = credit_ledger()  # Daily API credits, shared with the other collectors
+        self.credit_priority = HIGH  # LOW while backfilling
+        self.client = UWClient(
+            headers={'Authorization': f'Bearer {self.api_key}', 'Accept': 'application/json'},
+            session=session,
+            throttle=self.rate_limiter.acquire,
+            observe=self.rate_limiter.observe,
+            reserve=self.credits.reserver('darkpool', lambda endpoint: self.credit_priority),
+            max_retries=self.max_retries,
+            backoff=self.retry_delay
+        )
+        self.watermarks = watermark_store('darkpool')
+        self.coverage = CoverageIndex('darkpool')
+        self.recent_ids = recent_ids('darkpool')  # tracking_ids written recently, dropped before SQL
+        # Pages of closed windows never change, so backfills over the same days reuse them;
+        # live windows end now and are always fetched
+        self.window_buckets = TimeBuckets(timedelta(days=1))
+        self.window_cache = cache_store(WINDOW_CACHE_PATH, max_bytes=WINDOW_CACHE_MAX_BYTES)
+        self.last_symbol_stats = {}
+        self._ensure_tracking_tables()
+        self._warm_recent_ids()
+
+    def _ensure_tracking_tables(self):
+        """Create the collector watermark, coverage and credit ledger tables if they don't exist."""
+        raw_conn = self.engine.raw_connection()
+        try:
+            WatermarkStore.ensure_table(raw_conn)
+            CoverageIndex.ensure_table(raw_conn)
+            CreditLedger.ensure_table(raw_conn)
+            raw_conn.commit()
+        finally:
+            raw_conn.close()
+
+    def _warm_recent_ids(self):
+        """Load the last horizon of tracking_ids so overlapping first polls are filtered too."""
+        if self.recent_ids.warmed:
+            return
+        since = datetime.now(pytz.UTC) - timedelta(seconds=self.recent_ids.horizon)
+        raw_conn = self.engine.raw_connection()
+        try:
+            self.recent_ids.warm(raw_conn, 'trading.darkpool_trades', since)
+        except Exception as e:
+            # Only an optimization: ON CONFLICT still drops anything the filter misses
+            logger.warning(f"Could not warm recent tracking_id filter: {str(e)}")
+        finally:
+            raw_conn.rollback()
+            raw_conn.close()
+
+    def _get_missing_windows(self, symbol, start_time, end_time):
+        """Get the parts of a window not yet covered for a symbol, from the coverage index."""
+        raw_conn = self.engine.raw_connection()
+        try:
+            return self.coverage.missing(raw_conn, symbol, start_time, end_time)
+        finally:
+            raw_conn.close()
+
+    def _mark_window_covered(self, symbol, start_time, end_time):
+        """Record a fully fetched window in the coverage index, including slots with no trades."""
+        raw_conn = self.engine.raw_connection()
+        try:
+            self.coverage.mark_window(raw_conn, symbol, start_time, end_time)
+            raw_conn.commit()
+        finally:
+            raw_conn.close()
     
     def _fetch_trades(self, symbol, start_time, end_time):
-        """Fetch trades for a symbol within a time range with retries."""
+        """
+        Fetch one page of trades for a symbol within a time range, as DarkPoolTrade records.
+
+        Pages of closed windows are served from ``window_cache`` once fetched.
+        """
         params = {
             'newer_than': start_time.isoformat(),
             'older_than': end_time.isoformat(),
-            'limit': 500
+            'limit': self.page_limit
         }
-        
-        for attempt in range(self.max_retries):
-            try:
-                response = self.session.get(
-                    f'https://api.unusualwhales.com/api/darkpool/{symbol}',
-                    params=params
-                )
-                response.raise_for_status()
-                return response.json().get('data', [])
-            except requests.exceptions.RequestException as e:
-                if attempt == self.max_retries - 1:
-                    raise
-                logger.warning(f"Attempt {attempt + 1} failed for {symbol}: {str(e)}")
-                time.sleep(self.retry_delay)
-    
-    def _save_trades(self, trades):
-        """Save trades to database."""
+        cache_key = None
+        if self.window_cache is not None:
+            cache_key = self.window_buckets.key(
+                'darkpool', start_time, end_time, {'symbol': symbol, 'limit': self.page_limit}
+            )
+        if cache_key is not None:
+            rows = self.window_cache.get(cache_key)
+            if rows is not None:
+                return decode_records(rows, DarkPoolTrade)
+
+        response = self.client.get(f'/darkpool/{symbol}', params=params, endpoint='/darkpool/{ticker}')
+        if cache_key is None:
+            return decode(response.content, DarkPoolTrade)
+
+        data = loads(response.content)
+        rows = (data.get('data') or []) if isinstance(data, dict) else data
+        try:
+            self.window_cache.set(cache_key, rows, ttl=NO_EXPIRY)
+        except Exception as e:
+            logger.warning(f"Window cache write error: {str(e)}")
+        return decode_records(rows, DarkPoolTrade)
+
+    def _iter_trade_pages(self, symbol, start_time, end_time, stats=None):
+        """
+        Yield pages of trades for a window, walking ``older_than`` backwards.
+
+        The API returns the newest trades first, so after each full page the
+        upper bound is moved to the oldest ``executed_at`` seen. Trades sharing
+        that timestamp may be returned twice; ``ON CONFLICT (tracking_id)`` drops
+        them on write.
+
+        Args:
+            stats: If given, ``stats['stalled']`` is set to 1 when a full page
+                doesn't move the cursor and the window is left part-fetched
+        """
+        older_than = end_time
+        while older_than > start_time:
+            page = self._fetch_trades(symbol, start_time, older_than)
+            if not page:
+                return
+            yield page
+            if getattr(page, 'received', len(page)) < self.page_limit:
+                return
+            oldest = min(trade.executed_at for trade in page)
+            if oldest >= older_than:
+                logger.warning(f"Pagination for {symbol} stalled at {oldest}, stopping window early")
+                if stats is not None:
+                    stats['stalled'] = 1
+                return
+            older_than = oldest
+
+    def _collect_window(self, symbol, start_time, end_time):
+        """
+        Fetch every page for a window and write them on a background thread.
+
+        Pages are handed to a bounded queue drained by a writer thread, so page
+        N+1 downloads while page N is being inserted. Pages come newest-first,
+        so the watermarks only advance once every page is written: a failure
+        part-way leaves the older trades to be fetched again.
+
+        Returns:
+            Dict with page, fetched, inserted and duplicate counts, fetch and
+            write timings in seconds, and ``stalled`` (1 if the window was only
+            partly fetched)
+        """
+        stats = {
+            'pages': 0, 'fetched': 0, 'inserted': 0, 'duplicates': 0, 'stalled': 0,
+            'fetch_seconds': 0.0, 'write_seconds': 0.0
+        }
+        pages = queue.Queue(maxsize=self.pipeline_depth)
+        errors = []
+        marks = {}
+
+        def writer():
+            while True:
+                page = pages.get()
+                if page is None:
+                    return
+                if errors:
+                    continue  # Drain remaining pages after a failure
+                try:
+                    write_start = time.monotonic()
+                    inserted, duplicates = self._save_trades(page, marks)
+                    stats['write_seconds'] += time.monotonic() - write_start
+                    stats['inserted'] += inserted
+                    stats['duplicates'] += duplicates
+                except Exception as e:
+                    errors.append(e)
+
+        writer_thread = threading.Thread(target=writer, name=f'darkpool-writer-{symbol}', daemon=True)
+        writer_thread.start()
+        try:
+            fetch_start = time.monotonic()
+            for page in self._iter_trade_pages(symbol, start_time, end_time, stats):
+                stats['fetch_seconds'] += time.monotonic() - fetch_start
+                stats['pages'] += 1
+                stats['fetched'] += len(page)
+                if errors:
+                    break
+                pages.put(page)
+                fetch_start = time.monotonic()
+        finally:
+            pages.put(None)
+            writer_thread.join()
+
+        if errors:
+            raise errors[0]
+        self._advance_watermarks(marks)
+        return stats
+
+    def _save_trades(self, trades, marks=None):
+        """
+        Save DarkPoolTrade records to database.
+
+        Trades the recent-id filter has already seen are dropped first; a
+        page of nothing but overlap sends no SQL at all.
+
+        Args:
+            trades: DarkPoolTrade records
+            marks: Dict the newest executed_at per symbol is merged into, for the
+                caller to advance with ``_advance_watermarks``; if None the
+                watermarks advance with the write
+
+        Returns:
+            Tuple of (rows inserted, rows skipped as duplicates)
+        """
         if not trades:
-            return
-            
-        query = """
+            return 0, 0
+
+        fresh = self.recent_ids.unseen(trades, key=TRACKING_ID)
+        if not fresh:
+            return 0, len(trades)
+
+        collection_time = datetime.now(pytz.UTC)
+        rows = [trade.as_row(collection_time) for trade in fresh]
+        advance = batch_watermarks(rows, TRADE_SYMBOL_INDEX, TRADE_EXECUTED_AT_INDEX)
+        if marks is not None:
+            for symbol, executed_at in advance.items():
+                if symbol not in marks or executed_at > marks[symbol]:
+                    marks[symbol] = executed_at
+            advance = {}
+
+        if self.bulk_write:
+            inserted, duplicates = self._copy_trades(rows, advance)
+        else:
+            inserted, duplicates = self._insert_trades(rows, advance)
+        self.recent_ids.add_many(trade.tracking_id for trade in fresh)
+        return inserted, duplicates + len(trades) - len(fresh)
+
+    def _copy_trades(self, rows, marks):
+        """Bulk-write trade rows with COPY into a staging table and a single merge, advancing ``marks``."""
+        raw_conn = self.engine.raw_connection()
+        try:
+            inserted, duplicates = copy_merge(
+                raw_conn, 'trading.darkpool_trades', TRADE_COLUMNS, rows, ['tracking_id']
+            )
+            self.watermarks.advance_many(raw_conn, marks)
+            self.coverage.mark(raw_conn, batch_coverage(rows, TRADE_SYMBOL_INDEX, TRADE_EXECUTED_AT_INDEX))
+            raw_conn.commit()
+            self.watermarks.remember_many(marks)
+            return inserted, duplicates
+        except Exception:
+            raw_conn.rollback()
+            raise
+        finally:
+            raw_conn.close()
+
+    def _insert_trades(self, rows, marks):
+        """Write trade rows one INSERT at a time, advancing ``marks``."""
+        query = f"""
         INSERT INTO trading.darkpool_trades (
-            tracking_id, symbol, price, size, volume, premium,
-            executed_at, nbbo_ask, nbbo_bid, nbbo_ask_quantity,
-            nbbo_bid_quantity, market_center, sale_cond_codes,
-            ext_hour_sold_codes, trade_code, trade_settlement,
-            canceled, collection_time
+            {', '.join(TRADE_COLUMNS)}
         ) VALUES (
-            :tracking_id, :symbol, :price, :size, :volume, :premium,
-            :executed_at, :nbbo_ask, :nbbo_bid, :nbbo_ask_quantity,
-            :nbbo_bid_quantity, :market_center, :sale_cond_codes,
-            :ext_hour_sold_codes, :trade_code, :trade_settlement,
-            :canceled, :collection_time
+            {', '.join(':' + column for column in TRADE_COLUMNS)}
         ) ON CONFLICT (tracking_id) DO NOTHING
         """
-        
+
+        inserted = 0
         with self.engine.connect() as conn:
-            for trade in trades:
+            for row in rows:
                 try:
-                    conn.execute(text(query), {
-                        'tracking_id': trade['tracking_id'],
-                        'symbol': trade['ticker'],
-                        'price': float(trade['price']),
-                        'size': int(trade['size']),
-                        'volume': int(trade['volume']),
-                        'premium': float(trade['premium']),
-                        'executed_at': datetime.fromisoformat(trade['executed_at'].replace('Z', '+00:00')),
-                        'nbbo_ask': float(trade['nbbo_ask']) if trade['nbbo_ask'] else None,
-                        'nbbo_bid': float(trade['nbbo_bid']) if trade['nbbo_bid'] else None,
-                        'nbbo_ask_quantity': int(trade['nbbo_ask_quantity']) if trade['nbbo_ask_quantity'] else None,
-                        'nbbo_bid_quantity': int(trade['nbbo_bid_quantity']) if trade['nbbo_bid_quantity'] else None,
-                        'market_center': trade['market_center'],
-                        'sale_cond_codes': trade['sale_cond_codes'],
-                        'ext_hour_sold_codes': trade['ext_hour_sold_codes'],
-                        'trade_code': trade['trade_code'],
-                        'trade_settlement': trade['trade_settlement'],
-                        'canceled': trade['canceled'],
-                        'collection_time': datetime.now(pytz.UTC)
-                    })
+                    result = conn.execute(text(query), dict(zip(TRADE_COLUMNS, row)))
+                    inserted += max(result.rowcount, 0)
                 except Exception as e:
-                    logger.error(f"Error saving trade {trade['tracking_id']}: {str(e)}")
+                    logger.error(f"Error saving trade {row[0]}: {str(e)}")
+            self.watermarks.advance_many(conn.connection, marks)
+            self.coverage.mark(conn.connection, batch_coverage(rows, TRADE_SYMBOL_INDEX, TRADE_EXECUTED_AT_INDEX))
             conn.commit()
-    
+        self.watermarks.remember_many(marks)
+        return inserted, len(rows) - inserted
+
+    def _advance_watermarks(self, marks):
+        """Advance and commit the watermarks collected by ``_save_trades``."""
+        if not marks:
+            return
+        raw_conn = self.engine.raw_connection()
+        try:
+            self.watermarks.advance_many(raw_conn, marks)
+            raw_conn.commit()
+            self.watermarks.remember_many(marks)
+        except Exception:
+            raw_conn.rollback()
+            raise
+        finally:
+            raw_conn.close()
+
+    def _write_stats(self, totals):
+        """Summarize ingest throughput for the collector summary log."""
+        rows = totals['inserted'] + totals['duplicates']
+        return {
+            'pages_fetched': totals['pages'],
+            'rows_fetched': totals['fetched'],
+            'rows_inserted': totals['inserted'],
+            'rows_duplicate': totals['duplicates'],
+            'windows_stalled': totals['stalled'],
+            'fetch_seconds': round(totals['fetch_seconds'], 3),
+            'write_seconds': round(totals['write_seconds'], 3),
+            'rows_per_second': round(rows / totals['write_seconds'], 1) if totals['write_seconds'] else None,
+            'bulk_write': self.bulk_write,
+            'recent_ids': self.recent_ids.stats(),
+            'window_cache': self.window_cache.stats() if self.window_cache is not None else None,
+            'credits': self.credits.stats(),
+            'rate_limit': self.rate_limiter.stats(),
+            'db_pool': engine_stats(self.engine),
+            'api_latency': latency_stats().get('/darkpool/{ticker}', {})
+        }
+
     def _get_latest_executed_at(self, symbol):
-        """Get the latest executed_at timestamp for a symbol from the database."""
-        query = """
-        SELECT MAX(executed_at) FROM trading.darkpool_trades WHERE symbol = :symbol
         """
-        with self.engine.connect() as conn:
-            result = conn.execute(text(query), {"symbol": symbol}).scalar()
-            return result
+        Get the latest executed_at timestamp for a symbol.
 
-    def collect_trades(self):
-        """Collect recent dark pool trades, always fetching from the latest executed_at in the DB up to now."""
+        Resolved from the collector watermark; the MAX(executed_at) scan only
+        runs once per symbol to seed a missing watermark.
+        """
+        cached = self.watermarks.cached(symbol)
+        if cached is not None:
+            return cached
+
+        raw_conn = self.engine.raw_connection()
+        try:
+            def latest_from_trades():
+                with raw_conn.cursor() as cur:
+                    cur.execute(
+                        "SELECT MAX(executed_at) FROM trading.darkpool_trades WHERE symbol = %s",
+                        (symbol,)
+                    )
+                    return cur.fetchone()[0]
+
+            return self.watermarks.get(raw_conn, symbol, fallback=latest_from_trades)
+        finally:
+            raw_conn.close()
+
+    def _run_per_symbol(self, task, symbols=None):
+        """
+        Run ``task(symbol)`` for every symbol (or just ``symbols``) and time each one.
+
+        Symbols run on a thread pool when ``self.concurrent`` is set; all of
+        them draw API requests from the same shared rate limiter.
+
+        Returns:
+            Dict of symbol -> stats returned by the task, with a ``seconds`` entry added
+        """
+        def timed(symbol):
+            symbol_start = time.monotonic()
+            stats = task(symbol)
+            if stats is not None:
+                stats['seconds'] = time.monotonic() - symbol_start
+            return symbol, stats
+
+        symbols = self.symbols if symbols is None else symbols
+        if self.concurrent and len(symbols) > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='darkpool') as executor:
+                results = list(executor.map(timed, symbols))
+        else:
+            results = [timed(symbol) for symbol in symbols]
+        return {symbol: stats for symbol, stats in results if stats is not None}
+
+    def _summarize(self, per_symbol):
+        """Combine per-symbol stats into totals plus the summary log details."""
+        totals = Counter()
+        for stats in per_symbol.values():
+            totals.update({k: v for k, v in stats.items() if k != 'seconds'})
+        details = self._write_stats(totals)
+        details['concurrent'] = self.concurrent
+        details['symbols'] = {
+            symbol: {
+                'seconds': round(stats['seconds'], 3),
+                'fetch_seconds': round(stats['fetch_seconds'], 3),
+                'write_seconds': round(stats['write_seconds'], 3),
+                'pages': stats['pages'],
+                'inserted': stats['inserted'],
+                'duplicates': stats['duplicates']
+            }
+            for symbol, stats in per_symbol.items()
+        }
+        return totals, details
+
+    def _collect_symbol(self, symbol, end_time):
+        """Collect new trades for one symbol, from its latest executed_at up to end_time."""
+        try:
+            latest_executed_at = self._get_latest_executed_at(symbol)
+            if latest_executed_at is not None:
+                # Add 1 second to avoid overlap
+                start_time = latest_executed_at + timedelta(seconds=1)
+            else:
+                # If no data, fetch for the last N minutes
+                start_time = end_time - timedelta(minutes=self.lookback_minutes)
+            logger.info(f"Collecting trades for {symbol} from {start_time} to {end_time}")
+            stats = self._collect_window(symbol, start_time, end_time)
+            if not stats['stalled']:
+                self._mark_window_covered(symbol, start_time, end_time)
+            if stats['fetched']:
+                logger.info(f"Saved {stats['inserted']} new trades for {symbol} "
+                            f"({stats['duplicates']} duplicates skipped, {stats['pages']} pages)")
+            else:
+                logger.info(f"No new trades found for {symbol}")
+            return stats
+        except Exception as e:
+            logger.error(f"Error collecting trades for {symbol}: {str(e)}")
+            log_error('darkpool', e, task_type='collect_trades', details={'symbol': symbol})
+            return None
+
+    def _backfill_symbol(self, symbol, start_time, end_time):
+        """Backfill the parts of a window the coverage index reports as missing for one symbol."""
+        try:
+            missing = self._get_missing_windows(symbol, start_time, end_time)
+            if not missing:
+                logger.info(f"Skipping {symbol} - data already exists for this period")
+                return None
+            logger.info(f"Backfilling {len(missing)} missing windows for {symbol}")
+            # Fetch and save trades
+            stats = Counter()
+            for window_start, window_end in missing:
+                window_stats = self._collect_window(symbol, window_start, window_end)
+                stats.update(window_stats)
+                if not window_stats['stalled']:
+                    self._mark_window_covered(symbol, window_start, window_end)
+            if stats['fetched']:
+                logger.info(f"Saved {stats['inserted']} new trades for {symbol} "
+                            f"({stats['duplicates']} duplicates skipped, {stats['pages']} pages)")
+            return stats
+        except Exception as e:
+            logger.error(f"Error backfilling trades for {symbol}: {str(e)}")
+            log_error('darkpool', e, task_type='backfill_trades', details={'symbol': symbol})
+            return None
+
+    def collect_trades(self, symbols=None):
+        """
+        Collect recent dark pool trades, always fetching from the latest executed_at in the DB up to now.
+
+        Args:
+            symbols: Subset of ``self.symbols`` to poll (e.g. those an adaptive
+                scheduler found due); all symbols if None
+
+        Per-symbol stats of the run are kept in ``self.last_symbol_stats``.
+        """
         end_time = datetime.now(pytz.UTC)
         log_heartbeat('darkpool', status='running')
         logger.info(f"Collecting trades up to {end_time}")
-        total_trades = 0
+        self.credit_priority = HIGH
         start = datetime.utcnow()
-        for symbol in self.symbols:
-            try:
-                latest_executed_at = self._get_latest_executed_at(symbol)
-                if latest_executed_at is not None:
-                    # Add 1 second to avoid overlap
-                    start_time = latest_executed_at + timedelta(seconds=1)
-                else:
-                    # If no data, fetch for the last N minutes
-                    start_time = end_time - timedelta(minutes=self.lookback_minutes)
-                logger.info(f"Collecting trades for {symbol} from {start_time} to {end_time}")
-                trades = self._fetch_trades(symbol, start_time, end_time)
-                if trades:
-                    self._save_trades(trades)
-                    total_trades += len(trades)
-                    logger.info(f"Saved {len(trades)} trades for {symbol}")
-                else:
-                    logger.info(f"No new trades found for {symbol}")
-            except Exception as e:
-                logger.error(f"Error collecting trades for {symbol}: {str(e)}")
-                log_error('darkpool', e, task_type='collect_trades', details={'symbol': symbol})
+        per_symbol = self._run_per_symbol(lambda symbol: self._collect_symbol(symbol, end_time), symbols)
+        self.last_symbol_stats = per_symbol
+        totals, details = self._summarize(per_symbol)
         end = datetime.utcnow()
         log_collector_summary(
             collector_name='darkpool',
             start_time=start,
             end_time=end,
-            items_collected=total_trades,
+            items_collected=totals['inserted'],
             task_type='collect_trades',
-            status='collected'
+            status='collected',
+            details=details
         )
-        return total_trades
+        return totals['inserted']
     
     def backfill_trades(self, hours: int = 24):
         """Backfill dark pool trades for the past N hours."""
@@ -230,33 +568,21 @@ class DarkPoolCollector:
         start_time = end_time - timedelta(hours=hours)
         log_heartbeat('darkpool', status='backfill')
         logger.info(f"Backfilling trades from {start_time} to {end_time}")
-        total_trades = 0
+        self.credit_priority = LOW
         start = datetime.utcnow()
-        for symbol in self.symbols:
-            try:
-                existing_ranges = self._get_existing_data_ranges(symbol)
-                if self._is_time_range_covered(start_time, end_time, existing_ranges):
-                    logger.info(f"Skipping {symbol} - data already exists for this period")
-                    continue
-                # Fetch and save trades
-                trades = self._fetch_trades(symbol, start_time, end_time)
-                if trades:
-                    self._save_trades(trades)
-                    total_trades += len(trades)
-                    logger.info(f"Saved {len(trades)} trades for {symbol}")
-            except Exception as e:
-                logger.error(f"Error backfilling trades for {symbol}: {str(e)}")
-                log_error('darkpool', e, task_type='backfill_trades', details={'symbol': symbol})
+        per_symbol = self._run_per_symbol(lambda symbol: self._backfill_symbol(symbol, start_time, end_time))
+        totals, details = self._summarize(per_symbol)
         end = datetime.utcnow()
         log_collector_summary(
             collector_name='darkpool',
             start_time=start,
             end_time=end,
-            items_collected=total_trades,
+            items_collected=totals['inserted'],
             task_type='backfill_trades',
-            status='completed'
+            status='completed',
+            details=details
         )
-        return total_trades
+        return totals['inserted']
 
 def main():
     parser = argparse.ArgumentParser(description='Dark Pool Trade Collector')
@@ -264,9 +590,13 @@ def main():
     parser.add_argument('--db-url', help='Database URL')
     parser.add_argument('--backfill', action='store_true', help='Run in backfill mode')
     parser.add_argument('--hours', type=int, default=24, help='Number of hours to look back (default: 24)')
+    parser.add_argument('--row-inserts', action='store_true', help='Write trades one INSERT at a time instead of COPY')
+    parser.add_argument('--sequential', action='store_true', help='Collect symbols one after another')
     args = parser.parse_args()
     
     collector = DarkPoolCollector(args.api_key, args.db_url)
+    collector.bulk_write = not args.row_inserts
+    collector.concurrent = not args.sequential
     if args.backfill:
         collector.backfill_trades(hours=args.hours)
     else:
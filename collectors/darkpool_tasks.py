@@ -2,15 +2,12 @@ import logging
 from collectors.darkpool_collector import DarkPoolCollector
 from datetime import datetime, timedelta
 import pytz
-import time
-from flow_analysis.config.api_config import (
-    UW_BASE_URL, DARKPOOL_RECENT_ENDPOINT,
-    DEFAULT_HEADERS, REQUEST_TIMEOUT, REQUEST_RATE_LIMIT
-)
 from flow_analysis.config.watchlist import SYMBOLS
 from collectors.utils.market_utils import is_market_open, get_next_market_open
-import psycopg2
-import os
+from collectors.utils.credit_ledger import LOW
+from collectors.utils.window_planner import WindowPlanner
+from collectors.utils.db_pool import pg_connection
+from flow_analysis.config.env_config import DB_CONFIG
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -18,22 +15,13 @@ logger = logging.getLogger(__name__)
 
 def log_to_db(collector_name, level, message):
     try:
-        conn = psycopg2.connect(
-            dbname=os.getenv('DB_NAME'),
-            user=os.getenv('DB_USER'),
-            password=os.getenv('DB_PASSWORD'),
-            host=os.getenv('DB_HOST'),
-            port=os.getenv('DB_PORT'),
-            sslmode=os.getenv('DB_SSLMODE', 'prefer')
-        )
-        cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO trading.collector_logs (timestamp, collector_name, level, message) VALUES (%s, %s, %s, %s)",
-            (datetime.utcnow(), collector_name, level, message)
-        )
-        conn.commit()
-        cur.close()
-        conn.close()
+        # Same pool as collectors.utils.logging_config.log_to_db
+        with pg_connection(DB_CONFIG) as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "INSERT INTO trading.collector_logs (timestamp, collector_name, level, message) VALUES (%s, %s, %s, %s)",
+                    (datetime.utcnow(), collector_name, level, message)
+                )
     except Exception as e:
         print(f"Failed to log to DB: {e}")
 
@@ -59,11 +47,16 @@ def run_darkpool_collector(hours: int = 24):
         return {"status": "error", "error": str(e)}
 
 def backfill_qqq_trades(start_time: datetime = None, end_time: datetime = None):
-    """Backfill QQQ trades for a specific time period."""
+    """
+    Backfill QQQ trades for a specific time period.
+
+    Windows are sized by ``WindowPlanner``: saturated responses are bisected
+    and sparse ones merged with their neighbours.
+    """
     try:
         logger.info("Starting QQQ trades backfill...")
         collector = DarkPoolCollector()
-        collector.connect_db()
+        collector.credit_priority = LOW
         
         # If no times provided, default to last 24 hours
         if not start_time:
@@ -73,46 +66,24 @@ def backfill_qqq_trades(start_time: datetime = None, end_time: datetime = None):
         
         logger.info(f"Starting QQQ backfill from {start_time} to {end_time}")
         
-        current_time = start_time
+        planner = WindowPlanner(
+            lambda window_start, window_end: collector._fetch_trades('QQQ', window_start, window_end),
+            limit=collector.page_limit
+        )
         total_trades = 0
         
-        while current_time < end_time:
+        for window in planner.walk(start_time, end_time):
             try:
-                # Make API request
-                endpoint = f"{UW_BASE_URL}{DARKPOOL_RECENT_ENDPOINT}?symbol=QQQ"
-                response = collector._make_request(endpoint)
-                
-                if response is None or not response.get('data'):
-                    logger.warning("No trades data received")
-                    time.sleep(REQUEST_RATE_LIMIT)
-                    continue
-                
-                # Process trades
-                trades = collector._process_trades(response['data'])
-                
-                # Filter trades by time
-                trades = trades[trades['executed_at'] >= current_time]
-                trades = trades[trades['executed_at'] < current_time + timedelta(minutes=5)]
-                
-                if not trades.empty:
-                    # Save to database
-                    collector.save_trades_to_db(trades)
-                    total_trades += len(trades)
-                    logger.info(f"Saved {len(trades)} QQQ trades for {current_time}")
-                
-                # Move to next time window
-                current_time += timedelta(minutes=5)
-                
-                # Rate limiting
-                time.sleep(REQUEST_RATE_LIMIT)
-                
+                if window.rows:
+                    inserted, _ = collector._save_trades(window.rows)
+                    total_trades += inserted
+                    logger.info(f"Saved {inserted} QQQ trades for {window.start} -> {window.end}")
             except Exception as e:
                 logger.error(f"Error processing trades: {str(e)}")
-                time.sleep(REQUEST_RATE_LIMIT)
                 continue
         
-        logger.info(f"Backfill complete. Total QQQ trades saved: {total_trades}")
+        logger.info(f"Backfill complete. Total QQQ trades saved: {total_trades} ({planner.stats()})")
         return total_trades
     except Exception as e:
         logger.error(f"Fatal error in backfill task: {str(e)}")
-        raise 
\ No newline at end of file
+        raise 
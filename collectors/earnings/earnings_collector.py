@@ -3,10 +3,8 @@
 import os
 import sys
 import logging
-import requests
 import pandas as pd
 from datetime import datetime, timezone, timedelta
-from sqlalchemy import create_engine
 from sqlalchemy.sql import text
 from typing import Optional, Dict, Any, List
 from celery import shared_task
@@ -15,6 +13,10 @@ from celery import shared_task
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from config.db_config import get_db_config
+from collectors.utils.db_pool import get_engine
+from collectors.utils.http_client import UWClient
+from collectors.utils.credit_ledger import HIGH, LOW, credit_ledger
+from collectors.utils.rate_limiter import shared_limiter
 from flow_analysis.config.api_config import UW_API_TOKEN
 from flow_analysis.config.watchlist import SYMBOLS
 
@@ -32,12 +34,21 @@ class EarningsCollector:
         if not self.api_key:
             raise ValueError("UW_API_TOKEN environment variable is not set")
         self.db_config = db_config or get_db_config()
-        self.engine = create_engine(
-            f"postgresql://{self.db_config['user']}:{self.db_config['password']}@"
-            f"{self.db_config['host']}:{self.db_config['port']}/{self.db_config['dbname']}"
-        )
+        self.engine = get_engine(self.db_config)
+        self.credits = credit_ledger()
+        self.rate_limiter = shared_limiter('uw')
+        self.client = UWClient(headers={
+            "Authorization": f"Bearer {self.api_key}",
+            "Accept": "application/json"
+        }, throttle=self.rate_limiter.acquire, observe=self.rate_limiter.observe,
+            reserve=self.credits.reserver('earnings', self._credit_priority))
         self._create_table_if_not_exists()
 
+    @staticmethod
+    def _credit_priority(endpoint: str) -> str:
+        """Latest afterhours/premarket reports are live data; per-ticker history can wait."""
+        return HIGH if endpoint.endswith(('/afterhours', '/premarket')) else LOW
+
     def _setup_logger(self) -> logging.Logger:
         logger = logging.getLogger(__name__)
         if not logger.handlers:
@@ -76,14 +87,8 @@ class EarningsCollector:
             raise
 
     def _get(self, endpoint: str, params: dict = None) -> List[dict]:
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Accept": "application/json"
-        }
         try:
-            response = requests.get(f"{self.BASE_URL}{endpoint}", headers=headers, params=params)
-            response.raise_for_status()
-            data = response.json().get("data", [])
+            data = self.client.get_json(f"{self.BASE_URL}{endpoint}", params=params).get("data", [])
             return data
         except Exception as e:
             self.logger.error(f"Error fetching {endpoint}: {str(e)}")
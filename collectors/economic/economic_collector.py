@@ -6,13 +6,17 @@ import logging
 import requests
 import pandas as pd
 from datetime import datetime, timezone, timedelta
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from typing import Optional, Dict, Any
 
 # Add project root to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from config.db_config import get_db_config
+from collectors.utils.db_pool import get_engine
+from collectors.utils.http_client import UWClient
+from collectors.utils.credit_ledger import credit_ledger
+from collectors.utils.rate_limiter import shared_limiter
 from flow_analysis.config.api_config import UW_API_TOKEN
 
 class EconomicCollector:
@@ -33,10 +37,13 @@ class EconomicCollector:
             raise ValueError("UW_API_TOKEN environment variable is not set")
         
         self.db_config = db_config or get_db_config()
-        self.engine = create_engine(
-            f"postgresql://{self.db_config['user']}:{self.db_config['password']}@"
-            f"{self.db_config['host']}:{self.db_config['port']}/{self.db_config['dbname']}"
-        )
+        self.engine = get_engine(self.db_config)
+        self.rate_limiter = shared_limiter('uw')
+        self.client = UWClient(headers={
+            "Authorization": f"Bearer {self.api_key}",
+            "Accept": "application/json"
+        }, throttle=self.rate_limiter.acquire, observe=self.rate_limiter.observe,
+            reserve=credit_ledger().reserver('economic'))
         
         # Ensure the table exists
         self._create_table_if_not_exists()
@@ -82,19 +89,9 @@ class EconomicCollector:
         Returns:
             List of economic events or None if the request fails.
         """
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Accept": "application/json"
-        }
-        
         try:
-            response = requests.get(
-                f"{self.BASE_URL}{self.ENDPOINT}",
-                headers=headers
-            )
-            response.raise_for_status()
-            return response.json().get("data", [])
-        except requests.exceptions.RequestException as e:
+            return self.client.get_json(f"{self.BASE_URL}{self.ENDPOINT}").get("data", [])
+        except (requests.exceptions.RequestException, ValueError) as e:
             self.logger.error(f"Error fetching economic calendar: {str(e)}")
             return None
     
@@ -1,23 +1,21 @@
 #!/usr/bin/env python3
 
 import os
-import json
 import requests
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterator, NamedTuple, Optional, Tuple
 from pathlib import Path
-from sqlalchemy import create_engine, text
-import time
+from sqlalchemy import text
 import random
 import sys
+import threading
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
 import pytz
 from datetime import timezone
 from celery import shared_task
-import hashlib
-import pickle
-import logging
 
 from collectors.schema_validation import NewsSchemaValidator
 from config.db_config import get_db_config
@@ -26,6 +24,16 @@ from collectors.utils.logging_config import (
     setup_logging, log_heartbeat, log_collector_summary, log_error, log_warning, log_info
 )
 from collectors.utils.market_utils import is_market_open
+from collectors.utils.bulk_copy import copy_merge
+from collectors.utils.cache_store import NO_EXPIRY, cache_store
+from collectors.utils.credit_ledger import CREATE_CREDIT_LEDGER_SQL, HIGH, LOW, CreditBudgetExceeded, credit_ledger
+from collectors.utils.db_pool import get_engine
+from collectors.utils.http_client import UWClient
+from collectors.utils.rate_limiter import shared_limiter
+from collectors.utils.watermarks import CREATE_WATERMARKS_SQL, watermark_store
+from collectors.utils.records import NewsHeadline, decode_records, parse_timestamp
+from collectors.utils.story_index import story_index
+from collectors.utils.time_buckets import TimeBuckets, as_utc
 
 # Set up logging
 logger = setup_logging('news_collector', 'news_collector.log')
@@ -35,32 +43,41 @@ NEWS_API_ENDPOINT = f"{UW_BASE_URL}/news/headlines"
 BATCH_SIZE = 100
 MAX_RETRIES = 3
 MAX_DAYS_BACKFILL = 7
-CACHE_DIR = Path('cache/news')
+CACHE_PATH = Path('cache/news.sqlite3')
 CACHE_EXPIRY_DAYS = 7
+CACHE_MAX_BYTES = 64 * 1024 * 1024  # LRU entries are evicted beyond this
+CACHE_BUCKET = timedelta(days=1)  # Requests are aligned to UTC days; closed days are cached for good
 CREDITS_PER_REQUEST = 1  # Each API request costs 1 credit
 MARKET_OPEN_COLLECTION_INTERVAL = 5  # minutes
 MARKET_CLOSED_COLLECTION_INTERVAL = 15  # minutes
+WATERMARK_STREAM = 'all'  # News is fetched as one stream across sources
+MAX_FETCH_ARTICLES = 1000  # fetch_data's cap; collect streams pages and has none
+HEADLINE_COLUMNS = list(NewsHeadline.__slots__) + ['story_id']  # story_id: see _headline_rows
+HEADLINE_CREATED_AT_INDEX = HEADLINE_COLUMNS.index('created_at')
+HEADLINE_CONFLICT_COLUMNS = ['headline', 'source', 'created_at']
+
+class DayPages(NamedTuple):
+    pages: List[List[Dict[str, Any]]]  # Articles within the requested range, one list per page
+    newest: Optional[datetime]  # Newest created_at among them
+    complete: bool  # Every page was fetched, without errors or stopping at a limit
+
 
 def get_db_connection():
-    """Get database connection using configuration."""
-    db_config = get_db_config()
-    logger = logging.getLogger('news_collector')
-    logger.info('Opening new SQLAlchemy engine connection')
-    engine = create_engine(
-        f"postgresql://{db_config['user']}:{db_config['password']}@{db_config['host']}:{db_config['port']}/{db_config['dbname']}?sslmode={db_config['sslmode']}",
-        pool_size=5,
-        max_overflow=10,
-        pool_timeout=30,
-        pool_recycle=1800,
-    )
-    return engine
+    """Get the process-wide pooled engine for the configured database."""
+    return get_engine(get_db_config())
 
 class NewsCollector:
     """Collector for news articles with pagination and date range support."""
     
-    def __init__(self):
+    def __init__(self, engine=None, session=None):
+        """
+        Args:
+            engine: SQLAlchemy engine; the process-wide pooled one if None
+            session: requests.Session to send on; the process-wide keep-alive one if None
+        """
         self.batch_size = 100
-        self.max_parallel_requests = 2
+        self.max_parallel_requests = 2  # Day buckets fetched at once in concurrent mode
+        self.concurrent = True  # Fetch day buckets in parallel, sharing the UW rate budget
         self.request_timeout = 30
         self.retry_delay = 2.0
         self.max_retries = 3
@@ -68,15 +85,25 @@ class NewsCollector:
         self.last_progress_update = 0
         self.max_pages = 10
         self.last_logged_page = -1
-        self.daily_request_count = 0
-        self.daily_limit = 15000
-        self.rate_limit_delay = 1.0
+        self.daily_request_count = 0  # Requests this run; the daily budget is kept by the credit ledger
         self.validator = NewsSchemaValidator
         self.api_endpoint = NEWS_API_ENDPOINT
         self.headers = DEFAULT_HEADERS
-        self.engine = get_db_connection()
+        self.watermarks = watermark_store('news')
+        self.stories = story_index('news')  # Recent headline signatures, for story ids
+        self.engine = engine or get_db_connection()
+        self.credits = credit_ledger()
+        self.credit_priority = HIGH  # LOW while backfilling
+        self.rate_limiter = shared_limiter('uw')  # Paced by the API's rate-limit headers
+        self.client = UWClient(headers=self.headers, session=session, throttle=self.rate_limiter.acquire,
+                               observe=self.rate_limiter.observe,
+                               reserve=self.credits.reserver('news', lambda endpoint: self.credit_priority),
+                               max_retries=self.max_retries, backoff=self.retry_delay)
+        self._counter_lock = threading.Lock()  # Request/credit counters, updated from fetch workers
         self._create_schema_if_not_exists()
+        self._warm_story_index()
         self._setup_cache()
+        self.buckets = TimeBuckets(CACHE_BUCKET)
         
         # API credit tracking
         self.total_credits_used = 0
@@ -86,8 +113,10 @@ class NewsCollector:
 
     def _log_credit_usage(self, request_type: str, credits: int = CREDITS_PER_REQUEST):
         """Log API credit usage."""
-        self.total_credits_used += credits
-        logger.info(f"API Credit Usage - {request_type}: {credits} credits (Total: {self.total_credits_used})")
+        with self._counter_lock:
+            self.total_credits_used += credits
+            total = self.total_credits_used
+        logger.info(f"API Credit Usage - {request_type}: {credits} credits (Total: {total})")
 
     def _print_credit_summary(self):
         """Print summary of API credit usage."""
@@ -99,62 +128,38 @@ class NewsCollector:
         logger.info("=" * 50)
         logger.info(f"Total Credits Used: {self.total_credits_used}")
         logger.info(f"Cached Requests: {self.cached_requests}")
+        logger.info(f"Cache: {self.cache.stats()}")
         logger.info(f"Failed Requests: {self.failed_requests}")
+        logger.info(f"Credit ledger: {self.credits.stats()}")
+        logger.info(f"Rate limiter: {self.rate_limiter.stats()}")
         logger.info(f"Duration: {duration}")
         logger.info(f"Credits per minute: {self.total_credits_used / (duration.total_seconds() / 60):.2f}")
         logger.info("=" * 50)
 
     def _setup_cache(self):
-        """Set up cache directory and clean old cache files."""
-        CACHE_DIR.mkdir(parents=True, exist_ok=True)
-        self._clean_old_cache()
-
-    def _clean_old_cache(self):
-        """Remove cache files older than CACHE_EXPIRY_DAYS."""
-        expiry_date = datetime.now() - timedelta(days=CACHE_EXPIRY_DAYS)
-        for cache_file in CACHE_DIR.glob('*.pkl'):
-            if cache_file.stat().st_mtime < expiry_date.timestamp():
-                cache_file.unlink()
-
-    def _get_cache_key(self, params: Dict[str, Any]) -> str:
-        """Generate a cache key from request parameters."""
-        param_str = json.dumps(params, sort_keys=True)
-        return hashlib.md5(param_str.encode()).hexdigest()
+        """Open the process-wide response cache; expired entries are cleaned up as it is written."""
+        self.cache = cache_store(CACHE_PATH, ttl=CACHE_EXPIRY_DAYS * 86400, max_bytes=CACHE_MAX_BYTES)
 
     def _get_cached_data(self, cache_key: str) -> Optional[List[Dict[str, Any]]]:
         """Retrieve data from cache if available."""
-        cache_file = CACHE_DIR / f"{cache_key}.pkl"
-        if cache_file.exists():
-            try:
-                with open(cache_file, 'rb') as f:
-                    self.cached_requests += 1
-                    self._log_credit_usage("Cached Request", 0)  # No credits used for cached requests
-                    return pickle.load(f)
-            except Exception as e:
-                logger.warning(f"Cache read error: {str(e)}")
-        return None
+        try:
+            data = self.cache.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Cache read error: {str(e)}")
+            return None
+        if data is not None:
+            with self._counter_lock:
+                self.cached_requests += 1
+            self._log_credit_usage("Cached Request", 0)  # No credits used for cached requests
+        return data
 
     def _save_to_cache(self, cache_key: str, data: List[Dict[str, Any]]):
-        """Save data to cache."""
-        cache_file = CACHE_DIR / f"{cache_key}.pkl"
+        """Save data for a closed window to cache; it no longer changes, so it never expires."""
         try:
-            with open(cache_file, 'wb') as f:
-                pickle.dump(data, f)
+            self.cache.set(cache_key, data, ttl=NO_EXPIRY)
         except Exception as e:
             logger.warning(f"Cache write error: {str(e)}")
 
-    def _split_date_range(self, start_date: datetime, end_date: datetime) -> List[Tuple[datetime, datetime]]:
-        """Split date range into smaller chunks to optimize API usage."""
-        date_ranges = []
-        current_start = start_date
-        
-        while current_start < end_date:
-            current_end = min(current_start + timedelta(days=1), end_date)
-            date_ranges.append((current_start, current_end))
-            current_start = current_end
-            
-        return date_ranges
-
     def _create_schema_if_not_exists(self):
         """Create the news headlines schema and table if they don't exist."""
         try:
@@ -175,6 +180,13 @@ class NewsCollector:
                         collected_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
                     );
                 """))
+                conn.execute(text("ALTER TABLE trading.news_headlines ADD COLUMN IF NOT EXISTS story_id BIGINT;"))
+                conn.execute(text("""
+                    CREATE INDEX IF NOT EXISTS news_headlines_story_id
+                    ON trading.news_headlines (story_id, created_at);
+                """))
+                conn.execute(text(CREATE_WATERMARKS_SQL))
+                conn.execute(text(CREATE_CREDIT_LEDGER_SQL))
                 conn.commit()
                 logger.info("Schema ready")
         except Exception as e:
@@ -183,59 +195,171 @@ class NewsCollector:
         finally:
             logger.info('Closed DB connection')
 
-    def _check_api_limit(self) -> bool:
-        """Check if we're approaching the API limit."""
-        if self.daily_request_count >= (self.daily_limit * 0.9):
-            logger.warning(f"API limit: {self.daily_request_count}/{self.daily_limit}")
-            return False
-        return True
-
-    def _make_request(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Make a single API request with retry logic and caching."""
-        cache_key = self._get_cache_key(params)
-        cached_data = self._get_cached_data(cache_key)
-        
-        if cached_data is not None:
-            logger.info(f"Using cached data for request: {params}")
-            return cached_data
+    def _warm_story_index(self):
+        """Index the last window of stored headlines, so new variants join their existing stories."""
+        if self.stories.warmed:
+            return
+        since = datetime.now(timezone.utc) - timedelta(seconds=self.stories.window)
+        raw_conn = self.engine.raw_connection()
+        try:
+            self.stories.warm(raw_conn, since)
+        except Exception as e:
+            # Headlines still save; variants of older stories just start new ones
+            logger.warning(f"Could not warm story index: {str(e)}")
+        finally:
+            raw_conn.rollback()
+            raw_conn.close()
 
-        for attempt in range(self.max_retries):
-            try:
-                if not self._check_api_limit():
-                    return []
-                    
-                response = requests.get(
-                    self.api_endpoint,
-                    headers=self.headers,
-                    params=params,
-                    timeout=self.request_timeout
-                )
-                
-                if response.status_code != 200:
-                    logger.error(f"API error: {response.status_code}")
-                    response.raise_for_status()
-                
-                self.daily_request_count += 1
-                data = response.json()
-                articles = data.get('data', [])
-                
-                # Log credit usage
-                self._log_credit_usage("API Request")
-                
-                # Cache the results
-                self._save_to_cache(cache_key, articles)
-                
-                return articles
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Request failed: {str(e)}")
+    def _make_request(self, params: Dict[str, Any], cache_key: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Make a single API request (retried by the shared client).
+
+        Requests with a ``cache_key`` (closed windows only) are served from and
+        saved to the cache; without one the API is always called.
+        """
+        if cache_key is not None:
+            cached_data = self._get_cached_data(cache_key)
+            if cached_data is not None:
+                logger.info(f"Using cached data for request: {params}")
+                return cached_data
+
+        with self._counter_lock:
+            self.daily_request_count += 1
+
+        try:
+            data = self.client.get_json(self.api_endpoint, params=params, timeout=self.request_timeout)
+        except CreditBudgetExceeded as e:
+            # Raised, not an empty page: the day must not look complete
+            logger.warning(f"Request refused: {str(e)}")
+            raise
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Request failed: {str(e)}")
+            with self._counter_lock:
                 self.failed_requests += 1
-                if attempt == self.max_retries - 1:
-                    raise
-                time.sleep(self.retry_delay * (2 ** attempt))
-        return []
+            raise
+
+        articles = data.get('data', [])
+
+        # Log credit usage
+        self._log_credit_usage("API Request")
+
+        if cache_key is not None:
+            self._save_to_cache(cache_key, articles)
+
+        return articles
+
+    def _fetch_bucket(self, bucket_start: datetime, bucket_end: datetime, start_date: datetime,
+                      end_date: datetime, budget: float) -> DayPages:
+        """
+        Fetch one day bucket page by page, stopping once ``budget`` articles are kept.
+
+        Closed days are requested whole, so their cache keys are the same on every
+        run; the open day is requested for just the range and never cached.
+        """
+        if budget <= 0:
+            return DayPages([], None, False)
+        chunk_start = max(start_date, bucket_start)
+        chunk_end = min(end_date, bucket_end)
+        if self.buckets.is_closed(bucket_end):
+            window_start, window_end = bucket_start, bucket_end
+        else:
+            window_start, window_end = chunk_start, chunk_end
+
+        start_str = window_start.strftime('%Y-%m-%dT%H:%M:%S%z')
+        end_str = window_end.strftime('%Y-%m-%dT%H:%M:%S%z')
+
+        pages = []
+        kept = 0
+        newest = None
+        complete = True
+        page = 0
+        while page < self.max_pages:
+            params = {
+                'limit': self.batch_size,
+                'page': page,
+                'newer_than': start_str,
+                'older_than': end_str
+            }
+            cache_key = self.buckets.key(
+                'news', window_start, window_end, {'limit': self.batch_size, 'page': page}
+            )
+
+            try:
+                articles = self._make_request(params, cache_key)
+                if not articles:
+                    break
+
+                filtered_articles = []
+                for article in articles:
+                    created_at = parse_timestamp(article['created_at'])
+                    if chunk_start <= created_at <= chunk_end:
+                        filtered_articles.append(article)
+                        if newest is None or created_at > newest:
+                            newest = created_at
 
-    def fetch_data(self, start_date=None, end_date=None):
-        """Fetch news headlines from the API with optimized date range handling."""
+                pages.append(filtered_articles)
+                kept += len(filtered_articles)
+
+                if len(articles) < self.batch_size:
+                    break
+                if kept >= budget:
+                    complete = False
+                    break
+
+                page += 1
+
+            except Exception as e:
+                logger.error(f"Page {page} error: {str(e)}")
+                complete = False
+                break
+
+        if page == self.max_pages:
+            # Stopped on a full page: the day's oldest articles weren't fetched
+            complete = False
+        return DayPages(pages, newest, complete)
+
+    def _fetch_buckets_concurrently(self, buckets, fetch) -> Iterator[DayPages]:
+        """
+        Yield ``fetch(bucket)`` for each bucket in order, with up to ``max_parallel_requests`` in flight.
+
+        Buckets are submitted only as earlier results are consumed, so a caller
+        that stops early leaves at most that many fetches behind (they are cancelled
+        or finish unused).
+        """
+        pool = ThreadPoolExecutor(max_workers=self.max_parallel_requests, thread_name_prefix='news-fetch')
+        pending = deque()
+        remaining = iter(buckets)
+        try:
+            for bucket in islice(remaining, self.max_parallel_requests):
+                pending.append(pool.submit(fetch, bucket))
+            while pending:
+                result = pending.popleft().result()
+                for bucket in islice(remaining, 1):
+                    pending.append(pool.submit(fetch, bucket))
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
+            pool.shutdown(wait=True)
+
+    def iter_pages(self, start_date=None, end_date=None,
+                   max_articles: Optional[int] = None) -> Iterator[Tuple[List[Dict[str, Any]], Optional[datetime]]]:
+        """
+        Yield the requested range's articles page by page, one UTC day bucket at a time, oldest day first.
+
+        Requests are paced by the shared UW rate limiter only. With ``concurrent``
+        set, up to ``max_parallel_requests`` days are fetched at once; the pages
+        come out in the same order as a serial run's. Either way at most
+        that many days of pages are held, however long the range.
+
+        Args:
+            max_articles: Stop after the page that reaches this many articles
+
+        Yields:
+            ``(articles, day_done)``, where ``day_done`` is set on a day's last page
+            to the newest ``created_at`` of the day, once every page of it and of
+            every earlier day has been fetched without error; otherwise None
+        """
         if not start_date:
             start_date = datetime.now(timezone.utc) - timedelta(hours=24)
         if not end_date:
@@ -247,103 +371,118 @@ class NewsCollector:
         self.cached_requests = 0
         self.failed_requests = 0
 
-        # Split date range into daily chunks
-        date_ranges = self._split_date_range(start_date, end_date)
-        all_articles = []
+        start_date, end_date = as_utc(start_date), as_utc(end_date)
+        limit = max_articles if max_articles is not None else float('inf')
         total_articles = 0
-        max_articles = 1000  # Limit total articles to prevent excessive fetching
 
-        for chunk_start, chunk_end in date_ranges:
-            if total_articles >= max_articles:
-                break
+        buckets = self.buckets.split(start_date, end_date)
+        concurrent = self.concurrent and self.max_parallel_requests > 1 and len(buckets) > 1
 
-            start_str = chunk_start.strftime('%Y-%m-%dT%H:%M:%S%z')
-            end_str = chunk_end.strftime('%Y-%m-%dT%H:%M:%S%z')
-
-            page = 0
-            while page < self.max_pages and total_articles < max_articles:
-                params = {
-                    'limit': self.batch_size,
-                    'page': page,
-                    'newer_than': start_str,
-                    'older_than': end_str
-                }
-
-                try:
-                    articles = self._make_request(params)
-                    if not articles:
-                        break
-
-                    filtered_articles = [
-                        article for article in articles
-                        if chunk_start <= datetime.fromisoformat(article['created_at'].replace('Z', '+00:00')) <= chunk_end
-                    ]
-
-                    all_articles.extend(filtered_articles)
-                    total_articles += len(filtered_articles)
-                    
-                    if len(articles) < self.batch_size or total_articles >= max_articles:
-                        break
-
-                    page += 1
-                    time.sleep(self.rate_limit_delay)
-
-                except Exception as e:
-                    logger.error(f"Page {page} error: {str(e)}")
-                    break
+        def fetch(bucket):
+            # A worker only knows the articles yielded before its bucket was submitted,
+            # so it may fetch past the limit; the loop below trims to the serial result
+            return self._fetch_bucket(*bucket, start_date, end_date, limit - total_articles)
 
-            # Add delay between date chunks
-            time.sleep(self.rate_limit_delay * 2)
+        if concurrent:
+            results = self._fetch_buckets_concurrently(buckets, fetch)
+        else:
+            results = (fetch(bucket) for bucket in buckets)
 
-        # Print credit usage summary
-        self._print_credit_summary()
-
-        logger.info(f"Fetched {total_articles} articles")
-        return all_articles
-
-    def save_headlines(self, headlines):
-        """Save headlines to the database."""
+        # The watermark only moves forward, so once a day is incomplete no later
+        # day may advance it past the gap
+        gap = False
+        try:
+            for day in results:
+                gap = gap or not day.complete
+                for index, page in enumerate(day.pages):
+                    total_articles += len(page)
+                    last = index == len(day.pages) - 1
+                    yield page, day.newest if last and not gap else None
+                    if total_articles >= limit:
+                        return
+        finally:
+            results.close()
+            # Print credit usage summary
+            self._print_credit_summary()
+            logger.info(f"Fetched {total_articles} articles")
+
+    def fetch_data(self, start_date=None, end_date=None, max_articles: int = MAX_FETCH_ARTICLES):
+        """Fetch news headlines into one list; ``collect`` streams pages to the database instead."""
+        return [article for page, _ in self.iter_pages(start_date, end_date, max_articles) for article in page]
+
+    def save_headlines(self, headlines) -> Tuple[int, int]:
+        """
+        Save headlines to the database with one COPY merge, advancing the watermark in the same commit.
+
+        Returns:
+            Tuple of (headlines inserted, duplicates skipped)
+        """
         if not headlines:
             logger.warning("No headlines to save")
-            return
-
+            return 0, 0
+
+        rows = self._headline_rows(headlines)
+        if not rows:
+            return 0, 0
+        return self._write_rows(rows, max(row[HEADLINE_CREATED_AT_INDEX] for row in rows))
+
+    def _headline_rows(self, articles) -> List[tuple]:
+        """
+        Decode articles into ``HEADLINE_COLUMNS`` rows, assigning each its story id.
+
+        Near-duplicate rewrites of a headline published within the story
+        index's window share the ``story_id`` of the first one seen, so
+        analysis can group by story instead of by raw headline.
+        """
+        return [
+            headline.values() + (self.stories.assign(headline.headline, headline.created_at, headline.tickers),)
+            for headline in decode_records(articles, NewsHeadline)
+        ]
+
+    def _write_rows(self, rows: List[tuple], watermark: Optional[datetime]) -> Tuple[int, int]:
+        """COPY-merge headline rows and, if given, advance the watermark to ``watermark`` in the same commit."""
+        raw_conn = self.engine.raw_connection()
         try:
-            logger.info('Opening DB connection')
-            with self.engine.connect() as conn:
-                for headline in headlines:
-                    formatted_headline = {
-                        'headline': headline['headline'],
-                        'source': headline.get('source'),
-                        'created_at': datetime.fromisoformat(headline['created_at'].replace('Z', '+00:00')),
-                        'tags': headline.get('tags', []),
-                        'tickers': headline.get('tickers', []),
-                        'is_major': headline.get('is_major', False),
-                        'sentiment': headline.get('sentiment'),
-                        'meta': json.dumps(headline.get('meta', {}))
-                    }
-                    conn.execute(text("""
-                        INSERT INTO trading.news_headlines (
-                            headline, source, created_at, tags, tickers, is_major, sentiment, meta
-                        ) VALUES (
-                            :headline, :source, :created_at, :tags, :tickers, :is_major, :sentiment, :meta
-                        )
-                        ON CONFLICT (headline, source, created_at) DO NOTHING
-                    """), formatted_headline)
-                conn.commit()
-                logger.info(f"Saved {len(headlines)} headlines (duplicates ignored)")
+            inserted, duplicates = copy_merge(
+                raw_conn, 'trading.news_headlines', HEADLINE_COLUMNS, rows, HEADLINE_CONFLICT_COLUMNS
+            )
+            if watermark is not None:
+                self.watermarks.advance(raw_conn, WATERMARK_STREAM, watermark)
+            raw_conn.commit()
         except Exception as e:
+            raw_conn.rollback()
             logger.error(f"Save error: {str(e)}")
             raise
         finally:
-            logger.info('Closed DB connection')
+            raw_conn.close()
+        if watermark is not None:
+            self.watermarks.remember(WATERMARK_STREAM, watermark)
+        logger.info(f"Saved {inserted} headlines ({duplicates} duplicates)")
+        return inserted, duplicates
 
     def collect(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> None:
+        """
+        Fetch headlines and write each page as soon as it arrives.
+
+        Memory stays bounded by the pages in flight, whatever the range. The
+        watermark advances with the last page of each complete day, so an
+        interrupted backfill resumes at the first unfinished day: the pages
+        of it already written are served from the cache (closed days cost no
+        credits) and dropped as duplicates.
+        """
         log_heartbeat('news', status='running')
         self.start_time = datetime.now()
+        self.total_articles = 0
         try:
-            headlines = self.fetch_data(start_date, end_date)
-            self.total_articles = len(headlines)
-            self.save_headlines(headlines)
+            inserted = duplicates = 0
+            for articles, day_done in self.iter_pages(start_date, end_date):
+                rows = self._headline_rows(articles)
+                if rows or day_done is not None:
+                    page_inserted, page_duplicates = self._write_rows(rows, day_done)
+                    inserted += page_inserted
+                    duplicates += page_duplicates
+                self.total_articles += len(articles)
+            logger.info(f"Collected {self.total_articles} headlines: {inserted} inserted, {duplicates} duplicates")
             log_collector_summary(
                 collector_name='news',
                 start_time=self.start_time,
@@ -356,9 +495,6 @@ class NewsCollector:
         except Exception as e:
             log_error('news', e, task_type='collect')
             raise
-        finally:
-            logger.info('Disposing SQLAlchemy engine')
-            self.engine.dispose()
 
     def get_all_headlines(self) -> pd.DataFrame:
         """Get all headlines from the database."""
@@ -370,9 +506,26 @@ class NewsCollector:
             logger.error(f"Query error: {str(e)}")
             raise
 
+    def _get_last_collected_date(self) -> Optional[datetime]:
+        """Get the newest stored created_at, seeding the watermark from the table on first use."""
+        cached = self.watermarks.cached(WATERMARK_STREAM)
+        if cached is not None:
+            return cached
+        raw_conn = self.engine.raw_connection()
+        try:
+            def latest_from_headlines():
+                with raw_conn.cursor() as cur:
+                    cur.execute("SELECT MAX(created_at) FROM trading.news_headlines")
+                    return cur.fetchone()[0]
+
+            return self.watermarks.get(raw_conn, WATERMARK_STREAM, fallback=latest_from_headlines)
+        finally:
+            raw_conn.close()
+
     def backfill(self, start_date=None, end_date=None, days=7):
         log_heartbeat('news', status='backfill')
         self.start_time = datetime.now()
+        self.credit_priority = LOW
         try:
             if not start_date:
                 start_date = datetime.now(timezone.utc) - timedelta(days=days)
@@ -381,17 +534,13 @@ class NewsCollector:
             
             logger.info(f"Backfilling news headlines from {start_date} to {end_date}")
             
-            # Get the last collected date from the database
+            # Get the last collected date from the news watermark
             try:
-                with self.engine.connect() as conn:
-                    query = text("SELECT MAX(created_at) as last_date FROM trading.news_headlines")
-                    result = conn.execute(query).fetchone()
-                    last_collected_date = result[0] if result and result[0] else None
-                    
-                    if last_collected_date:
-                        # Adjust start_date to avoid re-fetching existing data
-                        start_date = max(start_date, last_collected_date + timedelta(seconds=1))
-                        logger.info(f"Adjusted start date to {start_date} based on last collected date")
+                last_collected_date = self._get_last_collected_date()
+                if last_collected_date:
+                    # Adjust start_date to avoid re-fetching existing data
+                    start_date = max(start_date, last_collected_date + timedelta(seconds=1))
+                    logger.info(f"Adjusted start date to {start_date} based on last collected date")
             except Exception as e:
                 logger.warning(f"Could not determine last collected date: {str(e)}")
             
@@ -409,8 +558,7 @@ class NewsCollector:
             log_error('news', e, task_type='backfill')
             raise
         finally:
-            logger.info('Disposing SQLAlchemy engine')
-            self.engine.dispose()
+            self.credit_priority = HIGH
 
 @shared_task
 def run_news_collector(minutes: int = 10) -> Dict[str, Any]:
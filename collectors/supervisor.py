@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Long-running collector supervisor.
+
+Hosts every collector in one process as an asyncio task with its own poll
+cadence, instead of Celery beat building a fresh collector (engine, dotenv,
+schema checks) every 5 minutes. Collectors are created once and share the
+registry's pooled engine (``collectors.utils.db_pool``) and one
+``requests.Session`` (HTTP pool).
+
+The collectors themselves are synchronous, so each poll runs on a worker
+thread; the event loop only schedules polls and handles shutdown. Dark pool
+symbols are polled on per-symbol intervals chosen by
+``collectors.utils.adaptive_polling``.
+
+Usage:
+    python -m collectors.supervisor
+    python -m collectors.supervisor --only darkpool
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from collectors.utils.adaptive_polling import AdaptivePollScheduler, MIN_POLL_INTERVAL
+from collectors.utils.db_pool import get_engine, pool_stats
+from collectors.utils.http_client import get_session, latency_stats
+from collectors.utils.logging_config import log_error, log_heartbeat, log_info
+from collectors.utils.market_utils import is_market_open
+
+logger = logging.getLogger(__name__)
+
+# Poll cadence in seconds. The dark pool job ticks often and lets the adaptive
+# scheduler decide which symbols are actually due.
+DARKPOOL_TICK_INTERVAL = MIN_POLL_INTERVAL
+NEWS_OPEN_INTERVAL = 5 * 60
+NEWS_CLOSED_INTERVAL = 15 * 60
+
+HTTP_POOL_SIZE = 10
+POLL_METRICS_INTERVAL = 300  # seconds between poll-interval metric logs
+POOL_STATS_INTERVAL = 300  # seconds between DB pool and API latency logs
+
+
+@dataclass
+class CollectorJob:
+    """One collector hosted by the supervisor."""
+    name: str
+    poll: Callable[[], Any]
+    open_interval: float
+    closed_interval: float
+    market_hours_only: bool = False
+
+
+class CollectorSupervisor:
+    """Runs collector jobs as asyncio tasks until stopped."""
+
+    def __init__(self, jobs: List[CollectorJob], market_open: Callable[[], bool] = is_market_open):
+        if not jobs:
+            raise ValueError("At least one collector job is required")
+        self.jobs = jobs
+        self.market_open = market_open
+        self.executor = ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix='collector')
+        self.poll_counts: Dict[str, int] = {job.name: 0 for job in jobs}
+        self._stop: Optional[asyncio.Event] = None
+
+    def _interval(self, job: CollectorJob) -> float:
+        return job.open_interval if self.market_open() else job.closed_interval
+
+    async def _poll_once(self, job: CollectorJob) -> None:
+        """Run one poll on a worker thread, logging (not raising) failures."""
+        if job.market_hours_only and not self.market_open():
+            logger.debug(f"{job.name}: market closed, skipping poll")
+            return
+        loop = asyncio.get_running_loop()
+        poll_start = time.monotonic()
+        try:
+            await loop.run_in_executor(self.executor, job.poll)
+            self.poll_counts[job.name] += 1
+            logger.info(f"{job.name}: poll finished in {time.monotonic() - poll_start:.1f}s")
+        except Exception as e:
+            logger.error(f"{job.name}: poll failed: {str(e)}", exc_info=True)
+            log_error(job.name, e, task_type='supervisor_poll')
+
+    async def _run_job(self, job: CollectorJob) -> None:
+        """Poll a job on its cadence until the supervisor stops."""
+        log_heartbeat(job.name, status='supervised')
+        while not self._stop.is_set():
+            await self._poll_once(job)
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=self._interval(job))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _report_pools(self) -> None:
+        """Log DB pool usage and API latency until the supervisor stops."""
+        while not self._stop.is_set():
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=POOL_STATS_INTERVAL)
+            except asyncio.TimeoutError:
+                stats = pool_stats()
+                logger.info(f"DB pools: {stats}")
+                log_info('supervisor', 'DB pool stats', task_type='pool_stats', details=stats)
+                latency = latency_stats()
+                logger.info(f"API latency: {latency}")
+                log_info('supervisor', 'API latency', task_type='api_latency', details=latency)
+
+    def stop(self) -> None:
+        """Ask every job to finish its current poll and exit."""
+        if self._stop is not None:
+            self._stop.set()
+
+    async def run(self) -> None:
+        """Run every job until ``stop`` is called."""
+        self._stop = asyncio.Event()
+        logger.info(f"Supervising collectors: {', '.join(job.name for job in self.jobs)}")
+        try:
+            await asyncio.gather(self._report_pools(), *(self._run_job(job) for job in self.jobs))
+        finally:
+            self.executor.shutdown(wait=True)
+            logger.info("Supervisor stopped")
+
+
+class AdaptiveDarkPoolPoller:
+    """Polls only the dark pool symbols the adaptive scheduler finds due."""
+
+    def __init__(self, collector, scheduler: AdaptivePollScheduler, clock: Callable[[], float] = time.time):
+        self.collector = collector
+        self.scheduler = scheduler
+        self._clock = clock
+        self._last_metrics = None
+
+    def poll(self) -> None:
+        due = self.scheduler.due()
+        if due:
+            self.collector.collect_trades(symbols=due)
+            stats = self.collector.last_symbol_stats
+            now = self._clock()
+            for symbol in due:
+                symbol_stats = stats.get(symbol)
+                self.scheduler.record(symbol, symbol_stats['fetched'] if symbol_stats else None, now)
+        self._log_metrics()
+
+    def _log_metrics(self) -> None:
+        now = self._clock()
+        if self._last_metrics is not None and now - self._last_metrics < POLL_METRICS_INTERVAL:
+            return
+        self._last_metrics = now
+        metrics = self.scheduler.metrics(now)
+        logger.info(f"darkpool poll intervals: {metrics}")
+        log_info('darkpool', 'Adaptive poll intervals', task_type='poll_schedule', details=metrics)
+
+
+def create_shared_session(pool_size: int = HTTP_POOL_SIZE) -> requests.Session:
+    """The process-wide keep-alive session shared by every hosted collector."""
+    return get_session(pool_size)
+
+
+def darkpool_job(collector) -> CollectorJob:
+    """Dark pool job polling each symbol on its own adaptive interval."""
+    poller = AdaptiveDarkPoolPoller(collector, AdaptivePollScheduler(collector.symbols))
+    return CollectorJob(
+        name='darkpool',
+        poll=poller.poll,
+        open_interval=DARKPOOL_TICK_INTERVAL,
+        closed_interval=DARKPOOL_TICK_INTERVAL
+    )
+
+
+def build_jobs(names: Optional[List[str]] = None) -> List[CollectorJob]:
+    """
+    Build the collector jobs, sharing one DB engine and one HTTP session.
+
+    Args:
+        names: Collector names to host ('darkpool', 'news'); all if None
+    """
+    # Imported here so ``--help`` doesn't need the full environment
+    from collectors.darkpool_collector import DarkPoolCollector
+    from collectors.news.newscollector import NewsCollector
+    from config.db_config import get_db_config
+
+    engine = get_engine(get_db_config())
+    session = create_shared_session()
+
+    factories = {
+        'darkpool': lambda: darkpool_job(DarkPoolCollector(engine=engine, session=session)),
+        'news': lambda: CollectorJob(
+            name='news',
+            poll=NewsCollector(engine=engine, session=session).collect,
+            open_interval=NEWS_OPEN_INTERVAL,
+            closed_interval=NEWS_CLOSED_INTERVAL
+        ),
+    }
+    names = names or list(factories)
+    unknown = set(names) - set(factories)
+    if unknown:
+        raise ValueError(f"Unknown collectors: {', '.join(sorted(unknown))}")
+    return [factories[name]() for name in names]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run all collectors in one long-lived process')
+    parser.add_argument('--only', nargs='+', choices=['darkpool', 'news'], help='Collectors to host (default: all)')
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    supervisor = CollectorSupervisor(build_jobs(args.only))
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, supervisor.stop)
+        await supervisor.run()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Adaptive per-symbol poll scheduling.
+
+Keeps an EWMA of trades per minute for each symbol and splits a fixed poll
+budget (API requests per minute) between symbols in proportion to that rate,
+so busy symbols are polled more often and quiet ones back off. The budget is
+scaled by the collector session (pre-market, regular, after-hours) from
+``collectors.utils.market_utils``; nothing is polled while closed.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence
+
+from collectors.utils.market_utils import get_collector_session
+
+logger = logging.getLogger(__name__)
+
+# Polls per minute reserved for dark pool collection out of the shared UW budget
+DEFAULT_POLL_BUDGET = 6
+MIN_POLL_INTERVAL = 15  # seconds
+MAX_POLL_INTERVAL = 600  # seconds
+EWMA_HALF_LIFE = 600  # seconds
+# Rate assumed for symbols with no trades yet, so they keep a share of the budget
+RATE_FLOOR = 1.0  # trades per minute
+
+SESSION_BUDGET_SHARE = {
+    'pre_market': 0.4,
+    'regular': 1.0,
+    'after_hours': 0.4,
+    'closed': 0.0,
+}
+
+
+def allocate_budget(weights: Dict[str, float], budget: float, low: float, high: float) -> Dict[str, float]:
+    """
+    Split ``budget`` across keys in proportion to ``weights``, bounded to [low, high].
+
+    Keys pushed outside the bounds are pinned there and the rest of the budget
+    is re-split among the others. If the budget can't cover ``low`` for every
+    key, every key gets ``low``.
+
+    Returns:
+        Dict of key -> allocated share
+    """
+    allocation: Dict[str, float] = {}
+    remaining = dict(weights)
+    left = budget
+    while remaining:
+        total = sum(remaining.values())
+        shares = {key: left * weight / total for key, weight in remaining.items()}
+        pinned = {key: low for key, share in shares.items() if share < low}
+        if not pinned:
+            pinned = {key: high for key, share in shares.items() if share > high}
+        if not pinned:
+            allocation.update(shares)
+            break
+        allocation.update(pinned)
+        left = max(left - sum(pinned.values()), 0.0)
+        for key in pinned:
+            del remaining[key]
+    return allocation
+
+
+class AdaptivePollScheduler:
+    """Chooses per-symbol poll intervals from observed trade arrival rates."""
+
+    def __init__(self, symbols: Sequence[str], polls_per_minute: float = DEFAULT_POLL_BUDGET,
+                 min_interval: float = MIN_POLL_INTERVAL, max_interval: float = MAX_POLL_INTERVAL,
+                 half_life: float = EWMA_HALF_LIFE,
+                 session: Callable[[datetime], str] = get_collector_session,
+                 clock: Callable[[], float] = time.time):
+        if polls_per_minute <= 0:
+            raise ValueError("polls_per_minute must be positive")
+        self.symbols = list(symbols)
+        self.polls_per_minute = polls_per_minute
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.half_life = half_life
+        self._session = session
+        self._clock = clock
+        self.rates: Dict[str, Optional[float]] = {symbol: None for symbol in self.symbols}
+        self.last_poll: Dict[str, Optional[float]] = {symbol: None for symbol in self.symbols}
+        self._lock = threading.Lock()
+
+    def record(self, symbol: str, trades: Optional[int], now: Optional[float] = None) -> None:
+        """
+        Record a finished poll.
+
+        ``trades`` is the number of trades the poll returned since the
+        previous one; pass None for a failed poll, which only resets the timer.
+        """
+        now = self._clock() if now is None else now
+        with self._lock:
+            previous = self.last_poll.get(symbol)
+            self.last_poll[symbol] = now
+            if trades is None or previous is None or now <= previous:
+                return
+            elapsed = now - previous
+            sample = trades * 60.0 / elapsed
+            rate = self.rates.get(symbol)
+            if rate is None:
+                self.rates[symbol] = sample
+            else:
+                # Time-aware smoothing: a long gap weighs the new sample more
+                alpha = 1.0 - 0.5 ** (elapsed / self.half_life)
+                self.rates[symbol] = rate + alpha * (sample - rate)
+
+    def session(self, now: Optional[float] = None) -> str:
+        now = self._clock() if now is None else now
+        return self._session(datetime.fromtimestamp(now, tz=timezone.utc))
+
+    def intervals(self, now: Optional[float] = None) -> Dict[str, Optional[float]]:
+        """
+        Poll interval in seconds per symbol for the current session.
+
+        Returns:
+            Dict of symbol -> interval, or None while the session is closed
+        """
+        budget = self.polls_per_minute * SESSION_BUDGET_SHARE.get(self.session(now), 0.0)
+        if budget <= 0:
+            return {symbol: None for symbol in self.symbols}
+        with self._lock:
+            weights = {symbol: max(self.rates[symbol] or 0.0, RATE_FLOOR) for symbol in self.symbols}
+        per_minute = allocate_budget(weights, budget, 60.0 / self.max_interval, 60.0 / self.min_interval)
+        return {symbol: 60.0 / polls for symbol, polls in per_minute.items()}
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Symbols whose interval has elapsed since their last poll."""
+        now = self._clock() if now is None else now
+        intervals = self.intervals(now)
+        with self._lock:
+            return [
+                symbol for symbol in self.symbols
+                if intervals[symbol] is not None
+                and (self.last_poll[symbol] is None or now - self.last_poll[symbol] >= intervals[symbol])
+            ]
+
+    def metrics(self, now: Optional[float] = None) -> Dict:
+        """Chosen intervals and smoothed rates, for the collector logs."""
+        intervals = self.intervals(now)
+        with self._lock:
+            return {
+                'session': self.session(now),
+                'polls_per_minute': self.polls_per_minute,
+                'symbols': {
+                    symbol: {
+                        'interval_seconds': round(intervals[symbol], 1) if intervals[symbol] else None,
+                        'trades_per_minute': round(self.rates[symbol], 2) if self.rates[symbol] is not None else None
+                    }
+                    for symbol in self.symbols
+                }
+            }
@@ -0,0 +1,247 @@
+"""
+Postgres-backed backfill job queue.
+
+A backfill is split into (symbol, window) work items in ``trading.backfill_jobs``.
+Any number of worker processes, on any host, claim items with
+``FOR UPDATE SKIP LOCKED`` so no two workers fetch the same window and no
+worker blocks on another's lock. Status, attempt counts and per-job row counts
+live in the table, so an interrupted backfill resumes where it stopped and a
+crashed worker's jobs are reclaimed once their claim goes stale (or marked
+failed, if the crash was on their last attempt). A failed attempt goes back
+to the queue behind an exponential backoff (``not_before``).
+
+All helpers take a DB-API (psycopg2) connection. ``claim``, ``complete`` and
+``fail`` commit, since each is a state transition other workers must see.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW = timedelta(hours=1)
+DEFAULT_MAX_ATTEMPTS = 3
+# A running job whose claim is older than this is assumed abandoned
+DEFAULT_STALE_AFTER = timedelta(minutes=30)
+# Delay before a failed job is retried; doubled for each attempt made
+DEFAULT_RETRY_BACKOFF = timedelta(minutes=1)
+
+CREATE_BACKFILL_JOBS_SQL = """
+CREATE TABLE IF NOT EXISTS trading.backfill_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    collector VARCHAR(50) NOT NULL,
+    symbol VARCHAR(20) NOT NULL,
+    window_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    window_end TIMESTAMP WITH TIME ZONE NOT NULL,
+    status VARCHAR(10) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    claimed_by VARCHAR(100),
+    claimed_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE,
+    rows_fetched INTEGER,
+    rows_inserted INTEGER,
+    seconds DOUBLE PRECISION,
+    last_error TEXT,
+    not_before TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (collector, symbol, window_start, window_end)
+)
+"""
+
+CREATE_BACKFILL_JOBS_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_backfill_jobs_claimable
+ON trading.backfill_jobs (collector, window_start)
+WHERE status IN ('pending', 'running')
+"""
+
+INSERT_JOB_SQL = """
+INSERT INTO trading.backfill_jobs (collector, symbol, window_start, window_end, max_attempts)
+VALUES (%s, %s, %s, %s, %s)
+ON CONFLICT (collector, symbol, window_start, window_end) DO NOTHING
+"""
+
+# Stale claims on a job's last attempt are marked failed; any other stale
+# claim, or a pending job past its backoff, can be claimed
+CLAIM_JOB_SQL = """
+WITH expired AS (
+    UPDATE trading.backfill_jobs
+    SET status = 'failed', finished_at = NOW(),
+        last_error = COALESCE(last_error || '; ', '') || 'claim went stale on the last attempt'
+    WHERE collector = %(collector)s AND status = 'running'
+      AND claimed_at < NOW() - %(stale_after)s AND attempts >= max_attempts
+)
+UPDATE trading.backfill_jobs
+SET status = 'running', attempts = attempts + 1, claimed_by = %(worker_id)s, claimed_at = NOW()
+WHERE id = (
+    SELECT id FROM trading.backfill_jobs
+    WHERE collector = %(collector)s
+      AND attempts < max_attempts
+      AND ((status = 'pending' AND (not_before IS NULL OR not_before <= NOW()))
+           OR (status = 'running' AND claimed_at < NOW() - %(stale_after)s))
+    ORDER BY window_start DESC
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED
+)
+RETURNING id, symbol, window_start, window_end, attempts
+"""
+
+COMPLETE_JOB_SQL = """
+UPDATE trading.backfill_jobs
+SET status = 'done', finished_at = NOW(), rows_fetched = %s, rows_inserted = %s,
+    seconds = %s, last_error = NULL
+WHERE id = %s
+"""
+
+FAIL_JOB_SQL = """
+UPDATE trading.backfill_jobs
+SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END,
+    not_before = NOW() + %s * POWER(2, attempts - 1),
+    finished_at = NOW(), last_error = %s
+WHERE id = %s
+"""
+
+STATUS_REPORT_SQL = """
+SELECT symbol, status, COUNT(*), COALESCE(SUM(rows_fetched), 0), COALESCE(SUM(rows_inserted), 0)
+FROM trading.backfill_jobs
+WHERE collector = %s
+GROUP BY symbol, status
+"""
+
+WORKER_REPORT_SQL = """
+SELECT claimed_by, COUNT(*), COALESCE(SUM(rows_inserted), 0), COALESCE(SUM(seconds), 0),
+       MIN(claimed_at), MAX(finished_at)
+FROM trading.backfill_jobs
+WHERE collector = %s AND status = 'done'
+GROUP BY claimed_by
+"""
+
+
+class BackfillJob(NamedTuple):
+    id: int
+    symbol: str
+    window_start: datetime
+    window_end: datetime
+    attempts: int
+
+
+def ensure_table(raw_conn) -> None:
+    """Create ``trading.backfill_jobs`` if it doesn't exist."""
+    with raw_conn.cursor() as cur:
+        cur.execute("CREATE SCHEMA IF NOT EXISTS trading")
+        cur.execute(CREATE_BACKFILL_JOBS_SQL)
+        cur.execute(CREATE_BACKFILL_JOBS_INDEX_SQL)
+
+
+def split_windows(start: datetime, end: datetime, window: timedelta = DEFAULT_WINDOW) -> List[Tuple[datetime, datetime]]:
+    """
+    Split [start, end) into windows aligned to multiples of ``window``.
+
+    Alignment keeps job keys stable, so enqueueing an overlapping range twice
+    doesn't create overlapping jobs. Only the first and last window may be short.
+    """
+    windows = []
+    step = window.total_seconds()
+    current = start
+    while current < end:
+        boundary = (int(current.timestamp() // step) + 1) * step
+        window_end = min(current + timedelta(seconds=boundary - current.timestamp()), end)
+        windows.append((current, window_end))
+        current = window_end
+    return windows
+
+
+def enqueue(raw_conn, collector: str, symbols: Iterable[str], windows: Iterable[Tuple[datetime, datetime]],
+            max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> int:
+    """
+    Add (symbol, window) jobs and commit. Jobs already queued are left as-is.
+
+    Returns:
+        Number of new jobs
+    """
+    windows = list(windows)
+    created = 0
+    with raw_conn.cursor() as cur:
+        for symbol in symbols:
+            for window_start, window_end in windows:
+                cur.execute(INSERT_JOB_SQL, (collector, symbol, window_start, window_end, max_attempts))
+                created += max(cur.rowcount, 0)
+    raw_conn.commit()
+    return created
+
+
+def claim(raw_conn, collector: str, worker_id: str,
+          stale_after: timedelta = DEFAULT_STALE_AFTER) -> Optional[BackfillJob]:
+    """
+    Claim the newest claimable job for a collector and commit.
+
+    Pending jobs past their ``not_before`` and running jobs with a stale
+    claim are claimable while they have attempts left; a stale claim on the
+    last attempt is marked failed instead. Rows locked by another worker's
+    claim are skipped.
+
+    Returns:
+        The claimed job, or None if the queue is drained
+    """
+    with raw_conn.cursor() as cur:
+        cur.execute(CLAIM_JOB_SQL, {'worker_id': worker_id, 'collector': collector, 'stale_after': stale_after})
+        row = cur.fetchone()
+    raw_conn.commit()
+    return BackfillJob(*row) if row else None
+
+
+def complete(raw_conn, job_id: int, rows_fetched: int, rows_inserted: int, seconds: float) -> None:
+    """Mark a job done with its row counts and duration, and commit."""
+    with raw_conn.cursor() as cur:
+        cur.execute(COMPLETE_JOB_SQL, (rows_fetched, rows_inserted, seconds, job_id))
+    raw_conn.commit()
+
+
+def fail(raw_conn, job_id: int, error: str, backoff: timedelta = DEFAULT_RETRY_BACKOFF) -> None:
+    """
+    Return a job to the queue, or mark it failed once out of attempts, and commit.
+
+    A returned job isn't claimable again for ``backoff``, doubled for each
+    attempt already made.
+    """
+    with raw_conn.cursor() as cur:
+        cur.execute(FAIL_JOB_SQL, (backoff, error[:1000], job_id))
+    raw_conn.commit()
+
+
+def report(raw_conn, collector: str) -> Dict:
+    """
+    Summarize queue progress and worker throughput.
+
+    Returns:
+        Dict with per-symbol job counts by status and per-worker throughput
+    """
+    with raw_conn.cursor() as cur:
+        cur.execute(STATUS_REPORT_SQL, (collector,))
+        status_rows = cur.fetchall()
+        cur.execute(WORKER_REPORT_SQL, (collector,))
+        worker_rows = cur.fetchall()
+
+    symbols: Dict[str, Dict] = {}
+    for symbol, status, jobs, fetched, inserted in status_rows:
+        entry = symbols.setdefault(symbol, {'jobs': {}, 'rows_fetched': 0, 'rows_inserted': 0})
+        entry['jobs'][status] = jobs
+        entry['rows_fetched'] += fetched
+        entry['rows_inserted'] += inserted
+
+    workers = {}
+    for worker_id, jobs, inserted, busy_seconds, first_claim, last_finish in worker_rows:
+        elapsed = (last_finish - first_claim).total_seconds() if first_claim and last_finish else 0
+        workers[worker_id] = {
+            'jobs_done': jobs,
+            'rows_inserted': inserted,
+            'busy_seconds': round(busy_seconds, 1),
+            'rows_per_second': round(inserted / elapsed, 1) if elapsed > 0 else None,
+        }
+
+    totals: Dict[str, int] = {}
+    for entry in symbols.values():
+        for status, jobs in entry['jobs'].items():
+            totals[status] = totals.get(status, 0) + jobs
+    return {'collector': collector, 'jobs': totals, 'symbols': symbols, 'workers': workers}
@@ -0,0 +1,129 @@
+"""
+Bulk write helpers for collectors.
+
+Rows are streamed into a temporary staging table with ``COPY FROM STDIN`` and
+merged into the target table with a single ``INSERT ... SELECT ... ON CONFLICT
+DO NOTHING``, so a batch costs a constant number of round trips instead of one
+per row.
+
+Lists are written as Postgres array literals (for ``TEXT[]`` columns) and
+dicts as JSON (for ``JSONB`` columns).
+"""
+
+import io
+import json
+import logging
+from datetime import datetime
+from typing import Any, Iterable, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _array_literal(values: Sequence[Any]) -> str:
+    """Postgres array literal for a one-dimensional list, e.g. ``{"AAPL","MSFT"}``."""
+    items = []
+    for value in values:
+        if value is None:
+            items.append('NULL')
+        else:
+            escaped = str(value).replace('\\', '\\\\').replace('"', '\\"')
+            items.append(f'"{escaped}"')
+    return '{' + ','.join(items) + '}'
+
+
+def _format_value(value: Any) -> Any:
+    """Format a single value for a CSV ``COPY`` stream."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (list, tuple)):
+        return _array_literal(value)
+    if isinstance(value, dict):
+        return json.dumps(value, default=str)
+    return value
+
+
+def _csv_field(value: Any) -> str:
+    """Quote a formatted value where ``COPY ... CSV`` would otherwise misread it."""
+    if value is None:
+        return ''
+    text = str(value)
+    # '\.' alone on a line would end the COPY data
+    if text in ('', '\\.') or any(char in text for char in ',"\r\n'):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def rows_to_csv(rows: Iterable[Sequence[Any]]) -> Tuple[io.StringIO, int]:
+    """
+    Serialize rows into an in-memory CSV buffer suitable for ``COPY``.
+
+    ``None`` is written as an unquoted empty field, which ``COPY ... CSV`` reads
+    as NULL; empty strings are quoted so they stay empty strings, as the
+    per-row INSERT paths stored them.
+
+    Args:
+        rows: Iterable of row tuples, in column order
+
+    Returns:
+        Tuple of (buffer positioned at the start, number of rows written)
+    """
+    buffer = io.StringIO()
+    count = 0
+    for row in rows:
+        buffer.write(','.join(_csv_field(_format_value(v)) for v in row) + '\n')
+        count += 1
+    buffer.seek(0)
+    return buffer, count
+
+
+def copy_merge(raw_conn, target_table: str, columns: Sequence[str],
+               rows: Iterable[Sequence[Any]], conflict_columns: Sequence[str]) -> Tuple[int, int]:
+    """
+    Bulk insert rows into ``target_table`` through a temporary staging table.
+
+    The staging table is created with the target's column types, filled with a
+    single ``COPY FROM STDIN`` and merged with one ``INSERT ... SELECT ... ON
+    CONFLICT DO NOTHING``. The caller owns the transaction: nothing is committed
+    here, so other writes (e.g. watermarks) can share the same commit.
+
+    Args:
+        raw_conn: DB-API (psycopg2) connection
+        target_table: Schema-qualified target table (e.g. 'trading.darkpool_trades')
+        columns: Column names, in the same order as each row
+        rows: Iterable of row tuples
+        conflict_columns: Columns of the unique constraint to dedupe on
+
+    Returns:
+        Tuple of (rows inserted, rows skipped as duplicates)
+    """
+    buffer, staged = rows_to_csv(rows)
+    if not staged:
+        return 0, 0
+
+    staging_table = f"stage_{target_table.split('.')[-1]}"
+    column_list = ', '.join(columns)
+
+    with raw_conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {staging_table}")
+        cur.execute(f"""
+            CREATE TEMP TABLE {staging_table} ON COMMIT DROP AS
+            SELECT {column_list} FROM {target_table} WITH NO DATA
+        """)
+        cur.copy_expert(
+            f"COPY {staging_table} ({column_list}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+        cur.execute(f"""
+            INSERT INTO {target_table} ({column_list})
+            SELECT {column_list} FROM {staging_table}
+            ON CONFLICT ({', '.join(conflict_columns)}) DO NOTHING
+        """)
+        inserted = max(cur.rowcount, 0)
+
+    duplicates = staged - inserted
+    logger.debug(f"COPY merge into {target_table}: {inserted} inserted, {duplicates} duplicates")
+    return inserted, duplicates
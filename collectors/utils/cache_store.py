@@ -0,0 +1,228 @@
+"""
+Single-file response cache with a TTL index and an LRU byte budget.
+
+Replaces the one-pickle-per-request cache directories, which had no size
+bound and were cleaned by globbing and stat-ing every file whenever a
+collector was created. Entries live in one SQLite file:
+
+    cache = cache_store(Path('cache/news.sqlite3'), ttl=7 * 86400, max_bytes=64 * 2 ** 20)
+    articles = cache.get(key)
+    if articles is None:
+        articles = fetch()
+        cache.set(key, articles)
+
+* ``get`` only returns unexpired entries and refreshes their LRU position;
+* each ``set`` deletes at most ``EXPIRE_BATCH`` expired rows (through the
+  ``expires_at`` index), so cleanup is incremental rather than a full scan;
+* when the stored bytes exceed ``max_bytes``, least recently used entries
+  are evicted (through the ``accessed_at`` index) until they fit.
+
+Responses for closed time windows (see ``time_buckets``) never go stale and
+are stored with ``ttl=NO_EXPIRY``.
+
+The running byte total is kept in the file itself, so several processes can
+share a cache. Values are JSON. ``stats()`` reports hits, misses, evictions
+and expirations for this process.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+from collectors.utils.records import loads
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 7 * 24 * 3600  # seconds
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+NO_EXPIRY = float('inf')  # ttl for entries that never go stale; only LRU eviction removes them
+EXPIRE_BATCH = 100  # expired rows deleted per write
+BUSY_TIMEOUT = 5.0  # seconds to wait on another process's write lock
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at);
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (name, value) SELECT 'bytes', COALESCE(SUM(size), 0) FROM entries;
+"""
+
+
+class CacheStore:
+    """
+    Thread-safe SQLite-backed cache.
+
+    Args:
+        path: Cache file (parent directories are created)
+        ttl: Default seconds an entry stays valid
+        max_bytes: Budget for stored values; LRU entries are evicted beyond it
+    """
+
+    def __init__(self, path: Union[str, Path], ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES,
+                 clock: Callable[[], float] = time.time):
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        # Reopened after fork: a SQLite handle must not cross into a child
+        if self._conn is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=BUSY_TIMEOUT, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value for ``key``, or None if it is missing or expired."""
+        now = self._clock()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute('SELECT value, expires_at FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None or row[1] <= now:
+                self.misses += 1
+                return None
+            conn.execute('UPDATE entries SET accessed_at = ? WHERE key = ?', (now, key))
+            self.hits += 1
+        return loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a JSON-serializable value, then expire and evict as needed."""
+        payload = json.dumps(value, default=str).encode()
+        now = self._clock()
+        expires_at = now + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            conn = self._connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                old = conn.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+                conn.execute(
+                    'INSERT OR REPLACE INTO entries (key, value, size, expires_at, accessed_at) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (key, payload, len(payload), expires_at, now)
+                )
+                self._add_bytes(conn, len(payload) - (old[0] if old else 0))
+                self.expirations += self._delete(
+                    conn, 'SELECT key FROM entries WHERE expires_at <= ? LIMIT ?', (now, EXPIRE_BATCH)
+                )
+                self._evict(conn, key)
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+    def _add_bytes(self, conn: sqlite3.Connection, delta: int) -> None:
+        conn.execute("UPDATE meta SET value = value + ? WHERE name = 'bytes'", (delta,))
+
+    def _bytes(self, conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT value FROM meta WHERE name = 'bytes'").fetchone()[0]
+
+    def _delete(self, conn: sqlite3.Connection, select_keys: str, params: tuple) -> int:
+        """Delete the rows ``select_keys`` picks, keeping the byte total in step."""
+        rows = conn.execute(f'SELECT key, size FROM entries WHERE key IN ({select_keys})', params).fetchall()
+        if not rows:
+            return 0
+        conn.executemany('DELETE FROM entries WHERE key = ?', [(key,) for key, _ in rows])
+        self._add_bytes(conn, -sum(size for _, size in rows))
+        return len(rows)
+
+    def _evict(self, conn: sqlite3.Connection, keep: str) -> None:
+        """Evict least recently used entries (never ``keep``) until under the byte budget."""
+        excess = self._bytes(conn) - self.max_bytes
+        while excess > 0:
+            rows = conn.execute(
+                'SELECT key, size FROM entries WHERE key != ? ORDER BY accessed_at LIMIT ?', (keep, EXPIRE_BATCH)
+            ).fetchall()
+            if not rows:
+                break
+            victims = []
+            for key, size in rows:
+                victims.append((key, size))
+                excess -= size
+                if excess <= 0:
+                    break
+            conn.executemany('DELETE FROM entries WHERE key = ?', [(key,) for key, _ in victims])
+            self._add_bytes(conn, -sum(size for _, size in victims))
+            self.evictions += len(victims)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._delete(conn, 'SELECT key FROM entries WHERE key = ?', (key,))
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, stored bytes and this process's hit/miss/evict counters."""
+        with self._lock:
+            conn = self._connection()
+            entries = conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+            stored = self._bytes(conn)
+            lookups = self.hits + self.misses
+            return {
+                'entries': entries,
+                'bytes': stored,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+_stores: Dict[str, CacheStore] = {}
+_stores_lock = threading.Lock()
+
+
+def cache_store(path: Union[str, Path], ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES) -> CacheStore:
+    """
+    Get the process-wide cache for a file, so it outlives collector instances.
+
+    The first caller's ``ttl`` and ``max_bytes`` configure the store.
+    """
+    key = str(Path(path).resolve())
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = CacheStore(path, ttl, max_bytes)
+        return store
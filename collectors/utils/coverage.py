@@ -0,0 +1,220 @@
+"""
+Coverage index of collected time slots.
+
+Each collector stream (e.g. a dark pool symbol) keeps one bitmap per UTC day in
+``trading.collector_coverage``: bit ``i`` marks the ``i``-th 5-minute slot of
+the day as covered. Bitmaps are OR-merged on write, so marking is idempotent
+and concurrent writers never clear each other's bits.
+
+Backfill planning and completeness reports read a few 288-bit rows per day
+range instead of grouping over the data table.
+
+Database helpers take a DB-API (psycopg2) connection and never commit, so
+coverage can be marked in the same transaction as the rows it describes.
+"""
+
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+SLOT_SECONDS = 300
+SLOTS_PER_DAY = 24 * 60 * 60 // SLOT_SECONDS
+FULL_DAY = (1 << SLOTS_PER_DAY) - 1
+
+CREATE_COVERAGE_SQL = f"""
+CREATE TABLE IF NOT EXISTS trading.collector_coverage (
+    collector VARCHAR(50) NOT NULL,
+    stream_key VARCHAR(100) NOT NULL,
+    day DATE NOT NULL,
+    slots BIT({SLOTS_PER_DAY}) NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (collector, stream_key, day)
+)
+"""
+
+UPSERT_COVERAGE_SQL = f"""
+INSERT INTO trading.collector_coverage (collector, stream_key, day, slots, updated_at)
+VALUES (%s, %s, %s, %s::bit({SLOTS_PER_DAY}), NOW())
+ON CONFLICT (collector, stream_key, day) DO UPDATE
+SET slots = trading.collector_coverage.slots | EXCLUDED.slots,
+    updated_at = NOW()
+"""
+
+SELECT_COVERAGE_SQL = """
+SELECT day, slots::text
+FROM trading.collector_coverage
+WHERE collector = %s AND stream_key = %s AND day BETWEEN %s AND %s
+"""
+
+Window = Tuple[datetime, datetime]
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def slot_of(value: datetime) -> Tuple[date, int]:
+    """Return the (UTC day, slot index) containing a timestamp."""
+    value = _as_utc(value)
+    seconds = value.hour * 3600 + value.minute * 60 + value.second
+    return value.date(), seconds // SLOT_SECONDS
+
+
+def slot_start(day: date, slot: int) -> datetime:
+    """Return the UTC start time of a slot."""
+    return datetime.combine(day, time(0), tzinfo=timezone.utc) + timedelta(seconds=slot * SLOT_SECONDS)
+
+
+def mask_to_bits(mask: int) -> str:
+    """Encode a day mask as a ``BIT(288)`` literal, slot 0 leftmost."""
+    return format(mask, f'0{SLOTS_PER_DAY}b')[::-1]
+
+
+def bits_to_mask(bits: str) -> int:
+    """Decode a ``BIT(288)`` text value into a day mask."""
+    return int(bits[::-1], 2) if bits else 0
+
+
+def _slot_span(start: datetime, end: datetime, full_only: bool) -> Iterable[Tuple[date, int]]:
+    """Yield (day, mask) for the slots overlapping (or fully inside) [start, end)."""
+    start, end = _as_utc(start), _as_utc(end)
+    if end <= start:
+        return
+    first_day, first_slot = slot_of(start)
+    last_day, last_slot = slot_of(end)
+    if full_only:
+        if slot_start(first_day, first_slot) < start:
+            first_slot += 1
+    elif slot_start(last_day, last_slot) < end:
+        last_slot += 1
+    # last_slot is exclusive from here on
+    day = first_day
+    while day <= last_day:
+        lo = first_slot if day == first_day else 0
+        hi = last_slot if day == last_day else SLOTS_PER_DAY
+        lo, hi = max(lo, 0), min(hi, SLOTS_PER_DAY)
+        if hi > lo:
+            yield day, ((1 << hi) - 1) ^ ((1 << lo) - 1)
+        day += timedelta(days=1)
+
+
+def window_masks(start: datetime, end: datetime, full_only: bool = False) -> Dict[date, int]:
+    """
+    Build day masks for a time window.
+
+    Args:
+        start: Window start (inclusive)
+        end: Window end (exclusive)
+        full_only: Only include slots lying entirely inside the window
+
+    Returns:
+        Dict of UTC day -> slot mask
+    """
+    return dict(_slot_span(start, end, full_only))
+
+
+def batch_coverage(rows: Iterable[Sequence], key_index: int, time_index: int) -> Dict[Tuple[str, date], int]:
+    """
+    Compute the slots touched by a batch of row tuples.
+
+    Returns:
+        Dict of (stream key, UTC day) -> slot mask
+    """
+    masks: Dict[Tuple[str, date], int] = {}
+    for row in rows:
+        value = row[time_index]
+        if value is None:
+            continue
+        day, slot = slot_of(value)
+        key = (row[key_index], day)
+        masks[key] = masks.get(key, 0) | (1 << slot)
+    return masks
+
+
+def missing_windows(masks: Dict[date, int], start: datetime, end: datetime) -> List[Window]:
+    """
+    Find the uncovered parts of [start, end), merged into contiguous windows.
+
+    Slot boundaries are clipped to the requested window, so a partially
+    overlapping slot that isn't covered is reported for the overlap only.
+
+    Args:
+        masks: Dict of UTC day -> covered slot mask
+        start: Window start (inclusive)
+        end: Window end (exclusive)
+
+    Returns:
+        List of (start, end) windows, oldest first
+    """
+    start, end = _as_utc(start), _as_utc(end)
+    windows: List[Window] = []
+    for day, wanted in _slot_span(start, end, full_only=False):
+        gaps = wanted & ~masks.get(day, 0)
+        slot = 0
+        while gaps:
+            if not gaps & 1:
+                skip = (gaps & -gaps).bit_length() - 1
+                gaps >>= skip
+                slot += skip
+                continue
+            run = (~gaps & (gaps + 1)).bit_length() - 1
+            gap_start = max(slot_start(day, slot), start)
+            gap_end = min(slot_start(day, slot + run), end)
+            if windows and windows[-1][1] == gap_start:
+                windows[-1] = (windows[-1][0], gap_end)
+            else:
+                windows.append((gap_start, gap_end))
+            gaps >>= run
+            slot += run
+    return windows
+
+
+def covered_fraction(masks: Dict[date, int], start: datetime, end: datetime) -> float:
+    """Fraction of the slots overlapping [start, end) that are covered."""
+    wanted = total = 0
+    for day, span in _slot_span(start, end, full_only=False):
+        total += bin(span).count('1')
+        wanted += bin(span & masks.get(day, 0)).count('1')
+    return wanted / total if total else 1.0
+
+
+class CoverageIndex:
+    """Slot coverage bitmaps for one collector."""
+
+    def __init__(self, collector: str):
+        self.collector = collector
+
+    @staticmethod
+    def ensure_table(raw_conn) -> None:
+        """Create ``trading.collector_coverage`` if it doesn't exist."""
+        with raw_conn.cursor() as cur:
+            cur.execute("CREATE SCHEMA IF NOT EXISTS trading")
+            cur.execute(CREATE_COVERAGE_SQL)
+
+    def mark(self, raw_conn, masks: Dict[Tuple[str, date], int]) -> None:
+        """OR slot masks into the stored bitmaps inside the caller's transaction."""
+        if not masks:
+            return
+        with raw_conn.cursor() as cur:
+            for (stream_key, day), mask in masks.items():
+                cur.execute(UPSERT_COVERAGE_SQL, (self.collector, stream_key, day, mask_to_bits(mask)))
+
+    def mark_window(self, raw_conn, stream_key: str, start: datetime, end: datetime) -> None:
+        """Mark every slot lying entirely inside [start, end) as covered."""
+        masks = window_masks(start, end, full_only=True)
+        self.mark(raw_conn, {(stream_key, day): mask for day, mask in masks.items()})
+
+    def load(self, raw_conn, stream_key: str, start: datetime, end: datetime) -> Dict[date, int]:
+        """Load the day masks for a stream over [start, end)."""
+        start, end = _as_utc(start), _as_utc(end)
+        with raw_conn.cursor() as cur:
+            cur.execute(SELECT_COVERAGE_SQL, (self.collector, stream_key, start.date(), end.date()))
+            return {day: bits_to_mask(bits) for day, bits in cur.fetchall()}
+
+    def missing(self, raw_conn, stream_key: str, start: datetime, end: datetime) -> List[Window]:
+        """Return the uncovered windows of [start, end) for a stream."""
+        return missing_windows(self.load(raw_conn, stream_key, start, end), start, end)
@@ -0,0 +1,257 @@
+"""
+Central ledger of Unusual Whales API credits, shared by every collector.
+
+Collectors used to count requests in instance attributes that reset on every
+run, so nothing knew how much of the daily budget had gone. Each request now
+reserves its credits in ``trading.api_credit_ledger`` before it is sent:
+
+    client = UWClient(headers=DEFAULT_HEADERS, reserve=credit_ledger().reserver('news'))
+    backfill_client.reserve = credit_ledger().reserver('news', LOW)
+
+The table holds one counter row per UTC day, collector and endpoint, plus a
+day-total row (``collector = endpoint = '*'``). A reservation is one
+statement: the total row is only incremented while it stays within the
+priority's cap, so concurrent collectors can never overshoot it together.
+``HIGH`` priority work (live collection) may use the whole daily budget;
+``LOW`` priority work (backfills, earnings history) is refused from
+``LOW_PRIORITY_SHARE`` of it, leaving the rest for live data. Refusals raise
+``CreditBudgetExceeded`` and are counted per collector and endpoint.
+
+If the ledger can't be reached, high-priority requests go ahead (logged and
+counted as unrecorded) and low-priority ones are refused; the database isn't
+retried for ``OUTAGE_BACKOFF`` seconds.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Union
+
+from collectors.utils.db_pool import pg_connection
+
+logger = logging.getLogger(__name__)
+
+UW_DAILY_CREDITS = 15000
+LOW_PRIORITY_SHARE = 0.8  # Share of the daily budget low-priority work may use
+OUTAGE_BACKOFF = 60  # Seconds before retrying an unreachable ledger
+HIGH = 'high'
+LOW = 'low'
+TOTAL = '*'  # collector and endpoint of the day-total row
+
+CREATE_CREDIT_LEDGER_SQL = """
+CREATE TABLE IF NOT EXISTS trading.api_credit_ledger (
+    day DATE NOT NULL,
+    collector VARCHAR(50) NOT NULL,
+    endpoint VARCHAR(100) NOT NULL,
+    credits INTEGER NOT NULL DEFAULT 0,
+    refused INTEGER NOT NULL DEFAULT 0,
+    first_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (day, collector, endpoint)
+)
+"""
+
+# The day total only grows while it stays within %(cap)s; an empty ``total``
+# means the reservation was refused, which is then counted instead
+RESERVE_SQL = """
+WITH total AS (
+    INSERT INTO trading.api_credit_ledger AS l (day, collector, endpoint, credits)
+    VALUES (%(day)s, '*', '*', %(credits)s)
+    ON CONFLICT (day, collector, endpoint) DO UPDATE
+    SET credits = l.credits + EXCLUDED.credits, updated_at = NOW()
+    WHERE l.credits + EXCLUDED.credits <= %(cap)s
+    RETURNING l.credits
+), granted AS (
+    SELECT EXISTS (SELECT 1 FROM total) AS ok
+)
+INSERT INTO trading.api_credit_ledger AS l (day, collector, endpoint, credits, refused)
+SELECT %(day)s, %(collector)s, %(endpoint)s,
+       CASE WHEN granted.ok THEN %(credits)s ELSE 0 END,
+       CASE WHEN granted.ok THEN 0 ELSE 1 END
+FROM granted
+ON CONFLICT (day, collector, endpoint) DO UPDATE
+SET credits = l.credits + EXCLUDED.credits,
+    refused = l.refused + EXCLUDED.refused,
+    updated_at = NOW()
+RETURNING (SELECT credits FROM total)
+"""
+
+
+class CreditBudgetExceeded(RuntimeError):
+    """A request was refused: its priority's share of today's credits is used up."""
+
+
+class CreditLedger:
+    """
+    Daily API credit budget kept in the database.
+
+    Args:
+        daily_credits: Credits per UTC day across all collectors
+        low_priority_share: Share of ``daily_credits`` low-priority work may use
+        config: DB config for ``pg_connection`` (default: ``get_db_config()``)
+        clock: Returns the current aware datetime
+    """
+
+    def __init__(self, daily_credits: int = UW_DAILY_CREDITS, low_priority_share: float = LOW_PRIORITY_SHARE,
+                 config: Optional[Dict[str, Any]] = None, clock: Optional[Callable[[], datetime]] = None):
+        if daily_credits <= 0:
+            raise ValueError("daily_credits must be positive")
+        if not 0 < low_priority_share <= 1:
+            raise ValueError("low_priority_share must be in (0, 1]")
+        self.daily_credits = daily_credits
+        self.low_priority_share = low_priority_share
+        self.config = config
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+        self._lock = threading.Lock()
+        self._unavailable_until = 0.0
+        self.reserved = 0
+        self.refused = 0
+        self.unrecorded = 0
+
+    @staticmethod
+    def ensure_table(raw_conn) -> None:
+        """Create ``trading.api_credit_ledger`` if it doesn't exist."""
+        with raw_conn.cursor() as cur:
+            cur.execute("CREATE SCHEMA IF NOT EXISTS trading")
+            cur.execute(CREATE_CREDIT_LEDGER_SQL)
+
+    def cap(self, priority: str = HIGH) -> int:
+        """Day total up to which work of ``priority`` is admitted."""
+        if priority == LOW:
+            return int(self.daily_credits * self.low_priority_share)
+        return self.daily_credits
+
+    def reserve(self, collector: str, endpoint: str, credits: int = 1, priority: str = HIGH) -> Optional[int]:
+        """
+        Take credits from today's budget before sending a request.
+
+        Returns:
+            Credits used today including these, or None if the ledger was unreachable
+
+        Raises:
+            CreditBudgetExceeded: The day total would pass ``cap(priority)``
+        """
+        if time.monotonic() < self._unavailable_until:
+            return self._unrecorded(collector, endpoint, priority)
+        params = {
+            'day': self._clock().astimezone(timezone.utc).date(),
+            'collector': collector,
+            'endpoint': endpoint,
+            'credits': credits,
+            'cap': self.cap(priority),
+        }
+        try:
+            with pg_connection(self.config) as conn:
+                with conn.cursor() as cur:
+                    cur.execute(RESERVE_SQL, params)
+                    used = cur.fetchone()[0]
+        except Exception as e:
+            logger.warning(f"Credit ledger unavailable: {str(e)}")
+            self._unavailable_until = time.monotonic() + OUTAGE_BACKOFF
+            return self._unrecorded(collector, endpoint, priority)
+
+        with self._lock:
+            if used is None:
+                self.refused += 1
+            else:
+                self.reserved += credits
+        if used is None:
+            raise CreditBudgetExceeded(
+                f"{collector} {endpoint}: {priority}-priority budget of {params['cap']} credits used up "
+                f"for {params['day']}"
+            )
+        return used
+
+    def reserver(self, collector: str,
+                 priority: Union[str, Callable[[str], str]] = HIGH) -> Callable[[str], Optional[int]]:
+        """
+        ``UWClient(reserve=...)`` hook charging one credit per attempt to ``collector``.
+
+        Args:
+            priority: ``HIGH``/``LOW``, or a function of the endpoint template returning one
+        """
+        def reserve(endpoint: str) -> Optional[int]:
+            level = priority(endpoint) if callable(priority) else priority
+            return self.reserve(collector, endpoint, priority=level)
+        return reserve
+
+    def _unrecorded(self, collector: str, endpoint: str, priority: str) -> None:
+        if priority == LOW:
+            with self._lock:
+                self.refused += 1
+            raise CreditBudgetExceeded(f"{collector} {endpoint}: credit ledger unavailable, low-priority work paused")
+        with self._lock:
+            self.unrecorded += 1
+        return None
+
+    def usage(self, raw_conn, day=None) -> Dict[str, Any]:
+        """
+        Today's (or ``day``'s) credits per collector and endpoint, with burn rate and projected exhaustion.
+
+        The burn rate averages the day total since its first reservation;
+        exhaustion is projected at that rate and left None when it falls after
+        the day resets.
+        """
+        now = self._clock().astimezone(timezone.utc)
+        day = day or now.date()
+        with raw_conn.cursor() as cur:
+            cur.execute(
+                "SELECT collector, endpoint, credits, refused, first_at, updated_at "
+                "FROM trading.api_credit_ledger WHERE day = %s ORDER BY credits DESC",
+                (day,)
+            )
+            rows = cur.fetchall()
+
+        used, first_at, endpoints = 0, None, []
+        for collector, endpoint, credits, refused, row_first_at, updated_at in rows:
+            if collector == TOTAL and endpoint == TOTAL:
+                used, first_at = credits, row_first_at
+                continue
+            endpoints.append({
+                'collector': collector,
+                'endpoint': endpoint,
+                'credits': credits,
+                'refused': refused,
+                'updated_at': updated_at.isoformat() if updated_at else None,
+            })
+
+        burn_per_hour = 0.0
+        exhausted_at = None
+        if first_at is not None and day == now.date():
+            hours = max((now - first_at).total_seconds() / 3600, 1 / 60)
+            burn_per_hour = used / hours
+            if burn_per_hour > 0:
+                projected = now + timedelta(hours=max(self.daily_credits - used, 0) / burn_per_hour)
+                day_end = datetime.combine(day + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+                if projected < day_end:
+                    exhausted_at = projected.isoformat()
+
+        return {
+            'day': day.isoformat(),
+            'daily_credits': self.daily_credits,
+            'low_priority_cap': self.cap(LOW),
+            'used': used,
+            'remaining': max(self.daily_credits - used, 0),
+            'burn_per_hour': round(burn_per_hour, 1),
+            'projected_exhaustion': exhausted_at,
+            'endpoints': endpoints,
+        }
+
+    def stats(self) -> Dict[str, int]:
+        """Credits this process reserved, and requests refused or sent unrecorded."""
+        with self._lock:
+            return {'reserved': self.reserved, 'refused': self.refused, 'unrecorded': self.unrecorded}
+
+
+_ledger: Optional[CreditLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def credit_ledger() -> CreditLedger:
+    """Process-wide ledger over the default database."""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = CreditLedger()
+        return _ledger
@@ -0,0 +1,366 @@
+"""
+Process-wide database pool registry.
+
+Collectors, the dashboard and the DB log writers get their connections here
+instead of building an engine per instance or calling ``psycopg2.connect``
+per write. There is one pooled SQLAlchemy engine and one psycopg2 pool per
+DSN per process:
+
+    engine = get_engine()                  # SQLAlchemy, for pandas/text() code
+    with pg_connection() as conn:          # psycopg2, commit on success
+        ...
+
+Both pools are reset after ``fork()``, so Celery prefork workers and
+``multiprocessing`` children open their own connections instead of sharing
+the parent's sockets. ``pool_stats()`` reports checked-out connections and
+time spent waiting for one.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Union
+from urllib.parse import quote_plus, urlsplit, urlunsplit
+
+import psycopg2
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = 5
+MAX_OVERFLOW = 10
+POOL_TIMEOUT = 30  # seconds to wait for a free connection
+POOL_RECYCLE = 1800  # seconds
+PG_POOL_MAX = 10
+
+DbConfig = Union[str, Mapping[str, Any], None]
+
+
+def dsn_from_config(config: DbConfig = None) -> str:
+    """
+    Normalize a DB config dict (``get_db_config()`` shape) or URL into a DSN.
+
+    Defaults to ``config.db_config.get_db_config()``.
+    """
+    if isinstance(config, str):
+        return config
+    if config is None:
+        from config.db_config import get_db_config
+        config = get_db_config()
+    dsn = (
+        f"postgresql://{quote_plus(str(config['user']))}:{quote_plus(str(config.get('password') or ''))}"
+        f"@{config['host']}:{config.get('port') or 5432}/{config['dbname']}"
+    )
+    if config.get('sslmode'):
+        dsn += f"?sslmode={config['sslmode']}"
+    return dsn
+
+
+def _redact(dsn: str) -> str:
+    """DSN with the password masked, for stats and logs."""
+    parts = urlsplit(dsn)
+    if parts.password is None:
+        return dsn
+    netloc = parts.netloc.replace(f":{parts.password}@", ":***@", 1)
+    return urlunsplit(parts._replace(netloc=netloc))
+
+
+class PoolStats:
+    """Checkout counters and wait times for one pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_seconds = 0.0
+            self.max_wait_seconds = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_seconds_total': round(self.wait_seconds, 3),
+                'wait_seconds_avg': round(self.wait_seconds / self.checkouts, 4) if self.checkouts else 0.0,
+                'wait_seconds_max': round(self.max_wait_seconds, 3),
+            }
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self):
+        start = time.monotonic()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            self.stats.record_timeout()
+            raise
+        self.stats.record_wait(time.monotonic() - start)
+        return connection
+
+
+class PgPool:
+    """
+    Blocking, thread-safe psycopg2 connection pool.
+
+    Unlike ``psycopg2.pool.ThreadedConnectionPool`` it waits for a free
+    connection (up to ``timeout``) instead of raising when exhausted, and
+    replaces connections that were closed under it.
+    """
+
+    def __init__(self, dsn: str, maxconn: int = PG_POOL_MAX, timeout: float = POOL_TIMEOUT,
+                 connect: Callable[[str], Any] = psycopg2.connect):
+        if maxconn <= 0:
+            raise ValueError("maxconn must be positive")
+        self.dsn = dsn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self._connect = connect
+        self.stats = PoolStats()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._cond = threading.Condition()
+        self._idle: List[Any] = []
+        self._opened = 0
+        self._out = set()  # ids of checked-out connections
+
+    def getconn(self):
+        """
+        Check out a connection, opening one if the pool isn't full.
+
+        Raises:
+            TimeoutError: No connection was freed within ``timeout`` seconds
+        """
+        start = time.monotonic()
+        deadline = start + self.timeout
+        with self._cond:
+            while not self._idle and self._opened >= self.maxconn:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats.record_timeout()
+                    raise TimeoutError(f"No connection free in {_redact(self.dsn)} pool after {self.timeout}s")
+                self._cond.wait(remaining)
+            conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                self._opened += 1
+
+        if conn is None or conn.closed:
+            try:
+                conn = self._connect(self.dsn)
+            except Exception:
+                with self._cond:
+                    self._opened -= 1
+                    self._cond.notify()
+                raise
+        with self._cond:
+            self._out.add(id(conn))
+        self.stats.record_wait(time.monotonic() - start)
+        return conn
+
+    def putconn(self, conn, close: bool = False) -> None:
+        """Return a connection, rolling back any open transaction."""
+        with self._cond:
+            if id(conn) not in self._out:
+                # Checked out before a fork: the parent's socket, leave it alone
+                return
+        if not close and not conn.closed:
+            try:
+                conn.rollback()
+            except Exception:
+                close = True
+        if close or conn.closed:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        with self._cond:
+            self._out.discard(id(conn))
+            if close or conn.closed:
+                self._opened -= 1
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Check out a connection; commit on success, roll back on error."""
+        conn = self.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            self.putconn(conn)
+
+    def closeall(self) -> None:
+        """Close idle connections; checked-out ones still return to the pool."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._opened -= len(idle)
+        for conn in idle:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def reset_after_fork(self) -> None:
+        """Forget the parent's connections without closing them (they're the parent's sockets)."""
+        self._reset()
+        self.stats.reset()
+
+    def status(self) -> Dict[str, Any]:
+        with self._cond:
+            status = {
+                'max_size': self.maxconn,
+                'open': self._opened,
+                'idle': len(self._idle),
+                'checked_out': len(self._out),
+            }
+        status.update(self.stats.as_dict())
+        return status
+
+
+_lock = threading.Lock()
+_engines: Dict[str, Engine] = {}
+_pg_pools: Dict[str, PgPool] = {}
+
+
+def get_engine(config: DbConfig = None, pool_size: int = POOL_SIZE, max_overflow: int = MAX_OVERFLOW,
+               pool_timeout: float = POOL_TIMEOUT, pool_recycle: int = POOL_RECYCLE, **kwargs) -> Engine:
+    """
+    Shared pooled SQLAlchemy engine for a DSN.
+
+    Pool settings only apply to the first call for a DSN; later calls get the
+    existing engine.
+    """
+    dsn = dsn_from_config(config)
+    with _lock:
+        engine = _engines.get(dsn)
+        if engine is None:
+            logger.info(f"Creating pooled engine for {_redact(dsn)}")
+            engine = create_engine(
+                dsn,
+                poolclass=TimedQueuePool,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_timeout=pool_timeout,
+                pool_recycle=pool_recycle,
+                pool_pre_ping=True,
+                **kwargs
+            )
+            _engines[dsn] = engine
+        return engine
+
+
+def get_pg_pool(config: DbConfig = None, maxconn: int = PG_POOL_MAX) -> PgPool:
+    """Shared psycopg2 pool for a DSN. ``maxconn`` only applies to the first call."""
+    dsn = dsn_from_config(config)
+    with _lock:
+        pool = _pg_pools.get(dsn)
+        if pool is None:
+            pool = _pg_pools[dsn] = PgPool(dsn, maxconn=maxconn)
+        return pool
+
+
+@contextmanager
+def pg_connection(config: DbConfig = None) -> Iterator[Any]:
+    """
+    Pooled psycopg2 connection; commits on success, rolls back on error.
+
+    Drop-in for ``with psycopg2.connect(**config) as conn:``, except the
+    connection goes back to the pool instead of staying open.
+    """
+    with get_pg_pool(config).connection() as conn:
+        yield conn
+
+
+def engine_stats(engine: Engine) -> Dict[str, Any]:
+    """Pool status for one engine, or {} if it isn't a registry engine."""
+    pool = getattr(engine, 'pool', None)
+    if not isinstance(pool, TimedQueuePool):
+        return {}
+    stats = {
+        'size': pool.size(),
+        'checked_out': pool.checkedout(),
+        'overflow': max(pool.overflow(), 0),
+        'idle': pool.checkedin(),
+    }
+    stats.update(pool.stats.as_dict())
+    return stats
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Status of every pool in this process, keyed by redacted DSN."""
+    with _lock:
+        engines = dict(_engines)
+        pg_pools = dict(_pg_pools)
+    return {
+        'pid': os.getpid(),
+        'engines': {_redact(dsn): engine_stats(engine) for dsn, engine in engines.items()},
+        'pg_pools': {_redact(dsn): pool.status() for dsn, pool in pg_pools.items()},
+    }
+
+
+def dispose_all() -> None:
+    """Close every pooled connection (process shutdown)."""
+    with _lock:
+        engines = list(_engines.values())
+        pg_pools = list(_pg_pools.values())
+    for engine in engines:
+        engine.dispose()
+    for pool in pg_pools:
+        pool.closeall()
+
+
+def _reset_after_fork() -> None:
+    """
+    Give a forked child fresh pools.
+
+    The child must not close or reuse the parent's connections, so engine
+    pools are replaced with ``dispose(close=False)`` and psycopg2 pools
+    forget theirs. Engines handed out before the fork stay valid.
+    """
+    global _lock
+    _lock = threading.Lock()
+    for engine in _engines.values():
+        engine.dispose(close=False)
+        if isinstance(engine.pool, TimedQueuePool):
+            engine.pool.stats.reset()
+    for pool in _pg_pools.values():
+        pool.reset_after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
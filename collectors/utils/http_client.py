@@ -0,0 +1,374 @@
+"""
+Shared HTTP client for Unusual Whales API callers.
+
+Every collector used to carry its own ``_make_request`` with its own retry
+loop, and most called bare ``requests.get``, paying a TCP and TLS handshake
+per request. Requests now go through one keep-alive ``requests.Session`` per
+process and one retry policy:
+
+    limiter = shared_limiter('uw')
+    client = UWClient(headers=DEFAULT_HEADERS, throttle=limiter.acquire, observe=limiter.observe)
+    data = client.get_json('/darkpool/SPY', params={'limit': 500})
+
+Connection errors, timeouts, 429 and 5xx responses are retried with
+exponential backoff (honouring ``Retry-After``, else a 429's rate-limit
+reset); other 4xx responses raise at once. The API's rate-limit headers are
+parsed from every response and passed to ``observe``, usually
+``shared_limiter('uw').observe``, so pacing follows the key's real budget.
+Timeouts are looked up per endpoint, and every request's latency is recorded
+in a per-endpoint histogram exported by ``latency_stats()``.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from collectors.utils.rate_limiter import RateLimitStatus
+from collectors.utils.records import loads
+
+logger = logging.getLogger(__name__)
+
+UW_BASE_URL = "https://api.unusualwhales.com/api"
+HTTP_POOL_SIZE = 10  # keep-alive connections per host
+MAX_RETRIES = 3  # attempts per request, including the first
+BACKOFF_BASE = 1.0  # seconds; doubled on each retry
+MAX_BACKOFF = 30.0
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+Timeout = Tuple[float, float]  # (connect, read) seconds
+DEFAULT_TIMEOUT: Timeout = (5.0, 30.0)
+
+# Read timeouts by endpoint template prefix; the longest matching prefix wins
+ENDPOINT_TIMEOUTS: Dict[str, Timeout] = {
+    '/darkpool/': (5.0, 20.0),
+    '/news/headlines': (5.0, 15.0),
+    '/option-trades/flow-alerts': (5.0, 20.0),
+    '/stock/': (5.0, 20.0),
+    '/market/economic-calendar': (5.0, 15.0),
+    '/earnings/': (5.0, 20.0),
+}
+
+# Rate-limit headers sent with Unusual Whales responses, by RateLimitStatus field
+RATE_LIMIT_HEADERS = {
+    'limit': 'x-uw-req-per-minute-limit',
+    'remaining': 'x-uw-req-per-minute-remaining',
+    'reset': 'x-uw-req-per-minute-reset',  # milliseconds
+    'daily_count': 'x-uw-daily-req-count',
+    'daily_limit': 'x-uw-token-req-limit',
+}
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_TICKER_SEGMENT = re.compile(r'^[A-Z][A-Z0-9.\-]{0,9}$')
+_DATE_SEGMENT = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+def endpoint_template(url: str, base_url: str = UW_BASE_URL) -> str:
+    """
+    Reduce a request URL to its endpoint, for timeouts and histograms.
+
+    ``https://api.unusualwhales.com/api/darkpool/SPY`` becomes
+    ``/darkpool/{ticker}``, so every symbol shares one histogram.
+    """
+    path = url[len(base_url):] if url.startswith(base_url) else url
+    path = path.split('?', 1)[0]
+    segments = []
+    for segment in path.split('/'):
+        if _TICKER_SEGMENT.match(segment):
+            segment = '{ticker}'
+        elif _DATE_SEGMENT.match(segment):
+            segment = '{date}'
+        segments.append(segment)
+    return '/'.join(segments)
+
+
+def timeout_for(endpoint: str, timeouts: Optional[Mapping[str, Timeout]] = None) -> Timeout:
+    """Timeout for an endpoint template: the longest matching prefix, else the default."""
+    timeouts = ENDPOINT_TIMEOUTS if timeouts is None else timeouts
+    best = None
+    for prefix in timeouts:
+        if endpoint.startswith(prefix) and (best is None or len(prefix) > len(best)):
+            best = prefix
+    return timeouts[best] if best is not None else DEFAULT_TIMEOUT
+
+
+class LatencyHistogram:
+    """Thread-safe fixed-bucket latency histogram for one endpoint."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+            self.count = 0
+            self.errors = 0
+            self.retries = 0
+            self.total_seconds = 0.0
+            self.max_seconds = 0.0
+
+    def observe(self, seconds: float, error: bool = False) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                index = i
+                break
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            if error:
+                self.errors += 1
+
+    def record_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the ``q`` quantile (None if empty)."""
+        with self._lock:
+            if not self.count:
+                return None
+            rank = q * self.count
+            seen = 0
+            for bound, count in zip(self.buckets + (self.max_seconds,), self.counts):
+                seen += count
+                if seen >= rank:
+                    return bound
+            return self.max_seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        p50, p95, p99 = self.quantile(0.5), self.quantile(0.95), self.quantile(0.99)
+        with self._lock:
+            labels = [f"le_{bound:g}" for bound in self.buckets] + ['le_inf']
+            return {
+                'count': self.count,
+                'errors': self.errors,
+                'retries': self.retries,
+                'avg_seconds': round(self.total_seconds / self.count, 4) if self.count else 0.0,
+                'max_seconds': round(self.max_seconds, 3),
+                'p50_seconds': p50,
+                'p95_seconds': p95,
+                'p99_seconds': p99,
+                'buckets': dict(zip(labels, self.counts)),
+            }
+
+
+_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+_histograms: Dict[str, LatencyHistogram] = {}
+
+
+def get_session(pool_size: int = HTTP_POOL_SIZE) -> requests.Session:
+    """
+    Process-wide keep-alive session.
+
+    Retries are done by ``UWClient``, so the adapter itself never retries.
+    ``pool_size`` only applies to the first call.
+    """
+    global _session
+    with _lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+        return _session
+
+
+def histogram(endpoint: str) -> LatencyHistogram:
+    """Latency histogram for an endpoint template, created on first use."""
+    with _lock:
+        hist = _histograms.get(endpoint)
+        if hist is None:
+            hist = _histograms[endpoint] = LatencyHistogram()
+        return hist
+
+
+def latency_stats() -> Dict[str, Dict[str, Any]]:
+    """Latency histograms for every endpoint called in this process."""
+    with _lock:
+        histograms = dict(_histograms)
+    return {endpoint: hist.as_dict() for endpoint, hist in sorted(histograms.items())}
+
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def rate_limit_status(response: requests.Response) -> Optional[RateLimitStatus]:
+    """The API's rate-limit headers as a ``RateLimitStatus``, or None if it sent none."""
+    values = {}
+    for field, header in RATE_LIMIT_HEADERS.items():
+        value = response.headers.get(header)
+        if value is None:
+            continue
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            continue
+        values[field] = max(number, 0.0) / 1000 if field == 'reset' else int(number)
+    return RateLimitStatus(**values) if values else None
+
+
+class UWClient:
+    """
+    Unusual Whales API client with shared keep-alive connections and retries.
+
+    Args:
+        headers: Headers sent with every request (usually ``DEFAULT_HEADERS``)
+        base_url: Prefix for relative paths
+        session: Session to send on (default: the process-wide one)
+        throttle: Called before every attempt, e.g. ``shared_limiter('uw').acquire``
+        reserve: Called with the endpoint template before every attempt (before
+            ``throttle``), e.g. to take credits from ``credit_ledger``; raise to refuse
+        observe: Called with each response's ``RateLimitStatus``, e.g.
+            ``shared_limiter('uw').observe``
+        max_retries: Attempts per request, including the first
+        backoff: First retry delay in seconds, doubled per retry up to ``max_backoff``
+        timeouts: Per-endpoint timeouts (default: ``ENDPOINT_TIMEOUTS``)
+    """
+
+    def __init__(self, headers: Optional[Mapping[str, str]] = None, base_url: str = UW_BASE_URL,
+                 session: Optional[requests.Session] = None, throttle: Optional[Callable[[], Any]] = None,
+                 reserve: Optional[Callable[[str], Any]] = None,
+                 observe: Optional[Callable[[RateLimitStatus], Any]] = None,
+                 max_retries: int = MAX_RETRIES, backoff: float = BACKOFF_BASE,
+                 max_backoff: float = MAX_BACKOFF, timeouts: Optional[Mapping[str, Timeout]] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        if max_retries < 1:
+            raise ValueError("max_retries must be at least 1")
+        self.headers = dict(headers or {})
+        self.base_url = base_url.rstrip('/')
+        self._session = session
+        self.throttle = throttle
+        self.reserve = reserve
+        self.observe = observe
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeouts = timeouts
+        self._sleep = sleep
+
+    @property
+    def session(self) -> requests.Session:
+        # Resolved per call so a forked child picks up its own session
+        return self._session or get_session()
+
+    def url(self, path: str) -> str:
+        if path.startswith(('http://', 'https://')):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def _delay(self, attempt: int, response: Optional[requests.Response] = None,
+               status: Optional[RateLimitStatus] = None) -> float:
+        retry_after = _retry_after(response) if response is not None else None
+        if retry_after is None and response is not None and response.status_code == 429 \
+                and status is not None and status.reset is not None:
+            retry_after = status.reset  # The minute window is spent until it resets
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        return min(self.backoff * (2 ** attempt), self.max_backoff)
+
+    def _observe(self, response: requests.Response) -> Optional[RateLimitStatus]:
+        status = rate_limit_status(response)
+        if status is not None and self.observe is not None:
+            self.observe(status)
+        return status
+
+    def request(self, method: str, path: str, params: Optional[Mapping[str, Any]] = None,
+                timeout: Union[float, Timeout, None] = None, endpoint: Optional[str] = None,
+                **kwargs) -> requests.Response:
+        """
+        Send a request, retrying transient failures.
+
+        Args:
+            path: Path relative to ``base_url``, or an absolute URL
+            timeout: Overrides the per-endpoint timeout
+            endpoint: Histogram/timeout key (default: derived from the URL)
+
+        Returns:
+            The successful response
+
+        Raises:
+            requests.exceptions.RequestException: A non-retryable error, or
+                the last error once retries are exhausted
+            Exception: Whatever ``reserve`` raises to refuse the request
+        """
+        url = self.url(path)
+        endpoint = endpoint or endpoint_template(url, self.base_url)
+        timeout = timeout if timeout is not None else timeout_for(endpoint, self.timeouts)
+        headers = {**self.headers, **kwargs.pop('headers', {})}
+        hist = histogram(endpoint)
+
+        for attempt in range(self.max_retries):
+            if self.reserve is not None:
+                self.reserve(endpoint)
+            if self.throttle is not None:
+                self.throttle()
+            start = time.monotonic()
+            response = None
+            limits = None
+            try:
+                response = self.session.request(method, url, params=params, headers=headers,
+                                                timeout=timeout, **kwargs)
+                limits = self._observe(response)
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                hist.observe(time.monotonic() - start, error=True)
+                status = response.status_code if response is not None else None
+                retryable = status is None or status in RETRY_STATUSES
+                if not retryable or attempt == self.max_retries - 1:
+                    raise
+                delay = self._delay(attempt, response, limits)
+                hist.record_retry()
+                logger.warning(f"{method} {endpoint} failed (attempt {attempt + 1}/{self.max_retries}): "
+                               f"{str(e)}; retrying in {delay:.1f}s")
+                self._sleep(delay)
+                continue
+            hist.observe(time.monotonic() - start)
+            return response
+
+    def get(self, path: str, params: Optional[Mapping[str, Any]] = None, **kwargs) -> requests.Response:
+        return self.request('GET', path, params=params, **kwargs)
+
+    def get_json(self, path: str, params: Optional[Mapping[str, Any]] = None, **kwargs) -> Any:
+        """
+        GET and parse the JSON body.
+
+        Raises:
+            requests.exceptions.RequestException: As ``request``
+            ValueError: The body isn't valid JSON
+        """
+        return loads(self.get(path, params=params, **kwargs).content)
+
+
+def _reset_after_fork() -> None:
+    """Give a forked child its own session; the parent's sockets stay with the parent."""
+    global _lock, _session
+    _lock = threading.Lock()
+    _session = None
+    for hist in _histograms.values():
+        hist._lock = threading.Lock()
+        hist.reset()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
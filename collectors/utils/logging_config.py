@@ -6,8 +6,8 @@ import logging
 import json
 import os
 from datetime import datetime
-import psycopg2
 from flow_analysis.config.env_config import DB_CONFIG
+from collectors.utils.db_pool import pg_connection
 
 def setup_logging(collector_name: str, log_file: str = None) -> logging.Logger:
     """
@@ -60,7 +60,7 @@ def log_to_db(collector_name: str, level: str, message: str, task_type: str = No
         error_details: Error details if this is an error message
     """
     try:
-        with psycopg2.connect(**DB_CONFIG) as conn:
+        with pg_connection(DB_CONFIG) as conn:
             with conn.cursor() as cur:
                 cur.execute("""
                     INSERT INTO trading.collector_logs (
@@ -115,7 +115,7 @@ def log_heartbeat(collector_name: str, status: str = None, message: str = None):
 def log_collector_summary(collector_name: str, start_time: datetime, end_time: datetime,
                          items_collected: int, api_credits_used: int = None,
                          task_type: str = 'collection', status: str = 'completed',
-                         error_details: dict = None):
+                         error_details: dict = None, details: dict = None):
     """
     Log a summary of a collection run.
     
@@ -128,16 +128,19 @@ def log_collector_summary(collector_name: str, start_time: datetime, end_time: d
         task_type: Type of task (e.g., 'collection', 'backfill')
         status: Status of the collection
         error_details: Error details if the collection failed
+        details: Extra collector-specific details merged into the summary
     """
     duration = (end_time - start_time).total_seconds()
     
-    details = {
+    summary_details = {
         'start_time': start_time.isoformat(),
         'end_time': end_time.isoformat(),
         'duration_seconds': duration,
         'items_collected': items_collected,
         'api_credits_used': api_credits_used
     }
+    if details:
+        summary_details.update(details)
     
     level = 'ERROR' if error_details else 'INFO'
     message = f"Collection {'failed' if error_details else 'completed'}: {items_collected} items in {duration:.1f}s"
@@ -147,7 +150,7 @@ def log_collector_summary(collector_name: str, start_time: datetime, end_time: d
         level=level,
         message=message,
         task_type=task_type,
-        details=details,
+        details=summary_details,
         status=status,
         error_details=error_details
     )
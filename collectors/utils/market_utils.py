@@ -91,6 +91,29 @@ def is_collector_open() -> bool:
         return True
     return False
 
+def get_collector_session(now: Optional[datetime] = None) -> str:
+    """
+    Get the collector session for a moment in time.
+
+    Args:
+        now: Time to classify; defaults to the current time
+
+    Returns:
+        'pre_market', 'regular', 'after_hours' or 'closed'
+    """
+    eastern = pytz.timezone('US/Eastern')
+    current_time = now.astimezone(eastern) if now else datetime.now(eastern)
+    if current_time.weekday() >= 5:
+        return 'closed'
+    current_time_et = current_time.time()
+    if COLLECTOR_PRE_MARKET_OPEN <= current_time_et < COLLECTOR_REGULAR_OPEN:
+        return 'pre_market'
+    if COLLECTOR_REGULAR_OPEN <= current_time_et < COLLECTOR_REGULAR_CLOSE:
+        return 'regular'
+    if COLLECTOR_REGULAR_CLOSE <= current_time_et < COLLECTOR_AFTER_HOURS_CLOSE:
+        return 'after_hours'
+    return 'closed'
+
 def get_next_collector_open() -> datetime:
     """
     Get the next time the collector will run (pre-market, regular, or after-hours).
@@ -0,0 +1,501 @@
+"""
+Rate limiting shared by collectors that call the Unusual Whales API.
+
+``TokenBucket`` paces the threads of one process. ``GcraLimiter`` enforces
+several tiers at once (per minute and per hour) and keeps its state in a
+backend, so every collector process on an API key draws from one budget:
+
+    limiter = shared_limiter('uw')  # backend from RATE_LIMIT_BACKEND
+    client = UWClient(headers=DEFAULT_HEADERS, throttle=limiter.acquire)
+
+GCRA (the generic cell rate algorithm) stores one "theoretical arrival time"
+per tier instead of a request history, so admission is O(1) whatever the
+window: a request is admitted when, after adding its emission interval,
+that time stays within the tier's burst tolerance of now.
+
+Backends (``RATE_LIMIT_BACKEND``):
+
+* ``memory`` - this process only
+* ``file:///path/to/state.json`` - processes on one host, via ``flock``
+  (the default, under ``cache/``)
+* ``redis://host:6379/0`` - processes on any host; admission runs as one
+  Lua script, timed by the Redis server clock
+
+The configured tiers are only a starting point. ``UWClient(observe=...)``
+passes each response's rate-limit headers to ``GcraLimiter.observe``, which
+adopts the API's per-minute limit and resets the minute tier's arrival time
+from the requests actually left in the window: a window with slack is used
+at once, an exhausted one is waited out until it resets. ``stats()`` reports
+how much waiting this saved against fixed pacing at the configured rate.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Unusual Whales request budget, shared by every collector on the API key
+UW_REQUESTS_PER_MINUTE = 60
+UW_REQUESTS_PER_HOUR = 3000
+UW_BURST = 3
+DAILY_WARNING_SHARE = 0.95  # Warn once the API reports this share of the daily limit used
+
+RATE_LIMIT_BACKEND_ENV = 'RATE_LIMIT_BACKEND'
+DEFAULT_RATE_LIMIT_BACKEND = 'file://cache/rate_limits.json'
+
+
+class _Limiter:
+    """Blocking ``acquire`` on top of a subclass's non-blocking ``try_acquire``."""
+
+    _sleep: Callable[[float], None]
+    _lock: threading.Lock
+    total_wait: float
+
+    def try_acquire(self, tokens: int = 1) -> float:
+        raise NotImplementedError
+
+    def acquire(self, tokens: int = 1) -> float:
+        """
+        Block until tokens are available.
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                break
+            self._sleep(wait)
+            waited += wait
+        if waited:
+            with self._lock:
+                self.total_wait += waited
+        return waited
+
+
+class TokenBucket(_Limiter):
+    """Thread-safe token bucket with O(1) admission.
+
+    Tokens refill continuously at ``rate_per_minute / 60`` per second up to
+    ``burst``. Callers sleep outside the lock, so one waiting thread never
+    blocks another from checking the bucket.
+    """
+
+    def __init__(self, rate_per_minute: float = UW_REQUESTS_PER_MINUTE, burst: int = UW_BURST,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(max(burst, 1))
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._last = clock()
+        self._lock = threading.Lock()
+        self.total_wait = 0.0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self._last = now
+
+    def try_acquire(self, tokens: int = 1) -> float:
+        """
+        Take tokens if available.
+
+        Returns:
+            0.0 if the tokens were taken, otherwise the seconds to wait before retrying
+        """
+        with self._lock:
+            self._refill(self._clock())
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def shared_bucket(name: str = 'uw', rate_per_minute: float = UW_REQUESTS_PER_MINUTE,
+                  burst: int = UW_BURST) -> TokenBucket:
+    """
+    Get the process-wide token bucket registered under ``name``.
+
+    The first caller's ``rate_per_minute`` and ``burst`` configure the bucket;
+    later callers share it as-is.
+    """
+    with _buckets_lock:
+        bucket = _buckets.get(name)
+        if bucket is None:
+            bucket = TokenBucket(rate_per_minute, burst)
+            _buckets[name] = bucket
+            logger.info(f"Created shared rate limiter '{name}': {rate_per_minute}/min, burst {burst}")
+        return bucket
+
+
+class RateLimitStatus(NamedTuple):
+    """A key's budget as reported by the API's response headers; None where a header was absent."""
+    limit: Optional[int] = None  # requests per minute
+    remaining: Optional[int] = None  # requests left in the current minute window
+    reset: Optional[float] = None  # seconds until that window resets
+    daily_count: Optional[int] = None  # requests made today
+    daily_limit: Optional[int] = None
+
+
+class Tier(NamedTuple):
+    """``limit`` requests per ``period`` seconds, of which up to ``burst`` (default: all) back to back."""
+    limit: int
+    period: float
+    burst: Optional[int] = None
+
+    @property
+    def interval(self) -> float:
+        """Seconds of budget one request uses up."""
+        return self.period / self.limit
+
+    @property
+    def tolerance(self) -> float:
+        """How far ahead of now a tier's arrival time may run."""
+        return self.interval * (self.burst or self.limit)
+
+    def key(self, name: str) -> str:
+        """Backend key of the tier's arrival time; without ``limit``, which ``observe`` may change."""
+        return f"ratelimit:{name}:{self.period:g}s"
+
+
+# Requests per minute, paced in bursts of UW_BURST, within an hourly cap
+UW_TIERS = (
+    Tier(UW_REQUESTS_PER_MINUTE, 60, UW_BURST),
+    Tier(UW_REQUESTS_PER_HOUR, 3600),
+)
+
+
+def gcra(tats: Sequence[Optional[float]], tiers: Sequence[Tier], tokens: int,
+         now: float) -> Tuple[float, List[float]]:
+    """
+    One GCRA admission across tiers.
+
+    Args:
+        tats: Stored theoretical arrival time per tier (None if unset)
+
+    Returns:
+        Tuple of (0.0 if admitted else the seconds to wait, arrival times to
+        store if admitted)
+    """
+    wait = 0.0
+    new_tats = []
+    for tat, tier in zip(tats, tiers):
+        new_tat = max(now if tat is None else tat, now) + tokens * tier.interval
+        wait = max(wait, new_tat - tier.tolerance - now)
+        new_tats.append(new_tat)
+    return wait, new_tats
+
+
+class MemoryBackend:
+    """Arrival times in this process."""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._tats: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def admit(self, name: str, tiers: Sequence[Tier], tokens: int) -> float:
+        keys = [tier.key(name) for tier in tiers]
+        with self._lock:
+            wait, new_tats = gcra([self._tats.get(key) for key in keys], tiers, tokens, self._clock())
+            if wait <= 0:
+                self._tats.update(zip(keys, new_tats))
+        return wait
+
+    def sync(self, name: str, tier: Tier, debt: float) -> None:
+        with self._lock:
+            self._tats[tier.key(name)] = self._clock() + debt
+
+
+class FileBackend:
+    """
+    Arrival times in a small JSON file shared by the processes on a host.
+
+    Each admission reads and rewrites the file under an exclusive ``flock``
+    (POSIX only). The wall clock is used, since it is the one clock all
+    processes agree on.
+    """
+
+    def __init__(self, path, clock: Callable[[], float] = time.time):
+        import fcntl  # POSIX only; imported here so the module loads everywhere
+        self._flock = fcntl.flock
+        self._lock_ex, self._lock_un = fcntl.LOCK_EX, fcntl.LOCK_UN
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._clock = clock
+        self._lock = threading.Lock()  # flock is per open file, not per thread
+
+    def _update(self, update: Callable[[Dict[str, float], float], bool]) -> None:
+        """Run ``update(state, now)`` under the file lock; rewrite the file if it returns True."""
+        with self._lock, open(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644), 'r+') as f:
+            self._flock(f, self._lock_ex)
+            try:
+                content = f.read()
+                try:
+                    state = json.loads(content) if content else {}
+                except ValueError:
+                    logger.warning(f"Resetting unreadable rate limit state in {self.path}")
+                    state = {}
+                now = self._clock()
+                if update(state, now):
+                    # Arrival times in the past no longer restrict anything
+                    state = {key: tat for key, tat in state.items() if tat > now}
+                    f.seek(0)
+                    f.truncate()
+                    f.write(json.dumps(state))
+                    f.flush()
+            finally:
+                self._flock(f, self._lock_un)
+
+    def admit(self, name: str, tiers: Sequence[Tier], tokens: int) -> float:
+        keys = [tier.key(name) for tier in tiers]
+        result = []
+
+        def update(state, now):
+            wait, new_tats = gcra([state.get(key) for key in keys], tiers, tokens, now)
+            result.append(wait)
+            if wait <= 0:
+                state.update(zip(keys, new_tats))
+            return wait <= 0
+
+        self._update(update)
+        return result[0]
+
+    def sync(self, name: str, tier: Tier, debt: float) -> None:
+        def update(state, now):
+            state[tier.key(name)] = now + debt
+            return True
+
+        self._update(update)
+
+
+# KEYS: one arrival time per tier; ARGV: tokens, then interval and tolerance per tier.
+# Floats are returned as strings: Redis truncates Lua numbers to integers.
+_GCRA_LUA = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local tokens = tonumber(ARGV[1])
+local wait = 0
+local tats = {}
+for i, key in ipairs(KEYS) do
+    local tat = tonumber(redis.call('GET', key)) or now
+    if tat < now then tat = now end
+    tats[i] = tat + tokens * tonumber(ARGV[2 * i])
+    wait = math.max(wait, tats[i] - tonumber(ARGV[2 * i + 1]) - now)
+end
+if wait > 0 then
+    return tostring(wait)
+end
+for i, key in ipairs(KEYS) do
+    redis.call('SET', key, tostring(tats[i]), 'PX', math.ceil((tats[i] - now) * 1000) + 1)
+end
+return '0'
+"""
+
+# KEYS: the tier's arrival time; ARGV: seconds it should run ahead of the server clock
+_SYNC_LUA = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local debt = tonumber(ARGV[1])
+if debt <= 0 then
+    redis.call('DEL', KEYS[1])
+else
+    redis.call('SET', KEYS[1], tostring(now + debt), 'PX', math.ceil(debt * 1000) + 1)
+end
+return 1
+"""
+
+
+class RedisBackend:
+    """Arrival times in Redis, shared by processes on any host (needs the ``redis`` package)."""
+
+    def __init__(self, url: str):
+        import redis  # Optional dependency; only needed for this backend
+        self.url = url
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(_GCRA_LUA)
+        self._sync_script = self._client.register_script(_SYNC_LUA)
+
+    def admit(self, name: str, tiers: Sequence[Tier], tokens: int) -> float:
+        args = [tokens]
+        for tier in tiers:
+            args += [tier.interval, tier.tolerance]
+        return float(self._script(keys=[tier.key(name) for tier in tiers], args=args))
+
+    def sync(self, name: str, tier: Tier, debt: float) -> None:
+        self._sync_script(keys=[tier.key(name)], args=[debt])
+
+
+def backend_from_url(url: Optional[str] = None):
+    """
+    Backend for a ``RATE_LIMIT_BACKEND`` value (``memory``, ``file://path`` or ``redis://...``).
+
+    Defaults to the environment variable, then ``DEFAULT_RATE_LIMIT_BACKEND``.
+    """
+    url = url or os.getenv(RATE_LIMIT_BACKEND_ENV) or DEFAULT_RATE_LIMIT_BACKEND
+    if url == 'memory':
+        return MemoryBackend()
+    if url.startswith('file://'):
+        return FileBackend(url[len('file://'):])
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisBackend(url)
+    raise ValueError(f"Unknown rate limit backend: {url}")
+
+
+class GcraLimiter(_Limiter):
+    """
+    Multi-tier GCRA limiter over a shared backend.
+
+    Same interface as ``TokenBucket``: ``try_acquire`` returns the seconds to
+    wait, ``acquire`` sleeps them outside any lock. ``observe`` corrects the
+    per-minute tier (the one with a 60 second period) from the API's headers.
+
+    Args:
+        clock: Monotonic clock for the fixed-pacing comparison in ``stats()``
+    """
+
+    def __init__(self, name: str, tiers: Sequence[Tier] = UW_TIERS, backend=None,
+                 sleep: Callable[[float], None] = time.sleep, clock: Callable[[], float] = time.monotonic):
+        if not tiers:
+            raise ValueError("at least one tier is required")
+        for tier in tiers:
+            if tier.limit <= 0 or tier.period <= 0 or (tier.burst is not None and tier.burst <= 0):
+                raise ValueError(f"invalid tier: {tier}")
+        self.name = name
+        self.tiers = tuple(tiers)
+        self.backend = backend or MemoryBackend()
+        self._max_tokens = min(tier.burst or tier.limit for tier in self.tiers)
+        self._sleep = sleep
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.total_wait = 0.0
+        # One request per interval of the configured minute tier, as fixed sleeps would pace it
+        minute = self._minute_index()
+        self.baseline_interval = self.tiers[minute if minute is not None else 0].interval
+        self._fixed_next = 0.0
+        self.fixed_wait = 0.0
+        self.acquired = 0
+        self.observed = 0
+        self.server: Optional[RateLimitStatus] = None
+        self._daily_warned = False
+
+    def _minute_index(self) -> Optional[int]:
+        for i, tier in enumerate(self.tiers):
+            if tier.period == 60:
+                return i
+        return None
+
+    def try_acquire(self, tokens: int = 1) -> float:
+        """
+        Take tokens from every tier if all of them allow it.
+
+        Returns:
+            0.0 if the tokens were taken, otherwise the seconds to wait before retrying
+        """
+        if tokens > self._max_tokens:
+            raise ValueError(f"cannot take {tokens} tokens at once (smallest burst: {self._max_tokens})")
+        return self.backend.admit(self.name, self.tiers, tokens)
+
+    def acquire(self, tokens: int = 1) -> float:
+        start = self._clock()
+        waited = super().acquire(tokens)
+        with self._lock:
+            self._fixed_next = max(self._fixed_next, start)
+            self.fixed_wait += self._fixed_next - start
+            self._fixed_next += tokens * self.baseline_interval
+            self.acquired += tokens
+        return waited
+
+    def observe(self, status: RateLimitStatus) -> None:
+        """
+        Correct the per-minute tier from the API's own count (``UWClient(observe=...)``).
+
+        A per-minute limit other than the configured one replaces it. The tier's
+        arrival time is then reset from the window: with ``remaining`` requests
+        and ``reset`` seconds left, it may run ahead of now only by the time
+        those requests can't fill at the tier's pace, and an empty window blocks
+        until it resets. Other tiers are left as they are.
+        """
+        with self._lock:
+            self.observed += 1
+            self.server = status
+            index = self._minute_index()
+            if index is not None and status.limit and status.limit != self.tiers[index].limit:
+                old = self.tiers[index]
+                tier = old._replace(limit=status.limit, burst=min(old.burst, status.limit) if old.burst else None)
+                self.tiers = self.tiers[:index] + (tier,) + self.tiers[index + 1:]
+                self._max_tokens = min(t.burst or t.limit for t in self.tiers)
+                logger.info(f"Rate limiter '{self.name}': API allows {status.limit}/min "
+                            f"(configured {old.limit}/min)")
+            tier = self.tiers[index] if index is not None else None
+            if status.daily_count is not None and status.daily_limit:
+                high = status.daily_count >= status.daily_limit * DAILY_WARNING_SHARE
+                if high and not self._daily_warned:
+                    logger.warning(f"Rate limiter '{self.name}': {status.daily_count} of "
+                                   f"{status.daily_limit} daily requests used")
+                self._daily_warned = high
+
+        if tier is None or status.remaining is None:
+            return
+        reset = tier.period if status.reset is None else min(max(status.reset, 0.0), tier.period)
+        if status.remaining <= 0:
+            debt = reset + tier.tolerance - tier.interval
+        else:
+            debt = reset - status.remaining * tier.interval
+        self.backend.sync(self.name, tier, debt)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        This process's waiting against fixed pacing at the configured rate, and the API's last report.
+
+        ``idle_saved_seconds`` is how much less this process slept than it
+        would have at one request per ``baseline_interval``; negative when the
+        API's count made it wait longer.
+        """
+        with self._lock:
+            return {
+                'acquired': self.acquired,
+                'waited_seconds': round(self.total_wait, 3),
+                'fixed_pacing_seconds': round(self.fixed_wait, 3),
+                'idle_saved_seconds': round(self.fixed_wait - self.total_wait, 3),
+                'observed': self.observed,
+                'tiers': [f"{t.limit}/{t.period:g}s" for t in self.tiers],
+                'server': self.server._asdict() if self.server is not None else None,
+            }
+
+
+_limiters: Dict[str, GcraLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def shared_limiter(name: str = 'uw', tiers: Sequence[Tier] = UW_TIERS, backend=None) -> GcraLimiter:
+    """
+    Get the process-wide limiter registered under ``name``.
+
+    The first caller's ``tiers`` and ``backend`` (default: from
+    ``RATE_LIMIT_BACKEND``) configure it; processes using the same backend
+    and name share its budget.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = GcraLimiter(name, tiers, backend or backend_from_url())
+            _limiters[name] = limiter
+            logger.info(f"Created shared rate limiter '{name}': "
+                        f"{', '.join(f'{t.limit}/{t.period:g}s' for t in limiter.tiers)} "
+                        f"on {type(limiter.backend).__name__}")
+        return limiter
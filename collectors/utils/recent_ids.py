@@ -0,0 +1,188 @@
+"""
+Time-bounded filter of recently written ids.
+
+The dark pool collectors overlap their fetch windows on purpose (the
+lookback, ``watermark + 1 second``, repeated ``/recent`` polls), so much of
+each batch is trades ``ON CONFLICT (tracking_id)`` would reject anyway. A
+``RecentIdFilter`` remembers the ids written in the last ``horizon`` seconds
+so those rows are dropped before any SQL is sent:
+
+    fresh = recent.unseen(trades, key=attrgetter('tracking_id'))
+    ...write fresh, commit...
+    recent.add_many(trade.tracking_id for trade in fresh)
+
+Ids are kept in ``generations`` rotating sets rather than with a timestamp
+each: adding and checking are O(1), and expiry drops a whole set at once.
+An id is remembered for between ``horizon * (generations - 1) / generations``
+and ``horizon`` seconds after it was added. Only add ids once their batch is
+committed, so a failed write is retried in full.
+
+With ``max_size`` set, a generation that fills its share of it
+(``max_size / generations``) is rotated early, so memory stays bounded under
+any load at the cost of a shorter horizon while the load lasts.
+
+The helpers take a DB-API (psycopg2) connection, like ``watermarks``.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+DEFAULT_HORIZON = 3600  # seconds an id is remembered for
+DEFAULT_GENERATIONS = 4
+
+
+class RecentIdFilter:
+    """Thread-safe set of recently seen ids that forgets them after ``horizon`` seconds."""
+
+    def __init__(self, horizon: float = DEFAULT_HORIZON, generations: int = DEFAULT_GENERATIONS,
+                 clock: Callable[[], float] = time.monotonic, max_size: Optional[int] = None):
+        if horizon <= 0:
+            raise ValueError("horizon must be positive")
+        if generations < 2:
+            raise ValueError("generations must be at least 2")
+        if max_size is not None and max_size < generations:
+            raise ValueError("max_size must be at least generations")
+        self.horizon = horizon
+        self.generations = generations
+        self.max_size = max_size
+        self._generation_cap = max_size // generations if max_size is not None else None
+        self._step = horizon / generations
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sets = deque([set()], maxlen=generations)
+        self._rotated_at = clock()
+        self.checked = 0
+        self.dropped = 0
+        self.early_rotations = 0
+        self.warmed = False
+
+    def _rotate(self, now: float) -> None:
+        elapsed = now - self._rotated_at
+        if elapsed < self._step:
+            return
+        if elapsed >= self.horizon:
+            self._sets.clear()
+            self._sets.append(set())
+            self._rotated_at = now
+            return
+        while now - self._rotated_at >= self._step:
+            self._sets.appendleft(set())  # maxlen drops the oldest generation
+            self._rotated_at += self._step
+
+    def _seen(self, item_id: Hashable) -> bool:
+        for ids in self._sets:
+            if item_id in ids:
+                return True
+        return False
+
+    def __contains__(self, item_id: Hashable) -> bool:
+        with self._lock:
+            self._rotate(self._clock())
+            return self._seen(item_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._rotate(self._clock())
+            return sum(len(ids) for ids in self._sets)
+
+    def add_many(self, ids: Iterable[Hashable]) -> None:
+        """Remember ids (written and committed)."""
+        with self._lock:
+            now = self._clock()
+            self._rotate(now)
+            if self._generation_cap is None:
+                self._sets[0].update(ids)
+                return
+            current = self._sets[0]
+            for item_id in ids:
+                if len(current) >= self._generation_cap and item_id not in current:
+                    self._sets.appendleft(set())  # maxlen drops the oldest generation
+                    self._rotated_at = now
+                    self.early_rotations += 1
+                    current = self._sets[0]
+                current.add(item_id)
+
+    def unseen(self, items: Iterable[T], key: Optional[Callable[[T], Hashable]] = None) -> List[T]:
+        """
+        Items whose id hasn't been seen, in order.
+
+        Repeats within ``items`` are dropped too. Nothing is added to the
+        filter; call ``add_many`` once the fresh items are stored.
+
+        Args:
+            items: Records, rows or bare ids
+            key: Gets the id from an item (default: the item itself)
+        """
+        fresh = []
+        batch = set()
+        checked = 0
+        with self._lock:
+            self._rotate(self._clock())
+            for item in items:
+                checked += 1
+                item_id = key(item) if key is not None else item
+                if item_id in batch or self._seen(item_id):
+                    continue
+                batch.add(item_id)
+                fresh.append(item)
+            self.checked += checked
+            self.dropped += checked - len(fresh)
+        return fresh
+
+    def warm(self, conn, table: str, since: datetime, id_column: str = 'tracking_id',
+             time_column: str = 'executed_at') -> int:
+        """
+        Load ids stored since ``since`` (at startup), so the first batches are filtered too.
+
+        ``table`` and the column names are code constants, never user input.
+
+        Returns:
+            Number of ids loaded
+        """
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT {id_column} FROM {table} WHERE {time_column} >= %s", (since,))
+            ids = [row[0] for row in cur]
+        self.add_many(ids)
+        self.warmed = True
+        logger.info(f"Warmed recent id filter with {len(ids)} ids from {table} since {since}")
+        return len(ids)
+
+    def stats(self) -> Dict[str, Any]:
+        """Ids held, rows checked and dropped, and the hit rate."""
+        with self._lock:
+            self._rotate(self._clock())
+            stats = {
+                'size': sum(len(ids) for ids in self._sets),
+                'checked': self.checked,
+                'dropped': self.dropped,
+                'hit_rate': round(self.dropped / self.checked, 4) if self.checked else 0.0,
+            }
+            if self.max_size is not None:
+                stats['max_size'] = self.max_size
+                stats['early_rotations'] = self.early_rotations
+            return stats
+
+
+_filters: Dict[str, RecentIdFilter] = {}
+_filters_lock = threading.Lock()
+
+
+def recent_ids(name: str, horizon: float = DEFAULT_HORIZON) -> RecentIdFilter:
+    """
+    Get the process-wide filter registered under ``name``.
+
+    The first caller's ``horizon`` configures the filter.
+    """
+    with _filters_lock:
+        id_filter = _filters.get(name)
+        if id_filter is None:
+            id_filter = _filters[name] = RecentIdFilter(horizon)
+        return id_filter
@@ -0,0 +1,363 @@
+"""
+Typed decoding of Unusual Whales API payloads.
+
+Each ingest path used to call ``response.json()`` and then convert every field
+of every dict by hand (``float()``, ``int()``,
+``datetime.fromisoformat(...replace('Z', '+00:00'))``), or build a DataFrame
+from the list of dicts and coerce its columns afterwards. This module does
+that once, going from response bytes straight to compact records:
+
+* ``loads`` parses bytes with ``orjson`` when it is installed, ``json`` otherwise;
+* record classes use ``__slots__`` and convert each field once, on decode;
+* ``parse_timestamp`` takes the ISO-8601 fast path and only normalizes
+  strings ``datetime.fromisoformat`` rejects;
+* ``to_arrays`` gives a columnar view, for DataFrames or COPY rows.
+
+    trades = decode(response.content, DarkPoolTrade)
+    frame = pd.DataFrame(to_arrays(trades))
+"""
+
+import json
+import logging
+import re
+from datetime import date, datetime, timezone
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple, Type, TypeVar, Union
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; json is the fallback
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar('R', bound='Record')
+
+_FRACTION = re.compile(r'\.(\d+)')
+
+
+def loads(payload: Union[bytes, bytearray, str]) -> Any:
+    """Parse a JSON payload, preferring orjson."""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def parse_timestamp(value: Union[str, datetime]) -> datetime:
+    """
+    Parse an API timestamp into an aware UTC-based datetime.
+
+    Handles a trailing ``Z`` and fractional seconds of any precision on
+    Pythons whose ``fromisoformat`` doesn't. Naive values are taken as UTC.
+    """
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            text = value.replace('Z', '+00:00')
+            text = _FRACTION.sub(lambda m: '.' + m.group(1)[:6].ljust(6, '0'), text, count=1)
+            parsed = datetime.fromisoformat(text)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def parse_date(value: Union[str, date]) -> date:
+    """Parse an API date (``YYYY-MM-DD``, or the date part of a timestamp)."""
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value[:10])
+
+
+def _optional(convert: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """Wrap a converter so empty values ('' / None) become None."""
+    def optional(value):
+        if value is None or value == '':
+            return None
+        return convert(value)
+    optional.wrapped = convert
+    return optional
+
+
+def _identity(value):
+    return value
+
+
+def _required(value):
+    # Pass-through like _identity, but the key must be present and not null
+    return value
+
+
+def _list(value) -> list:
+    return value or []
+
+
+def _mapping(value) -> dict:
+    return value or {}
+
+
+def _int(value) -> int:
+    # Sizes arrive as ints, numeric strings or "100.0"
+    try:
+        return int(value)
+    except ValueError:
+        return int(float(value))
+
+
+_float_or_none = _optional(float)
+_int_or_none = _optional(_int)
+_date_or_none = _optional(parse_date)
+
+# Converters that accept a missing or null value; every other field is required
+_LENIENT = (_identity, _list, _mapping, bool)
+
+
+def _compile_decoder(cls) -> Callable[[Dict[str, Any]], Any]:
+    """
+    Generate a straight-line decoder for a record class's fields.
+
+    Same idea as ``collections.namedtuple``: one generated function with no
+    per-field loop, and no call at all for pass-through fields. Required
+    fields are read with ``raw[key]`` and rejected when null, so a missing
+    ``ticker`` raises instead of decoding to ``'None'``.
+    """
+    namespace: Dict[str, Any] = {'new': object.__new__, 'cls': cls}
+    lines = ['def decode_one(raw):', '    get = raw.get', '    record = new(cls)']
+    for i, (name, key, convert) in enumerate(cls.FIELDS):
+        wrapped = getattr(convert, 'wrapped', None)
+        if convert is _identity:
+            lines.append(f'    record.{name} = get({key!r})')
+        elif wrapped is not None:
+            namespace[f'convert_{i}'] = wrapped
+            lines.append(f'    value = get({key!r})')
+            lines.append(f"    record.{name} = None if value is None or value == '' else convert_{i}(value)")
+        elif convert in _LENIENT:
+            namespace[f'convert_{i}'] = convert
+            lines.append(f'    record.{name} = convert_{i}(get({key!r}))')
+        else:
+            lines.append(f'    value = raw[{key!r}]')
+            lines.append('    if value is None:')
+            lines.append(f"        raise ValueError({key + ' is null'!r})")
+            if convert is _required:
+                lines.append(f'    record.{name} = value')
+            else:
+                namespace[f'convert_{i}'] = convert
+                lines.append(f'    record.{name} = convert_{i}(value)')
+    lines.append('    return record')
+    exec('\n'.join(lines), namespace)
+    return namespace['decode_one']
+
+
+class Record:
+    """
+    Base class for slotted API records.
+
+    Subclasses declare ``FIELDS`` as ``(attribute, api_key, converter)``
+    triples and ``__slots__`` with the same attribute names, in order, with
+    at least two fields. A field is required unless its converter is
+    optional (``_float_or_none`` and friends) or lenient (``_identity``,
+    ``_list``, ``_mapping``, ``bool``); use ``_required`` for a required
+    pass-through.
+    """
+
+    __slots__ = ()
+    FIELDS: Tuple[Tuple[str, str, Callable[[Any], Any]], ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        names = tuple(name for name, _, _ in cls.FIELDS)
+        if names != tuple(cls.__slots__):
+            raise TypeError(f"{cls.__name__}.__slots__ must match its FIELDS")
+        cls._values = attrgetter(*names)
+        cls._decode = staticmethod(_compile_decoder(cls))
+
+    def __init__(self, *values, **fields):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+        for name in self.__slots__[len(values):]:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_api(cls: Type[R], raw: Dict[str, Any]) -> R:
+        """
+        Build a record from one decoded API object.
+
+        Raises:
+            KeyError, TypeError, ValueError: A required field is missing or malformed
+        """
+        return cls._decode(raw)
+
+    def values(self) -> tuple:
+        """Field values in ``__slots__`` order."""
+        return self._values(self)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(zip(self.__slots__, self.values()))
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.values() == other.values()
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={value!r}" for name, value in zip(self.__slots__, self.values()))
+        return f"{type(self).__name__}({fields})"
+
+
+class DarkPoolTrade(Record):
+    """One ``/darkpool/{ticker}`` trade, ordered like ``trading.darkpool_trades``."""
+
+    FIELDS = (
+        ('tracking_id', 'tracking_id', _required),
+        ('symbol', 'ticker', str),
+        ('price', 'price', float),
+        ('size', 'size', _int),
+        ('volume', 'volume', _int),
+        ('premium', 'premium', float),
+        ('executed_at', 'executed_at', parse_timestamp),
+        ('nbbo_ask', 'nbbo_ask', _float_or_none),
+        ('nbbo_bid', 'nbbo_bid', _float_or_none),
+        ('nbbo_ask_quantity', 'nbbo_ask_quantity', _int_or_none),
+        ('nbbo_bid_quantity', 'nbbo_bid_quantity', _int_or_none),
+        ('market_center', 'market_center', _identity),
+        ('sale_cond_codes', 'sale_cond_codes', _identity),
+        ('ext_hour_sold_codes', 'ext_hour_sold_codes', _identity),
+        ('trade_code', 'trade_code', _identity),
+        ('trade_settlement', 'trade_settlement', _identity),
+        ('canceled', 'canceled', bool),
+    )
+    __slots__ = tuple(name for name, _, _ in FIELDS)
+
+    def as_row(self, collection_time: datetime) -> tuple:
+        """Row tuple for ``trading.darkpool_trades``, ending with collection_time."""
+        return self._values(self) + (collection_time,)
+
+
+class NewsHeadline(Record):
+    """One ``/news/headlines`` item."""
+
+    FIELDS = (
+        ('headline', 'headline', str),
+        ('source', 'source', _identity),
+        ('created_at', 'created_at', parse_timestamp),
+        ('tags', 'tags', _list),
+        ('tickers', 'tickers', _list),
+        ('is_major', 'is_major', bool),
+        ('sentiment', 'sentiment', _identity),
+        ('meta', 'meta', _mapping),
+    )
+    __slots__ = tuple(name for name, _, _ in FIELDS)
+
+
+class FlowAlert(Record):
+    """One ``/option-trades/flow-alerts`` alert, keeping the API field names."""
+
+    FIELDS = (
+        ('ticker', 'ticker', str),
+        ('created_at', 'created_at', parse_timestamp),
+        ('alert_rule', 'alert_rule', _identity),
+        ('price', 'price', _float_or_none),
+        ('total_size', 'total_size', _int_or_none),
+        ('total_premium', 'total_premium', _float_or_none),
+        ('expiry', 'expiry', _date_or_none),
+        ('strike', 'strike', _float_or_none),
+        ('type', 'type', _identity),
+        ('volume', 'volume', _int_or_none),
+        ('open_interest', 'open_interest', _int_or_none),
+        ('volume_oi_ratio', 'volume_oi_ratio', _float_or_none),
+        ('total_ask_side_prem', 'total_ask_side_prem', _float_or_none),
+        ('total_bid_side_prem', 'total_bid_side_prem', _float_or_none),
+    )
+    __slots__ = tuple(name for name, _, _ in FIELDS)
+
+
+class OptionFlow(Record):
+    """One options flow print; the API already uses ``trading.options_flow`` column names."""
+
+    FIELDS = (
+        ('flow_id', 'flow_id', str),
+        ('symbol', 'symbol', str),
+        ('strike', 'strike', _float_or_none),
+        ('expiration', 'expiration', _date_or_none),
+        ('option_type', 'option_type', _identity),
+        ('price', 'price', _float_or_none),
+        ('size', 'size', _int_or_none),
+        ('premium', 'premium', _float_or_none),
+        ('executed_at', 'executed_at', parse_timestamp),
+        ('volume', 'volume', _int_or_none),
+        ('open_interest', 'open_interest', _int_or_none),
+        ('delta', 'delta', _float_or_none),
+        ('gamma', 'gamma', _float_or_none),
+        ('theta', 'theta', _float_or_none),
+        ('vega', 'vega', _float_or_none),
+        ('implied_volatility', 'implied_volatility', _float_or_none),
+        ('bid', 'bid', _float_or_none),
+        ('ask', 'ask', _float_or_none),
+    )
+    __slots__ = tuple(name for name, _, _ in FIELDS)
+
+
+class RecordBatch(list):
+    """List of decoded records that remembers how many items were skipped."""
+
+    skipped = 0
+
+    @property
+    def received(self) -> int:
+        """Items in the payload, including skipped ones (for page-size checks)."""
+        return len(self) + self.skipped
+
+
+def decode_records(items: Iterable[Dict[str, Any]], record_cls: Type[R]) -> RecordBatch:
+    """
+    Convert decoded API objects into records.
+
+    Malformed items are logged and skipped, as the dict paths did per row;
+    the batch's ``skipped`` count keeps pagination from mistaking them for
+    the end of the data.
+    """
+    records = RecordBatch()
+    decode_one = record_cls._decode
+    for raw in items:
+        try:
+            records.append(decode_one(raw))
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            key = raw.get(record_cls.FIELDS[0][1]) if isinstance(raw, dict) else None
+            logger.error(f"Skipping malformed {record_cls.__name__} {key}: {str(e)}")
+            records.skipped += 1
+    return records
+
+
+def decode(payload: Union[bytes, bytearray, str], record_cls: Type[R], key: Optional[str] = 'data') -> RecordBatch:
+    """
+    Decode a response body into records.
+
+    Args:
+        payload: Raw response bytes (``response.content``)
+        record_cls: Record type of the items
+        key: Envelope key holding the item list, or None for a bare list
+    """
+    data = loads(payload)
+    if key is not None and isinstance(data, dict):
+        data = data.get(key) or []
+    return decode_records(data, record_cls)
+
+
+def to_arrays(records: Sequence[Record], fields: Optional[Sequence[str]] = None) -> Dict[str, list]:
+    """
+    Columnar view of records: one list per field.
+
+    Args:
+        records: Records of a single type
+        fields: Subset of fields to return (default: all)
+    """
+    if not records:
+        return {name: [] for name in (fields or ())}
+    names = type(records[0]).__slots__
+    columns = list(zip(*map(type(records[0])._values, records)))
+    arrays = dict(zip(names, map(list, columns)))
+    if fields is not None:
+        return {name: arrays[name] for name in fields}
+    return arrays
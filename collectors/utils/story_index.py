@@ -0,0 +1,268 @@
+"""
+Near-duplicate headline clustering.
+
+The same story arrives from several sources with slightly different wording
+("Apple beats Q2 estimates as iPhone sales jump" / "Apple beats
+second-quarter estimates as iPhone sales jump"), and ``ON CONFLICT
+(headline, source, created_at)`` stores every variant. A ``StoryIndex``
+assigns each headline a ``story_id`` at ingest, shared by its near-duplicates:
+
+    stories = story_index('news')
+    story_id = stories.assign(headline.headline, headline.created_at, headline.tickers)
+
+* Headlines are reduced to word shingles (lowercased, stopwords dropped, a
+  plural ``s`` stripped) and a ``NUM_PERM``-slot MinHash signature, whose
+  matching slots estimate the Jaccard similarity of two shingle sets.
+* Signatures are indexed LSH-style in ``BANDS`` bands: a lookup only
+  compares the headlines sharing a whole band with the new one, so its cost
+  depends on the near-duplicates, not on the size of the index. Pairs at
+  Jaccard 0.6 share a band with probability ~0.99.
+* A candidate matches when its estimated similarity is at least
+  ``threshold``, it was published within ``window`` of the new headline and
+  their tickers overlap (when both have any), since "SPY options volume
+  surges" and "QQQ options volume surges" are different stories.
+
+Entries are grouped into slices by publish time and slices older than the
+newest headline seen minus ``window`` are dropped, so memory follows the
+window's headline volume. ``story_id`` is derived from the story's first
+headline, so an index warmed from the table keeps assigning the stored ids.
+"""
+
+import hashlib
+import logging
+import random
+import re
+import threading
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from collectors.utils.time_buckets import as_utc
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 64  # MinHash slots per signature
+BANDS = 16  # LSH bands of NUM_PERM // BANDS slots each
+DEFAULT_THRESHOLD = 0.6  # Estimated Jaccard similarity for two headlines to share a story
+DEFAULT_WINDOW = timedelta(hours=24)  # Max publish-time distance within a story
+SLICES_PER_WINDOW = 4
+
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'as', 'at', 'by', 'for', 'from', 'in', 'is', 'it', 'its', 'of', 'on',
+    'or', 'the', 'to', 'with', 'after', 'amid', 'over', 'says', 'say',
+})
+_WORD = re.compile(r'[a-z0-9]+')
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20250501)  # Fixed seed: signatures must match across processes
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+
+def shingles(headline: str) -> Set[str]:
+    """Normalized words of a headline."""
+    words = set()
+    for word in _WORD.findall(headline.lower()):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        words.add(word)
+    return words
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big')
+
+
+def minhash(words: Iterable[str]) -> array:
+    """``NUM_PERM``-slot MinHash signature of a shingle set (all slots ``_PRIME`` if empty)."""
+    hashes = [_hash64(word) for word in words]
+    if not hashes:
+        return array('Q', [_PRIME] * NUM_PERM)
+    return array('Q', [min((a * x + b) % _PRIME for x in hashes) for a, b in _PERMUTATIONS])
+
+
+def similarity(left: array, right: array) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(left, right) if x == y) / len(left)
+
+
+def _story_id(headline: str, created_at: datetime) -> int:
+    """Signed 64-bit id of a story, from its first headline."""
+    digest = hashlib.blake2b(f"{headline}|{as_utc(created_at).timestamp():.0f}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+class _Entry(NamedTuple):
+    signature: array
+    tickers: FrozenSet[str]
+    published: float  # epoch seconds
+    story_id: int
+
+
+class StoryIndex:
+    """Thread-safe index of recent headline signatures that assigns story ids."""
+
+    def __init__(self, window: timedelta = DEFAULT_WINDOW, threshold: float = DEFAULT_THRESHOLD,
+                 bands: int = BANDS):
+        if window <= timedelta(0):
+            raise ValueError("window must be positive")
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        if bands <= 0 or NUM_PERM % bands:
+            raise ValueError(f"bands must divide {NUM_PERM}")
+        self.window = window.total_seconds()
+        self.threshold = threshold
+        self.bands = bands
+        self._rows = NUM_PERM // bands
+        self._slice = self.window / SLICES_PER_WINDOW
+        self._slices: Dict[int, Dict[bytes, List[_Entry]]] = {}
+        # (headline, published) -> story id per slice, so re-fetched headlines aren't indexed twice
+        self._known: Dict[int, Dict[Tuple[str, float], int]] = {}
+        self._newest_slice = None
+        self._lock = threading.Lock()
+        self.assigned = 0
+        self.matched = 0
+        self.compared = 0
+        self.repeated = 0
+        self.warmed = False
+
+    def _band_keys(self, signature: array) -> List[bytes]:
+        rows = self._rows
+        return [bytes([band]) + signature[band * rows:(band + 1) * rows].tobytes() for band in range(self.bands)]
+
+    def _find(self, entry: _Entry, keys: List[bytes]) -> Optional[_Entry]:
+        """Most similar indexed headline that belongs to the same story, if any."""
+        first = int((entry.published - self.window) // self._slice)
+        last = int((entry.published + self.window) // self._slice)
+        best, best_score = None, self.threshold
+        seen = set()
+        for slice_no in range(first, last + 1):
+            table = self._slices.get(slice_no)
+            if table is None:
+                continue
+            for key in keys:
+                for other in table.get(key, ()):
+                    if id(other) in seen:
+                        continue
+                    seen.add(id(other))
+                    if abs(other.published - entry.published) > self.window:
+                        continue
+                    if entry.tickers and other.tickers and not entry.tickers & other.tickers:
+                        continue
+                    self.compared += 1
+                    score = similarity(entry.signature, other.signature)
+                    if score >= best_score:
+                        best, best_score = other, score
+        return best
+
+    def _repeat(self, headline: str, published: float) -> Optional[int]:
+        """Story id of this exact headline if already indexed (call with the lock held)."""
+        known = self._known.get(int(published // self._slice), {}).get((headline, published))
+        if known is not None:
+            self.repeated += 1
+        return known
+
+    def _add(self, headline: str, entry: _Entry, keys: List[bytes]) -> None:
+        slice_no = int(entry.published // self._slice)
+        table = self._slices.setdefault(slice_no, {})
+        for key in keys:
+            table.setdefault(key, []).append(entry)
+        self._known.setdefault(slice_no, {})[(headline, entry.published)] = entry.story_id
+        if self._newest_slice is None or slice_no > self._newest_slice:
+            self._newest_slice = slice_no
+            # Keep the slices a headline at the newest time could still match
+            oldest = slice_no - SLICES_PER_WINDOW - 1
+            for stale in [s for s in self._slices if s < oldest]:
+                del self._slices[stale]
+                self._known.pop(stale, None)
+
+    def assign(self, headline: str, created_at: datetime, tickers: Iterable[str] = (),
+               story_id: Optional[int] = None) -> int:
+        """
+        Story id for a headline, indexing it for the headlines that follow.
+
+        A headline already indexed with the same ``created_at`` (re-fetched by
+        an overlapping run) gets its earlier id back and isn't indexed again.
+
+        Args:
+            story_id: Known id (when warming); otherwise matched or newly derived
+        """
+        published = as_utc(created_at).timestamp()
+        with self._lock:
+            known = self._repeat(headline, published)
+        if known is not None:
+            return known
+        signature = minhash(shingles(headline))
+        keys = self._band_keys(signature)
+        with self._lock:
+            known = self._repeat(headline, published)  # Another thread may have indexed it meanwhile
+            if known is not None:
+                return known
+            if story_id is None:
+                probe = _Entry(signature, frozenset(tickers or ()), published, 0)
+                match = self._find(probe, keys)
+                if match is not None:
+                    story_id = match.story_id
+                    self.matched += 1
+                else:
+                    story_id = _story_id(headline, created_at)
+                self.assigned += 1
+            self._add(headline, _Entry(signature, frozenset(tickers or ()), published, story_id), keys)
+        return story_id
+
+    def warm(self, conn, since: datetime, table: str = 'trading.news_headlines') -> int:
+        """
+        Index headlines stored since ``since`` with their story ids (at startup).
+
+        ``table`` is a code constant, never user input.
+
+        Returns:
+            Number of headlines indexed
+        """
+        count = 0
+        with conn.cursor() as cur:
+            cur.execute(
+                f"SELECT headline, created_at, tickers, story_id FROM {table} "
+                f"WHERE created_at >= %s AND story_id IS NOT NULL ORDER BY created_at",
+                (since,)
+            )
+            for headline, created_at, tickers, story_id in cur:
+                self.assign(headline, created_at, tickers or (), story_id=story_id)
+                count += 1
+        self.warmed = True
+        logger.info(f"Warmed story index with {count} headlines from {table} since {since}")
+        return count
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len({id(entry) for table in self._slices.values()
+                        for entries in table.values() for entry in entries})
+
+    def stats(self) -> Dict[str, Any]:
+        """Headlines assigned and matched to an earlier story, repeats of indexed ones, and comparisons made."""
+        with self._lock:
+            return {
+                'slices': len(self._slices),
+                'assigned': self.assigned,
+                'matched': self.matched,
+                'match_rate': round(self.matched / self.assigned, 4) if self.assigned else 0.0,
+                'repeated': self.repeated,
+                'compared': self.compared,
+            }
+
+
+_indexes: Dict[str, StoryIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def story_index(name: str, window: timedelta = DEFAULT_WINDOW) -> StoryIndex:
+    """
+    Get the process-wide index registered under ``name``.
+
+    The first caller's ``window`` configures the index.
+    """
+    with _indexes_lock:
+        index = _indexes.get(name)
+        if index is None:
+            index = _indexes[name] = StoryIndex(window)
+        return index
@@ -0,0 +1,96 @@
+"""
+Canonical cache keys for time-windowed API requests.
+
+Request windows used to be formatted straight from ``datetime.now()``, so a
+cache keyed on the exact ``newer_than``/``older_than`` strings never hit on
+live runs. ``TimeBuckets`` aligns windows onto fixed UTC buckets and only
+hands out a cache key once a window has closed:
+
+    buckets = TimeBuckets(timedelta(days=1))
+    for bucket_start, bucket_end in buckets.split(start, end):
+        key = buckets.key('news', bucket_start, bucket_end, {'page': 0})
+        ...  # None for the open bucket: always fetched, never cached
+
+A window is closed once its end is ``settle`` in the past, leaving time for
+late-arriving rows. A closed window's data no longer changes, so responses
+for it can be stored with ``ttl=NO_EXPIRY`` (see ``cache_store``) and a
+repeated backfill over the same days is served without API calls.
+
+Keys work for windows that are not bucket-aligned too, such as the adaptive
+ones ``WindowPlanner`` produces: the same closed window always maps to the
+same key.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+DEFAULT_SETTLE = timedelta(minutes=15)
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def as_utc(ts: datetime) -> datetime:
+    """Convert to an aware UTC datetime; naive values are taken to be UTC already."""
+    if ts.tzinfo is None:
+        return ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(timezone.utc)
+
+
+class TimeBuckets:
+    """
+    Fixed-width time buckets aligned to the Unix epoch (daily buckets start at 00:00 UTC).
+
+    Args:
+        width: Bucket length
+        settle: How long after its end a window is still treated as open
+        clock: Returns the current aware datetime
+    """
+
+    def __init__(self, width: timedelta, settle: timedelta = DEFAULT_SETTLE,
+                 clock: Optional[Callable[[], datetime]] = None):
+        if width <= timedelta(0):
+            raise ValueError("width must be positive")
+        if settle < timedelta(0):
+            raise ValueError("settle must not be negative")
+        self.width = width
+        self.settle = settle
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+
+    def floor(self, ts: datetime) -> datetime:
+        """Start of the bucket holding ``ts``."""
+        return EPOCH + ((as_utc(ts) - EPOCH) // self.width) * self.width
+
+    def split(self, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        """Aligned ``(bucket_start, bucket_end)`` pairs covering [start, end), oldest first."""
+        start, end = as_utc(start), as_utc(end)
+        bucket_start = self.floor(start)
+        buckets = []
+        if start >= end:
+            return buckets
+        while bucket_start < end:
+            buckets.append((bucket_start, bucket_start + self.width))
+            bucket_start += self.width
+        return buckets
+
+    def is_closed(self, end: datetime) -> bool:
+        """Whether a window ending at ``end`` can no longer gain rows."""
+        return as_utc(end) + self.settle <= self._clock()
+
+    def key(self, namespace: str, start: datetime, end: datetime,
+            params: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        Cache key for a request over [start, end), or None while the window is open.
+
+        Args:
+            namespace: Endpoint or stream the response belongs to
+            params: Remaining request parameters (symbol, limit, page...)
+        """
+        if not self.is_closed(end):
+            return None
+        canonical = json.dumps({
+            'start': as_utc(start).isoformat(),
+            'end': as_utc(end).isoformat(),
+            'params': params or {},
+        }, sort_keys=True, default=str)
+        return f"{namespace}:{hashlib.md5(canonical.encode()).hexdigest()}"
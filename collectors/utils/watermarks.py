@@ -0,0 +1,162 @@
+"""
+Persistent per-collector high-watermarks.
+
+Each collector records the newest timestamp it has stored per stream (symbol,
+source, ...) in ``trading.collector_watermarks``. Incremental runs resolve
+their fetch window from that row (or the in-process cache) instead of running
+``MAX(...)`` over the data table.
+
+All database helpers take a DB-API (psycopg2) connection and never commit, so
+a watermark can be advanced in the same transaction as the batch it describes.
+SQLAlchemy callers can pass ``conn.connection`` or ``engine.raw_connection()``.
+"""
+
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CREATE_WATERMARKS_SQL = """
+CREATE TABLE IF NOT EXISTS trading.collector_watermarks (
+    collector VARCHAR(50) NOT NULL,
+    stream_key VARCHAR(100) NOT NULL,
+    watermark TIMESTAMP WITH TIME ZONE NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (collector, stream_key)
+)
+"""
+
+UPSERT_WATERMARK_SQL = """
+INSERT INTO trading.collector_watermarks (collector, stream_key, watermark, updated_at)
+VALUES (%s, %s, %s, NOW())
+ON CONFLICT (collector, stream_key) DO UPDATE
+SET watermark = GREATEST(trading.collector_watermarks.watermark, EXCLUDED.watermark),
+    updated_at = NOW()
+"""
+
+
+class WatermarkStore:
+    """High-watermarks for one collector, cached in-process."""
+
+    def __init__(self, collector: str):
+        self.collector = collector
+        self._cache: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def ensure_table(raw_conn) -> None:
+        """Create ``trading.collector_watermarks`` if it doesn't exist."""
+        with raw_conn.cursor() as cur:
+            cur.execute("CREATE SCHEMA IF NOT EXISTS trading")
+            cur.execute(CREATE_WATERMARKS_SQL)
+
+    def cached(self, stream_key: str) -> Optional[datetime]:
+        """Return the cached watermark for a stream without touching the database."""
+        with self._lock:
+            return self._cache.get(stream_key)
+
+    def get(self, raw_conn, stream_key: str,
+            fallback: Optional[Callable[[], Optional[datetime]]] = None) -> Optional[datetime]:
+        """
+        Resolve the watermark for a stream.
+
+        Checks the in-process cache, then the watermark row. If neither exists
+        and ``fallback`` is given, it is called once (typically the legacy
+        ``MAX(...)`` query) and its result is seeded into the table and
+        committed on ``raw_conn``.
+
+        Args:
+            raw_conn: DB-API connection
+            stream_key: Stream within the collector (symbol, source, ...)
+            fallback: Optional callable returning the watermark from the data table
+
+        Returns:
+            The watermark, or None if the stream has no data yet
+        """
+        value = self.cached(stream_key)
+        if value is not None:
+            return value
+
+        with raw_conn.cursor() as cur:
+            cur.execute(
+                "SELECT watermark FROM trading.collector_watermarks WHERE collector = %s AND stream_key = %s",
+                (self.collector, stream_key)
+            )
+            row = cur.fetchone()
+        value = row[0] if row else None
+
+        if value is None and fallback is not None:
+            value = fallback()
+            if value is not None:
+                logger.info(f"Seeding {self.collector}/{stream_key} watermark from data table: {value}")
+                self.advance(raw_conn, stream_key, value)
+                raw_conn.commit()
+
+        if value is not None:
+            self.remember(stream_key, value)
+        return value
+
+    def advance(self, raw_conn, stream_key: str, value: datetime) -> None:
+        """
+        Move a stream's watermark forward inside the caller's transaction.
+
+        The row only ever moves forward. Call ``remember`` after the caller
+        commits so the cache never runs ahead of the database.
+        """
+        with raw_conn.cursor() as cur:
+            cur.execute(UPSERT_WATERMARK_SQL, (self.collector, stream_key, value))
+
+    def advance_many(self, raw_conn, watermarks: Dict[str, datetime]) -> None:
+        """Advance several streams inside the caller's transaction."""
+        for stream_key, value in watermarks.items():
+            self.advance(raw_conn, stream_key, value)
+
+    def remember(self, stream_key: str, value: datetime) -> None:
+        """Record a committed watermark in the in-process cache."""
+        with self._lock:
+            current = self._cache.get(stream_key)
+            if current is None or value > current:
+                self._cache[stream_key] = value
+
+    def remember_many(self, watermarks: Dict[str, datetime]) -> None:
+        """Record several committed watermarks in the in-process cache."""
+        for stream_key, value in watermarks.items():
+            self.remember(stream_key, value)
+
+
+def batch_watermarks(rows, key_index: int, time_index: int) -> Dict[str, datetime]:
+    """
+    Compute the newest timestamp per stream key in a batch of row tuples.
+
+    Args:
+        rows: Iterable of row tuples
+        key_index: Position of the stream key (e.g. symbol) in each row
+        time_index: Position of the timestamp in each row
+
+    Returns:
+        Dict of stream key -> newest timestamp
+    """
+    newest: Dict[str, datetime] = {}
+    for row in rows:
+        key, value = row[key_index], row[time_index]
+        if value is None:
+            continue
+        if key not in newest or value > newest[key]:
+            newest[key] = value
+    return newest
+
+
+_stores: Dict[str, WatermarkStore] = {}
+_stores_lock = threading.Lock()
+
+
+def watermark_store(collector: str) -> WatermarkStore:
+    """Get the process-wide watermark store for a collector, so the cache outlives collector instances."""
+    with _stores_lock:
+        store = _stores.get(collector)
+        if store is None:
+            store = WatermarkStore(collector)
+            _stores[collector] = store
+        return store
@@ -0,0 +1,100 @@
+"""
+Adaptive time-window planning for capped API endpoints.
+
+Endpoints such as ``/darkpool/{ticker}`` return at most ``limit`` rows per
+request (500 for dark pool, 200 for flow alerts) and say nothing about
+truncation. Stepping fixed windows either wastes calls on quiet periods or
+silently drops trades in busy ones.
+
+``WindowPlanner`` walks a range oldest to newest:
+
+* a response at the limit is treated as truncated and its window is bisected
+  and refetched, down to ``min_window``;
+* a response well under the limit grows the next window, merging it with its
+  neighbours, up to ``max_window``.
+
+The window size therefore tracks trade density, keeping calls per captured
+trade close to the minimum.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Iterator, List, NamedTuple, Sequence
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INITIAL_WINDOW = timedelta(minutes=5)
+DEFAULT_MIN_WINDOW = timedelta(seconds=1)
+DEFAULT_MAX_WINDOW = timedelta(hours=6)
+# Grow the next window when a response fills less than this share of the limit
+SPARSE_RATIO = 0.25
+
+
+class PlannedWindow(NamedTuple):
+    start: datetime
+    end: datetime
+    rows: List
+    truncated: bool  # Still at the limit at min_window; rows may be missing
+
+
+class WindowPlanner:
+    """Fetches a time range in density-sized windows."""
+
+    def __init__(self, fetch: Callable[[datetime, datetime], Sequence], limit: int,
+                 initial_window: timedelta = DEFAULT_INITIAL_WINDOW,
+                 min_window: timedelta = DEFAULT_MIN_WINDOW,
+                 max_window: timedelta = DEFAULT_MAX_WINDOW,
+                 sparse_ratio: float = SPARSE_RATIO):
+        """
+        Args:
+            fetch: Callable returning the rows for [start, end); a ``RecordBatch``
+                that dropped malformed rows is judged by its ``received`` count
+            limit: Maximum rows the endpoint returns per request
+        """
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+        self.fetch = fetch
+        self.limit = limit
+        self.initial_window = initial_window
+        self.min_window = min_window
+        self.max_window = max_window
+        self.sparse_ratio = sparse_ratio
+        self.calls = 0
+        self.bisections = 0
+
+    def walk(self, start: datetime, end: datetime) -> Iterator[PlannedWindow]:
+        """
+        Yield complete windows covering [start, end), oldest first.
+
+        Saturated responses are discarded and their window bisected, so every
+        yielded window holds all of its rows unless flagged ``truncated``.
+        """
+        size = self.initial_window
+        cursor = start
+        while cursor < end:
+            window_end = min(cursor + size, end)
+            page = self.fetch(cursor, window_end) or []
+            rows = list(page)
+            received = getattr(page, 'received', len(rows))
+            self.calls += 1
+
+            span = window_end - cursor
+            if received >= self.limit:
+                if span > self.min_window:
+                    # Truncated: retry the older half
+                    size = max(span / 2, self.min_window)
+                    self.bisections += 1
+                    continue
+                logger.warning(f"Window {cursor} -> {window_end} still returns {received} rows "
+                               f"at the minimum size; some rows may be missing")
+                yield PlannedWindow(cursor, window_end, rows, True)
+            else:
+                yield PlannedWindow(cursor, window_end, rows, False)
+                if received < self.limit * self.sparse_ratio:
+                    # Sparse: merge the next window with its neighbours
+                    size = min(span * 2, self.max_window)
+            cursor = window_end
+
+    def stats(self) -> dict:
+        """API calls made and windows bisected so far."""
+        return {'calls': self.calls, 'bisections': self.bisections}
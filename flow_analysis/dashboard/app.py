@@ -9,12 +9,14 @@ from functools import wraps
 from flask import Flask, render_template, jsonify, request, session, redirect, url_for, send_file
 from flow_analysis.monitoring.collector_monitor import CollectorMonitor
 from flow_analysis.config.env_config import DB_CONFIG
-import psycopg2
 import io
 import csv
 import subprocess
 import pytz
 from collectors.utils.market_utils import get_market_status
+from collectors.utils.coverage import CoverageIndex, covered_fraction, missing_windows
+from collectors.utils.db_pool import pg_connection, pool_stats
+from collectors.utils.credit_ledger import credit_ledger
 from dateutil import parser
 
 app = Flask(__name__)
@@ -29,6 +31,8 @@ app.config.update(
 )
 
 monitor = CollectorMonitor(DB_CONFIG)
+darkpool_coverage = CoverageIndex('darkpool')
+DARKPOOL_SYMBOLS = ['SPY', 'QQQ', 'TSLA']
 
 # Get dashboard password from environment variable
 DASHBOARD_PASSWORD = os.getenv('DASHBOARD_PASSWORD')
@@ -118,7 +122,7 @@ def logs():
         level = request.args.get('level')
         hours = request.args.get('hours', default=1, type=int)
         cest = pytz.timezone('Europe/Copenhagen')
-        with psycopg2.connect(**DB_CONFIG) as conn:
+        with pg_connection(DB_CONFIG) as conn:
             with conn.cursor() as cur:
                 query = """
                     SELECT 
@@ -165,7 +169,7 @@ def data_freshness():
     """Return data freshness and completeness info for each collector."""
     try:
         cest = pytz.timezone('Europe/Copenhagen')
-        with psycopg2.connect(**DB_CONFIG) as conn:
+        with pg_connection(DB_CONFIG) as conn:
             with conn.cursor() as cur:
                 result = {}
                 # News Collector
@@ -202,7 +206,13 @@ def data_freshness():
                 cur.execute("SELECT COUNT(*) FROM trading.darkpool_trades WHERE executed_at > NOW() - INTERVAL '1 hour';")
                 dp_count = cur.fetchone()[0]
                 dp_expected = 50
-                dp_completeness = int((dp_count / dp_expected) * 100) if dp_expected else 0
+                # Share of the last hour's 5-minute slots the collector has covered, across symbols
+                window_end = datetime.now(timezone.utc)
+                window_start = window_end - timedelta(hours=1)
+                dp_completeness = int(100 * sum(
+                    covered_fraction(darkpool_coverage.load(conn, symbol, window_start, window_end), window_start, window_end)
+                    for symbol in DARKPOOL_SYMBOLS
+                ) / len(DARKPOOL_SYMBOLS))
                 dp_status = 'up_to_date'
                 if dp_last:
                     delta = (datetime.now(timezone.utc) - dp_last.astimezone(timezone.utc)).total_seconds()
@@ -227,6 +237,30 @@ def data_freshness():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/darkpool_coverage')
+@login_required
+def darkpool_coverage_report():
+    """Return per-symbol coverage and missing windows from the coverage index."""
+    hours = request.args.get('hours', 24, type=int)
+    try:
+        cest = pytz.timezone('Europe/Copenhagen')
+        window_end = datetime.now(timezone.utc)
+        window_start = window_end - timedelta(hours=hours)
+        with pg_connection(DB_CONFIG) as conn:
+            result = {}
+            for symbol in DARKPOOL_SYMBOLS:
+                masks = darkpool_coverage.load(conn, symbol, window_start, window_end)
+                result[symbol] = {
+                    'completeness': int(100 * covered_fraction(masks, window_start, window_end)),
+                    'missing_windows': [
+                        {'start': start.astimezone(cest).isoformat(), 'end': end.astimezone(cest).isoformat()}
+                        for start, end in missing_windows(masks, window_start, window_end)
+                    ]
+                }
+            return jsonify({'hours': hours, 'symbols': result, 'timezone': 'Europe/Copenhagen (CEST)'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/export')
 @login_required
 def export_data():
@@ -237,7 +271,7 @@ def export_data():
     output = io.StringIO()
     writer = csv.writer(output)
     cest = pytz.timezone('Europe/Copenhagen')
-    with psycopg2.connect(**DB_CONFIG) as conn:
+    with pg_connection(DB_CONFIG) as conn:
         with conn.cursor() as cur:
             for collector in collectors:
                 if collector == 'news':
@@ -311,7 +345,7 @@ def collection_counts():
     group_by = "date_trunc('hour', timestamp)" if view == 'hourly' else "date_trunc('day', timestamp)"
     try:
         cest = pytz.timezone('Europe/Copenhagen')
-        with psycopg2.connect(**DB_CONFIG) as conn:
+        with pg_connection(DB_CONFIG) as conn:
             with conn.cursor() as cur:
                 query = f"""
                 SELECT
@@ -356,7 +390,7 @@ def trigger_backfill():
             return jsonify({'error': 'Invalid collector name'}), 400
             
         # Log the backfill request
-        with psycopg2.connect(**DB_CONFIG) as conn:
+        with pg_connection(DB_CONFIG) as conn:
             with conn.cursor() as cur:
                 cur.execute("""
                     INSERT INTO trading.collector_logs 
@@ -398,7 +432,7 @@ def restart_collector():
             return jsonify({'error': 'Invalid collector name'}), 400
             
         # Log the restart request
-        with psycopg2.connect(**DB_CONFIG) as conn:
+        with pg_connection(DB_CONFIG) as conn:
             with conn.cursor() as cur:
                 cur.execute("""
                     INSERT INTO trading.collector_logs 
@@ -424,6 +458,22 @@ def restart_collector():
 def market_status():
     return jsonify(get_market_status())
 
+@app.route('/api/pool_stats')
+@login_required
+def db_pool_stats():
+    """Connection pool usage for this dashboard process."""
+    return jsonify(pool_stats())
+
+@app.route('/api/credit_usage')
+@login_required
+def credit_usage():
+    """Today's API credits per collector and endpoint, burn rate and projected exhaustion."""
+    try:
+        with pg_connection(DB_CONFIG) as conn:
+            return jsonify(credit_ledger().usage(conn))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # Temporary route-printing snippet
 print("Registered routes:", [rule.rule for rule in app.url_map.iter_rules()])
 
@@ -6,10 +6,10 @@ import logging
 import time
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Optional, List, Any
-import psycopg2
 from psycopg2.extras import DictCursor
 from config.db_config import get_db_config
 from flow_analysis.config.env_config import DB_CONFIG
+from collectors.utils.db_pool import pg_connection
 
 # Set up logging
 logging.basicConfig(
@@ -45,7 +45,7 @@ class CollectorMonitor:
         current_time = datetime.now(timezone.utc)
         
         try:
-            with psycopg2.connect(**self.db_config) as conn:
+            with pg_connection(self.db_config) as conn:
                 with conn.cursor(cursor_factory=DictCursor) as cur:
                     # First check for recent heartbeats
                     cur.execute("""
@@ -207,7 +207,7 @@ class CollectorMonitor:
             Dictionary with overall health status and individual collector statuses
         """
         try:
-            with psycopg2.connect(**self.db_config) as conn:
+            with pg_connection(self.db_config) as conn:
                 with conn.cursor() as cur:
                     # Get latest status for each collector
                     cur.execute("""
@@ -311,7 +311,7 @@ class CollectorMonitor:
             List of status records
         """
         try:
-            with psycopg2.connect(**self.db_config) as conn:
+            with pg_connection(self.db_config) as conn:
                 with conn.cursor() as cur:
                     cur.execute("""
                         SELECT 
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Report on recent dark pool trades: CSV export plus per-symbol and hourly summaries.
+
+This ran at import time of ``options_flow_collector`` before; it is its own
+command now, so importing the collector no longer queries the database:
+
+    python flow_analysis/scripts/darkpool_24h_report.py --hours 24 --output-dir data
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from config.db_config import get_db_config
+from collectors.utils.db_pool import get_engine
+
+# Dark pool trades since :cutoff_time with enhanced metrics
+TRADES_QUERY = """
+SELECT
+    t.*,
+    date_trunc('hour', t.executed_at) as trade_hour,
+    t.price - t.nbbo_bid as price_impact,
+    (t.price - t.nbbo_bid) / t.nbbo_bid as price_impact_pct,
+    CASE
+        WHEN t.size >= 10000 THEN 'Block Trade'
+        WHEN t.premium >= 0.02 THEN 'High Premium'
+        ELSE 'Regular'
+    END as trade_type,
+    count(*) over (partition by t.symbol, date_trunc('hour', t.executed_at)) as trades_per_hour,
+    sum(t.size) over (partition by t.symbol, date_trunc('hour', t.executed_at)) as volume_per_hour
+FROM trading.darkpool_trades t
+WHERE t.executed_at >= :cutoff_time
+ORDER BY t.executed_at DESC
+"""
+
+
+def fetch_trades(engine, hours: int = 24) -> pd.DataFrame:
+    """Dark pool trades from the last ``hours`` hours."""
+    cutoff_time = datetime.now() - timedelta(hours=hours)
+    trades_df = pd.read_sql_query(TRADES_QUERY, engine, params={'cutoff_time': cutoff_time})
+
+    # Convert timestamp columns
+    trades_df['executed_at'] = pd.to_datetime(trades_df['executed_at'])
+    trades_df['collection_time'] = pd.to_datetime(trades_df['collection_time'])
+    trades_df['trade_hour'] = pd.to_datetime(trades_df['trade_hour'])
+    return trades_df
+
+
+def save_csv(trades_df: pd.DataFrame, output_dir: str = 'data', hours: int = 24) -> str:
+    """Write trades to a timestamped CSV in ``output_dir`` and return its path."""
+    os.makedirs(output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filename = os.path.join(output_dir, f'darkpool_trades_{hours}h_{timestamp}.csv')
+    trades_df.to_csv(filename, index=False)
+    return filename
+
+
+def print_summary(trades_df: pd.DataFrame) -> None:
+    """Print per-symbol, date range and hourly summaries."""
+    print("\nTrade summary by symbol:")
+    print(trades_df.groupby('symbol').agg({
+        'size': ['count', 'sum', 'mean'],
+        'premium': ['mean', 'max'],
+        'price_impact_pct': 'mean'
+    }).round(2))
+
+    print("\nDate range of trades:")
+    print(f"Earliest trade: {trades_df['executed_at'].min()}")
+    print(f"Latest trade: {trades_df['executed_at'].max()}")
+    print(f"Total number of trades: {len(trades_df)}")
+    print(f"Total volume: {trades_df['size'].sum():,.0f}")
+
+    # Additional time-based analysis
+    print("\nHourly trade distribution:")
+    hourly_stats = trades_df.groupby(trades_df['executed_at'].dt.hour).agg({
+        'size': ['count', 'sum'],
+        'premium': 'mean'
+    }).round(2)
+    print(hourly_stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export and summarize recent dark pool trades')
+    parser.add_argument('--hours', type=int, default=24, help='Look-back window in hours (default: 24)')
+    parser.add_argument('--output-dir', default='data', help='Directory for the CSV export (default: data)')
+    args = parser.parse_args()
+
+    print(f"Fetching dark pool trades from last {args.hours} hours...")
+    trades_df = fetch_trades(get_engine(get_db_config()), args.hours)
+
+    filename = save_csv(trades_df, args.output_dir, args.hours)
+    print(f"\nSaved {len(trades_df)} trades to {filename}")
+    print_summary(trades_df)
+
+
+if __name__ == '__main__':
+    main()
@@ -12,9 +12,7 @@ import pandas as pd
 from pathlib import Path
 import pytz
 from typing import Optional, Dict, List, Any
-import psycopg2
 from psycopg2.extras import execute_values
-import requests
 import argparse
 import time as time_module
 from requests.exceptions import RequestException
@@ -25,10 +23,14 @@ sys.path.append(str(project_root))
 
 from flow_analysis.config.api_config import (
     UW_BASE_URL, DARKPOOL_RECENT_ENDPOINT,
-    DEFAULT_HEADERS, REQUEST_TIMEOUT, REQUEST_RATE_LIMIT
+    DEFAULT_HEADERS, REQUEST_RATE_LIMIT
 )
 from flow_analysis.config.db_config import get_db_config, SCHEMA_NAME, TABLE_NAME
 from flow_analysis.config.watchlist import MARKET_OPEN, MARKET_CLOSE, SYMBOLS, MARKET_HOLIDAYS
+from collectors.utils.records import DarkPoolTrade, decode_records, to_arrays
+from collectors.utils.db_pool import get_pg_pool
+from collectors.utils.http_client import UWClient
+from collectors.utils.recent_ids import recent_ids
 
 print("DB_CONFIG:", get_db_config())
 
@@ -103,6 +105,8 @@ class DarkPoolCollector:
         self.rate_limit = 1.0  # seconds between requests
         self._last_request_time = None
         self.logger = self._setup_logger()
+        self.client = UWClient(headers=DEFAULT_HEADERS, base_url=UW_BASE_URL, throttle=self._rate_limit)
+        self.recent_ids = recent_ids('darkpool')
         
     def _setup_logger(self) -> logging.Logger:
         """Set up the logger for the collector."""
@@ -139,20 +143,22 @@ class DarkPoolCollector:
         return logger
 
     def connect_db(self) -> None:
-        """Connect to the database."""
+        """Check out a connection from the shared pool."""
         try:
             if self.db_conn is None or self.db_conn.closed:
-                self.db_conn = psycopg2.connect(**get_db_config())
-                self.logger.info("Successfully connected to database")
+                if self.db_conn is not None:
+                    get_pg_pool(get_db_config()).putconn(self.db_conn, close=True)
+                self.db_conn = get_pg_pool(get_db_config()).getconn()
+                self.logger.info("Checked out pooled database connection")
         except Exception as e:
             self.logger.error(f"Error connecting to database: {str(e)}")
             raise
 
     def close_db(self):
-        """Close the database connection."""
-        if self.db_conn and not self.db_conn.closed:
-            self.db_conn.close()
-            self.logger.info("Closed database connection")
+        """Return the database connection to the shared pool."""
+        if self.db_conn is not None:
+            get_pg_pool(get_db_config()).putconn(self.db_conn)
+            self.logger.info("Returned database connection to pool")
         self.db_conn = None
 
     def _rate_limit(self) -> None:
@@ -186,46 +192,29 @@ class DarkPoolCollector:
         return True
 
     def _make_request(self, endpoint: str) -> Optional[Dict]:
-        """Make an API request with retry logic."""
-        max_retries = 3
-        retry_count = 0
-        backoff_time = 1.0  # Initial backoff time in seconds
-        
-        while retry_count < max_retries:
-            try:
-                self._rate_limit()
-                self.logger.info(f"Making request to: {endpoint}")
-                response = requests.get(endpoint, headers=DEFAULT_HEADERS, timeout=REQUEST_TIMEOUT)
-                response.raise_for_status()
-                try:
-                    data = response.json()
-                    # Log the first few trades to see what we're getting
-                    if data and 'data' in data and data['data']:
-                        self.logger.info(f"API Response - Total trades: {len(data['data'])}")
-                        self.logger.info(f"First 5 trades tickers: {[t.get('ticker') for t in data['data'][:5]]}")
-                        # Count trades by ticker
-                        ticker_counts = {}
-                        for trade in data['data']:
-                            ticker = trade.get('ticker')
-                            ticker_counts[ticker] = ticker_counts.get(ticker, 0) + 1
-                        self.logger.info(f"Trades by ticker: {ticker_counts}")
-                except ValueError as e:
-                    self.logger.error(f"Invalid JSON response: {str(e)}")
-                    return None
-                if not self._validate_response(data):
-                    raise ValueError("Invalid response data")
-                return data
-            except (requests.exceptions.RequestException, ValueError) as e:
-                retry_count += 1
-                if retry_count == max_retries:
-                    self.logger.error(f"Failed to make request after {max_retries} retries: {str(e)}")
-                    return None
-                
-                self.logger.warning(f"Request failed (attempt {retry_count}/{max_retries}): {str(e)}")
-                time_module.sleep(backoff_time)
-                backoff_time *= 2  # Exponential backoff
-                
-        return None
+        """Make an API request through the shared client, which retries transient failures."""
+        self.logger.info(f"Making request to: {endpoint}")
+        try:
+            data = self.client.get_json(endpoint)
+        except RequestException as e:
+            self.logger.error(f"Failed to make request after {self.client.max_retries} attempts: {str(e)}")
+            return None
+        except ValueError as e:
+            self.logger.error(f"Invalid JSON response: {str(e)}")
+            return None
+        # Log the first few trades to see what we're getting
+        if data and 'data' in data and data['data']:
+            self.logger.info(f"API Response - Total trades: {len(data['data'])}")
+            self.logger.info(f"First 5 trades tickers: {[t.get('ticker') for t in data['data'][:5]]}")
+            # Count trades by ticker
+            ticker_counts = {}
+            for trade in data['data']:
+                ticker = trade.get('ticker')
+                ticker_counts[ticker] = ticker_counts.get(ticker, 0) + 1
+            self.logger.info(f"Trades by ticker: {ticker_counts}")
+        if not self._validate_response(data):
+            return None
+        return data
 
     def collect_trades(self) -> pd.DataFrame:
         """Collect recent dark pool trades."""
@@ -254,7 +243,9 @@ class DarkPoolCollector:
     def _process_trades(self, trades_data: List[Dict[str, Any]]) -> pd.DataFrame:
         """Process raw trades data into a DataFrame."""
         try:
-            trades = pd.DataFrame(trades_data)
+            # Records arrive typed and with our column names (ticker -> symbol)
+            records = decode_records(trades_data, DarkPoolTrade)
+            trades = pd.DataFrame(to_arrays(records, DarkPoolTrade.__slots__))
             if trades.empty:
                 self.logger.info("No trades data received")
                 return trades
@@ -263,36 +254,13 @@ class DarkPoolCollector:
             self.logger.info(f"Processing {initial_count} trades")
 
             # Debug logging for QQQ trades
-            qqq_trades = trades[trades['ticker'] == 'QQQ']
+            qqq_trades = trades[trades['symbol'] == 'QQQ']
             if not qqq_trades.empty:
                 self.logger.info(f"Found {len(qqq_trades)} QQQ trades in raw data")
                 self.logger.info(f"QQQ trade sample: {qqq_trades.iloc[0].to_dict()}")
             else:
                 self.logger.warning("No QQQ trades found in raw data")
 
-            # Map API column names to our expected column names
-            column_mapping = {
-                'tracking_id': 'tracking_id',
-                'ticker': 'symbol',
-                'price': 'price',
-                'size': 'size',
-                'executed_at': 'executed_at',
-                'market_center': 'market_center',
-                'sale_cond_codes': 'sale_cond_codes',
-                'nbbo_ask': 'nbbo_ask',
-                'nbbo_bid': 'nbbo_bid',
-                'volume': 'volume',
-                'premium': 'premium',
-                'nbbo_ask_quantity': 'nbbo_ask_quantity',
-                'nbbo_bid_quantity': 'nbbo_bid_quantity',
-                'ext_hour_sold_codes': 'ext_hour_sold_codes',
-                'trade_code': 'trade_code',
-                'trade_settlement': 'trade_settlement',
-                'canceled': 'canceled'
-            }
-            trades = trades.rename(columns=column_mapping)
-            self.logger.info(f"After column mapping: {len(trades)} trades")
-
             # Filter for target symbols only
             trades = trades[trades['symbol'].isin(SYMBOLS)]
             self.logger.info(f"After symbol filtering: {len(trades)} trades")
@@ -309,16 +277,7 @@ class DarkPoolCollector:
                 symbol_counts = trades['symbol'].value_counts()
                 self.logger.info(f"Trades per symbol: {symbol_counts.to_dict()}")
 
-            # Convert data types
-            numeric_columns = ['price', 'size', 'nbbo_ask', 'nbbo_bid', 'volume', 'premium',
-                             'nbbo_ask_quantity', 'nbbo_bid_quantity']
-            for col in numeric_columns:
-                if col in trades.columns:
-                    trades[col] = pd.to_numeric(trades[col], errors='coerce')
-
-            trades['executed_at'] = pd.to_datetime(trades['executed_at'], errors='coerce')
-            if 'canceled' in trades.columns:
-                trades['canceled'] = trades['canceled'].fillna(False)
+            trades['executed_at'] = pd.to_datetime(trades['executed_at'], utc=True)
 
             # Log any NaN values after conversion
             nan_counts = trades.isna().sum()
@@ -352,6 +311,17 @@ class DarkPoolCollector:
                 if self.db_conn.closed:
                     raise Exception("Failed to reconnect to database")
 
+            # Drop trades an earlier, overlapping /recent poll already wrote
+            self._warm_recent_ids()
+            trades = trades.drop_duplicates('tracking_id')
+            fresh_ids = self.recent_ids.unseen(trades['tracking_id'].tolist())
+            if len(fresh_ids) < len(trades):
+                trades = trades[trades['tracking_id'].isin(fresh_ids)]
+            self.logger.info(f"Recent tracking_id filter: {self.recent_ids.stats()}")
+            if trades.empty:
+                self.logger.info("All trades were already saved by an earlier poll")
+                return
+
             # Log trade distribution before saving
             symbol_counts = trades['symbol'].value_counts()
             self.logger.info(f"Trades to save by symbol: {symbol_counts.to_dict()}")
@@ -436,6 +406,7 @@ class DarkPoolCollector:
                 self.logger.info(f"Recent trades saved by symbol: {recent_counts}")
                 
                 self.logger.info(f"Successfully saved {len(trades)} trades to database")
+            self.recent_ids.add_many(trades['tracking_id'].tolist())
         except Exception as e:
             if not self.db_conn.closed:
                 self.db_conn.rollback()
@@ -446,6 +417,18 @@ class DarkPoolCollector:
         finally:
             self.close_db()
 
+    def _warm_recent_ids(self) -> None:
+        """Load the last horizon of tracking_ids from the database, once per process."""
+        if self.recent_ids.warmed:
+            return
+        since = datetime.now(pytz.UTC) - timedelta(seconds=self.recent_ids.horizon)
+        try:
+            self.recent_ids.warm(self.db_conn, f"{SCHEMA_NAME}.{TABLE_NAME}", since)
+        except Exception as e:
+            # The table may not exist yet; ON CONFLICT still catches what the filter misses
+            self.db_conn.rollback()
+            self.logger.warning(f"Could not warm recent tracking_id filter: {str(e)}")
+
     def is_market_open(self) -> bool:
         """Check if the market is currently open."""
         try:
@@ -9,7 +9,6 @@ import time
 import logging
 from datetime import datetime, timedelta
 import pandas as pd
-import requests
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 from requests.exceptions import RequestException
@@ -20,9 +19,10 @@ sys.path.append(str(project_root))
 
 from config.api_config import (
     UW_API_TOKEN, UW_BASE_URL, DARKPOOL_RECENT_ENDPOINT,
-    DARKPOOL_TICKER_ENDPOINT, DEFAULT_HEADERS, REQUEST_TIMEOUT,
+    DARKPOOL_TICKER_ENDPOINT, DEFAULT_HEADERS,
     REQUEST_RATE_LIMIT
 )
+from collectors.utils.http_client import UWClient
 from flow_analysis.config.watchlist import (
     SYMBOLS, BLOCK_SIZE_THRESHOLD, PREMIUM_THRESHOLD,
     PRICE_IMPACT_THRESHOLD, MARKET_OPEN, MARKET_CLOSE
@@ -42,6 +42,7 @@ class DarkPoolDataFetcher:
         self.raw_data_dir = project_root / "data/raw/darkpool"
         self.processed_data_dir = project_root / "data/processed"
         self.last_request_time = 0
+        self.client = UWClient(headers=self.headers, base_url=self.base_url, throttle=self._rate_limit)
         
         # Create directories if they don't exist
         self.raw_data_dir.mkdir(parents=True, exist_ok=True)
@@ -55,26 +56,13 @@ class DarkPoolDataFetcher:
             time.sleep(1.0 / REQUEST_RATE_LIMIT - time_since_last_request)
         self.last_request_time = time.time()
 
-    def _make_request(self, endpoint: str, params: Optional[Dict] = None, max_retries: int = 3) -> Optional[Dict]:
-        """Make an API request with retry logic"""
-        for attempt in range(max_retries):
-            try:
-                self._rate_limit()
-                response = requests.get(
-                    endpoint,
-                    headers=self.headers,
-                    params=params,
-                    timeout=REQUEST_TIMEOUT
-                )
-                response.raise_for_status()
-                return response.json()
-            except RequestException as e:
-                logger.error(f"Request failed (attempt {attempt + 1}/{max_retries}): {str(e)}")
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
-                else:
-                    logger.error(f"Max retries reached for endpoint: {endpoint}")
-                    return None
+    def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Optional[Dict]:
+        """Make an API request through the shared client, which retries with exponential backoff"""
+        try:
+            return self.client.get_json(endpoint, params=params)
+        except (RequestException, ValueError) as e:
+            logger.error(f"Request failed for endpoint {endpoint}: {str(e)}")
+            return None
 
     def _validate_response(self, data: Dict) -> bool:
         """Validate API response data"""
@@ -5,7 +5,10 @@ Data Validation Module for News Collector
 Handles data quality checks, validation, and cleaning
 """
 
+import hashlib
 import logging
+import math
+import sys
 from datetime import datetime, timedelta
 import psycopg2
 from psycopg2.extras import execute_values
@@ -21,6 +24,13 @@ import numpy as np
 from sqlalchemy import create_engine, text
 from sqlalchemy.pool import QueuePool
 
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from collectors.utils.recent_ids import RecentIdFilter
+from collectors.utils.records import parse_timestamp
+
 # Constants
 MIN_HEADLINE_LENGTH = 10
 MAX_HEADLINE_LENGTH = 500
@@ -36,6 +46,25 @@ BLACKLISTED_WORDS = {
     'spam', 'clickbait', 'scam', 'fake', 'hoax', 'prank'
 }
 
+# Duplicate detection: 64-bit hashes of (headline, published_at) seen in the last
+# 24 hours, in hourly slices, and never more than DUPLICATE_MAX_HEADLINES of them
+DUPLICATE_WINDOW = 24 * 3600  # seconds
+DUPLICATE_SLICES = 24
+DUPLICATE_MAX_HEADLINES = 240000
+# Same hash as headline_hash, computed in Postgres so warming transfers 8 bytes a row
+HEADLINE_HASH_SQL = (
+    "('x' || left(md5(headline || '|' || floor(extract(epoch FROM published_at))::bigint), 16))"
+    "::bit(64)::bigint"
+)
+
+
+def headline_hash(headline: str, published_at) -> int:
+    """Signed 64-bit hash of a headline and its publish time (matches ``HEADLINE_HASH_SQL``)."""
+    epoch = math.floor(parse_timestamp(published_at).timestamp())
+    digest = hashlib.md5(f"{headline}|{epoch}".encode()).digest()
+    return int.from_bytes(digest[:8], 'big', signed=True)
+
+
 @dataclass
 class ValidationResult:
     """Data validation result"""
@@ -54,7 +83,8 @@ class DataValidator:
         self.logger = self._setup_logger()
         self.eastern = pytz.timezone('US/Eastern')
         self.engine = self._create_engine()
-        self.duplicate_cache = set()
+        self.duplicate_cache = RecentIdFilter(DUPLICATE_WINDOW, DUPLICATE_SLICES,
+                                              max_size=DUPLICATE_MAX_HEADLINES)
         self._load_duplicate_cache()
         
     def _setup_logger(self) -> logging.Logger:
@@ -94,18 +124,18 @@ class DataValidator:
         )
 
     def _load_duplicate_cache(self) -> None:
-        """Load recent headlines into duplicate cache"""
+        """Load hashes of the last 24 hours' headlines into the duplicate cache"""
+        since = datetime.now(pytz.UTC) - timedelta(seconds=DUPLICATE_WINDOW)
+        raw_conn = None
         try:
-            with self.engine.connect() as conn:
-                result = conn.execute(text("""
-                    SELECT headline, published_at
-                    FROM trading.news_headlines
-                    WHERE collected_at >= NOW() - INTERVAL '24 hours'
-                """))
-                for row in result:
-                    self.duplicate_cache.add((row.headline, row.published_at))
+            raw_conn = self.engine.raw_connection()
+            self.duplicate_cache.warm(raw_conn, 'trading.news_headlines', since,
+                                      id_column=HEADLINE_HASH_SQL, time_column='collected_at')
         except Exception as e:
             self.logger.error(f"Error loading duplicate cache: {str(e)}")
+        finally:
+            if raw_conn is not None:
+                raw_conn.close()
 
     def validate_news_data(self, data: Dict) -> ValidationResult:
         """Validate a single news record"""
@@ -301,10 +331,10 @@ class DataValidator:
 
     def _is_duplicate(self, data: Dict) -> bool:
         """Check if headline is a duplicate"""
-        key = (data['headline'], data['published_at'])
-        if key in self.duplicate_cache:
+        key = headline_hash(data['headline'], data['published_at'])
+        if not self.duplicate_cache.unseen([key]):
             return True
-        self.duplicate_cache.add(key)
+        self.duplicate_cache.add_many([key])
         return False
 
     def _contains_blacklisted_words(self, headline: str) -> bool:
@@ -15,8 +15,7 @@ from psycopg2.extras import execute_values
 import requests
 import argparse
 import json
-from collections import deque
-from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from scipy.stats import norm
 import math
@@ -36,25 +35,25 @@ logger.info(f"Using environment file: {env_file}")
 from flow_analysis.config.api_config import (
     UW_API_TOKEN, UW_BASE_URL, 
     OPTION_CONTRACTS_ENDPOINT, OPTION_FLOW_ENDPOINT,
-    EXPIRY_BREAKDOWN_ENDPOINT, DEFAULT_HEADERS, 
-    REQUEST_TIMEOUT, REQUEST_RATE_LIMIT
+    EXPIRY_BREAKDOWN_ENDPOINT, DEFAULT_HEADERS
 )
 from flow_analysis.config.db_config import get_db_config, SCHEMA_NAME
 from flow_analysis.config.watchlist import SYMBOLS
 from collectors.utils.market_utils import is_market_open, get_next_market_open
+from collectors.utils.watermarks import WatermarkStore, watermark_store, batch_watermarks
+from collectors.utils.records import FlowAlert, decode_records, to_arrays
+from collectors.utils.db_pool import get_pg_pool
+from collectors.utils.http_client import UWClient
+from collectors.utils.credit_ledger import HIGH, LOW, CreditBudgetExceeded, credit_ledger
+from collectors.utils.rate_limiter import shared_limiter
+from collectors.utils.cache_store import NO_EXPIRY, cache_store
+from collectors.utils.time_buckets import TimeBuckets
 
 # Constants
 MIN_PREMIUM = 25000  # Minimum premium for significant flows
 BATCH_SIZE = 100  # Number of records to insert at once
-
-# Rate limiting constants
-MAX_REQUESTS_PER_MINUTE = 60  # Maximum requests per minute
-MAX_REQUESTS_PER_HOUR = 3000  # Maximum requests per hour
-RATE_LIMIT_WINDOW = 3600  # Time window for rate limiting (1 hour)
-MIN_REQUEST_INTERVAL = 1.0  # Minimum time between requests in seconds
-BACKOFF_FACTOR = 2  # Factor to increase backoff time
-MAX_BACKOFF = 300  # Maximum backoff time in seconds (5 minutes)
-REQUEST_HISTORY_SIZE = 3600  # Size of request history (1 hour worth of seconds)
+ALERT_CACHE_PATH = 'cache/flow_alerts.sqlite3'  # Responses for closed backfill days
+ALERT_CACHE_MAX_BYTES = 64 * 1024 * 1024
 
 # Set up logging
 log_dir = Path("logs")
@@ -75,59 +74,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-class RateLimiter:
-    def __init__(self):
-        self.request_times = deque(maxlen=REQUEST_HISTORY_SIZE)
-        self.lock = Lock()
-        self.current_backoff = MIN_REQUEST_INTERVAL
-        self.last_request_time = 0
-        
-    def _clean_old_requests(self, current_time: float) -> None:
-        """Remove requests older than the rate limit window"""
-        while self.request_times and (current_time - self.request_times[0]) > RATE_LIMIT_WINDOW:
-            self.request_times.popleft()
-            
-    def _get_requests_in_window(self, window: int, current_time: float) -> int:
-        """Get number of requests in the specified window"""
-        return sum(1 for t in self.request_times if current_time - t <= window)
-        
-    def wait_if_needed(self) -> None:
-        """Wait if necessary to comply with rate limits"""
-        with self.lock:
-            current_time = time.time()
-            self._clean_old_requests(current_time)
-            
-            # Check rate limits
-            requests_last_minute = self._get_requests_in_window(60, current_time)
-            requests_last_hour = len(self.request_times)
-            
-            if requests_last_minute >= MAX_REQUESTS_PER_MINUTE or requests_last_hour >= MAX_REQUESTS_PER_HOUR:
-                sleep_time = max(
-                    60 - (current_time - self.request_times[-MAX_REQUESTS_PER_MINUTE] if requests_last_minute >= MAX_REQUESTS_PER_MINUTE else 0),
-                    3600 - (current_time - self.request_times[0] if requests_last_hour >= MAX_REQUESTS_PER_HOUR else 0)
-                )
-                logger.warning(f"Rate limit approaching, sleeping for {sleep_time:.2f} seconds")
-                time.sleep(sleep_time)
-                
-            # Ensure minimum interval between requests
-            time_since_last = current_time - self.last_request_time
-            if time_since_last < self.current_backoff:
-                time.sleep(self.current_backoff - time_since_last)
-            
-            # Record this request
-            self.request_times.append(time.time())
-            self.last_request_time = time.time()
-            
-    def update_backoff(self, success: bool) -> None:
-        """Update backoff time based on request success"""
-        if success:
-            # On success, gradually reduce backoff time
-            self.current_backoff = max(MIN_REQUEST_INTERVAL, self.current_backoff / BACKOFF_FACTOR)
-        else:
-            # On failure, increase backoff time
-            self.current_backoff = min(MAX_BACKOFF, self.current_backoff * BACKOFF_FACTOR)
-            logger.warning(f"Increased backoff time to {self.current_backoff:.2f} seconds")
-
 class FlowAlertsCollector:
     """Collects flow alerts data for specified symbols."""
     
@@ -162,11 +108,25 @@ class FlowAlertsCollector:
         
         self.base_url = UW_BASE_URL
         self.headers = DEFAULT_HEADERS
-        self.rate_limiter = RateLimiter()
+        self.symbols = list(SYMBOLS)
+        self.concurrent = True  # Fetch symbols in parallel, sharing one API rate budget
+        self.max_workers = len(self.symbols)
+        self.rate_limiter = shared_limiter('uw')  # One budget across collector processes
+        self.credits = credit_ledger()
+        self.credit_priority = HIGH  # LOW while backfilling an explicit range
+        self.client = UWClient(headers=self.headers, base_url=self.base_url, throttle=self.rate_limiter.acquire,
+                               observe=self.rate_limiter.observe,
+                               reserve=self.credits.reserver('flow_alerts', lambda endpoint: self.credit_priority))
+        self.watermarks = watermark_store('flow_alerts')
+        # Backfills request whole UTC days; closed days are cached for good
+        self.buckets = TimeBuckets(timedelta(days=1))
+        self.cache = cache_store(ALERT_CACHE_PATH, max_bytes=ALERT_CACHE_MAX_BYTES)
         
         # Initialize database connection
         self.db_conn = None
         self.connect_db()
+        WatermarkStore.ensure_table(self.db_conn)
+        self.db_conn.commit()
         
     def _setup_logger(self) -> logging.Logger:
         """Set up and return a logger instance."""
@@ -197,39 +157,35 @@ class FlowAlertsCollector:
         return logger
         
     def connect_db(self) -> None:
-        """Establish database connection."""
+        """Check out a connection from the shared pool."""
         try:
-            self.db_conn = psycopg2.connect(**self.db_config)
-            self.logger.info("Successfully connected to database")
+            pool = get_pg_pool(self.db_config)
+            if self.db_conn is not None:
+                pool.putconn(self.db_conn, close=self.db_conn.closed)
+            self.db_conn = pool.getconn()
+            self.logger.info("Checked out pooled database connection")
         except Exception as e:
             self.logger.error(f"Failed to connect to database: {str(e)}")
             raise
             
-    def _rate_limit(self) -> None:
-        """Apply rate limiting to API requests."""
-        self.rate_limiter.wait_if_needed()
-        
     def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Optional[Dict]:
-        """Make an API request with rate limiting and error handling."""
-        self._rate_limit()
-        
+        """Make an API request through the shared client with rate limiting and error handling."""
         try:
-            response = requests.get(
-                f"{self.base_url}{endpoint}",
-                headers=self.headers,
-                params=params,
-                timeout=REQUEST_TIMEOUT
-            )
-            response.raise_for_status()
-            self.rate_limiter.update_backoff(True)
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            self.rate_limiter.update_backoff(False)
+            data = self.client.get_json(endpoint, params=params)
+            return data
+        except CreditBudgetExceeded as e:
+            self.logger.warning(f"Request refused: {str(e)}")
+            return None
+        except (requests.exceptions.RequestException, ValueError) as e:
             self.logger.error(f"API request failed: {str(e)}")
             return None
-            
-    def get_flow_alerts(self, symbol: str) -> Optional[Dict]:
-        """Get flow alerts for a specific symbol."""
+
+    def get_flow_alerts(self, symbol: str, start: Optional[datetime] = None,
+                        end: Optional[datetime] = None) -> Optional[Dict]:
+        """Get flow alerts for a specific symbol, optionally limited to the window [start, end).
+
+        Responses for closed windows are served from the cache once fetched.
+        """
         endpoint = "/option-trades/flow-alerts"  # Correct endpoint from API docs
         params = {
             "ticker_symbol": symbol,
@@ -244,7 +200,23 @@ class FlowAlertsCollector:
             "is_bid_side": True,  # Include bid side
             "all_opening": True  # Only include opening trades
         }
-        return self._make_request(endpoint, params)
+        if start is None or end is None:
+            return self._make_request(endpoint, params)
+
+        params["newer_than"] = start.isoformat()
+        params["older_than"] = end.isoformat()
+        cache_key = self.buckets.key('flow_alerts', start, end, {'symbol': symbol, 'limit': params["limit"]})
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        data = self._make_request(endpoint, params)
+        if data is not None and cache_key is not None:
+            try:
+                self.cache.set(cache_key, data, ttl=NO_EXPIRY)
+            except Exception as e:
+                self.logger.warning(f"Cache write error: {str(e)}")
+        return data
         
     def _process_alert_data(self, alert_data: Dict) -> pd.DataFrame:
         """Process raw alert data into a DataFrame."""
@@ -253,7 +225,8 @@ class FlowAlertsCollector:
                 self.logger.warning("No alert data received")
                 return pd.DataFrame()
 
-            alerts = pd.DataFrame(alert_data['data'])
+            records = decode_records(alert_data['data'], FlowAlert)
+            alerts = pd.DataFrame(to_arrays(records, FlowAlert.__slots__))
             if alerts.empty:
                 return alerts
 
@@ -346,6 +319,24 @@ class FlowAlertsCollector:
             with self.db_conn.cursor() as cur:
                 for i in range(0, len(alerts_data), BATCH_SIZE):
                     batch = alerts_data[i:i + BATCH_SIZE]
+                    rows = [(
+                        alert['symbol'],
+                        alert['timestamp'],
+                        alert['alert_type'],
+                        alert['price'],
+                        alert['size'],
+                        alert['premium'],
+                        alert['expiration'],
+                        alert['strike'],
+                        alert['option_type'],
+                        alert['delta'],
+                        alert['volume'],
+                        alert['open_interest'],
+                        alert['bid'],
+                        alert['ask'],
+                        alert['bid_ask_spread_pct'],
+                        alert['collection_time']
+                    ) for alert in batch]
                     execute_values(
                         cur,
                         """
@@ -356,26 +347,13 @@ class FlowAlertsCollector:
                             collection_time
                         ) VALUES %s
                         """,
-                        [(
-                            alert['symbol'],
-                            alert['timestamp'],
-                            alert['alert_type'],
-                            alert['price'],
-                            alert['size'],
-                            alert['premium'],
-                            alert['expiration'],
-                            alert['strike'],
-                            alert['option_type'],
-                            alert['delta'],
-                            alert['volume'],
-                            alert['open_interest'],
-                            alert['bid'],
-                            alert['ask'],
-                            alert['bid_ask_spread_pct'],
-                            alert['collection_time']
-                        ) for alert in batch]
+                        rows
                     )
+                    # Advance per-symbol watermarks in the same transaction as the batch
+                    marks = batch_watermarks(rows, 0, 1)
+                    self.watermarks.advance_many(self.db_conn, marks)
                     self.db_conn.commit()
+                    self.watermarks.remember_many(marks)
                     
             self.logger.info(f"Successfully saved {len(alerts)} alerts to database")
             
@@ -392,8 +370,104 @@ class FlowAlertsCollector:
         """Get the next market open time."""
         return get_next_market_open()
         
-    def collect(self, start_date=None, end_date=None) -> None:
-        """Collect flow alerts for the specified date range."""
+    def _get_watermark(self, symbol: str) -> Optional[datetime]:
+        """Get the newest stored alert timestamp for a symbol, seeding it from flow_alerts on first use."""
+        def latest_from_alerts():
+            with self.db_conn.cursor() as cur:
+                cur.execute("SELECT MAX(timestamp) FROM flow_alerts WHERE symbol = %s", (symbol,))
+                return cur.fetchone()[0]
+
+        try:
+            return self.watermarks.get(self.db_conn, symbol, fallback=latest_from_alerts)
+        except psycopg2.Error as e:
+            # flow_alerts doesn't exist until the first save
+            self.db_conn.rollback()
+            self.logger.warning(f"Could not resolve watermark for {symbol}: {str(e)}")
+            return None
+
+    def _fetch_symbol(self, symbol: str, windows, start_date=None, end_date=None,
+                      watermark: Optional[datetime] = None) -> pd.DataFrame:
+        """Fetch one symbol's alerts over ``windows``, keeping those in range and after ``watermark``.
+
+        Makes no database calls, so symbols can be fetched in parallel.
+        """
+        frames = []
+        for window_start, window_end in windows:
+            alert_data = self.get_flow_alerts(symbol, window_start, window_end)
+            if not alert_data:
+                self.logger.warning(f"No alert data received for {symbol}")
+                continue
+
+            alerts = self._process_alert_data(alert_data)
+            if alerts.empty:
+                continue
+            if start_date is not None:
+                alerts = alerts[(alerts['timestamp'] >= start_date) & (alerts['timestamp'] <= end_date)]
+            if watermark is not None:
+                alerts = alerts[alerts['timestamp'] > watermark]
+            if not alerts.empty:
+                frames.append(alerts)
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def _collect_cycle(self, windows, start_date=None, end_date=None,
+                       use_watermarks: bool = True) -> Dict[str, Dict]:
+        """Fetch every symbol's alerts, then save them all in one write.
+
+        Watermarks are read on the collector's connection first; the symbols
+        are then fetched on a thread pool when ``self.concurrent`` is set, all
+        drawing requests from the shared rate limiter. A symbol that fails is
+        logged and left out of the write.
+
+        Returns:
+            Dict of symbol -> ``seconds`` spent fetching, ``alerts`` kept and any ``error``
+        """
+        watermarks = {symbol: self._get_watermark(symbol) if use_watermarks else None
+                      for symbol in self.symbols}
+
+        def fetch(symbol):
+            self.logger.info(f"Collecting flow alerts for {symbol}")
+            symbol_start = time.monotonic()
+            try:
+                alerts = self._fetch_symbol(symbol, windows, start_date, end_date, watermarks[symbol])
+                error = None
+            except Exception as e:
+                self.logger.error(f"Error collecting flow alerts for {symbol}: {str(e)}")
+                alerts, error = pd.DataFrame(), str(e)
+            return symbol, alerts, time.monotonic() - symbol_start, error
+
+        if self.concurrent and len(self.symbols) > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='flow_alerts') as executor:
+                results = list(executor.map(fetch, self.symbols))
+        else:
+            results = [fetch(symbol) for symbol in self.symbols]
+
+        frames = [alerts for _, alerts, _, _ in results if not alerts.empty]
+        write_start = time.monotonic()
+        if frames:
+            self.save_alerts_to_db(pd.concat(frames, ignore_index=True))
+        write_seconds = time.monotonic() - write_start
+
+        per_symbol = {}
+        for symbol, alerts, seconds, error in results:
+            per_symbol[symbol] = {'seconds': round(seconds, 3), 'alerts': len(alerts)}
+            if error is not None:
+                per_symbol[symbol]['error'] = error
+        self.logger.info(f"Flow alerts cycle: {sum(len(a) for a in frames)} alerts, "
+                         f"write {write_seconds:.3f}s, concurrent={self.concurrent}, per symbol: {per_symbol}")
+        return per_symbol
+
+    def collect(self, start_date=None, end_date=None) -> Dict[str, Dict]:
+        """Collect flow alerts for the specified date range.
+
+        Without an explicit ``start_date`` each symbol resumes from its
+        watermark, falling back to the last 7 days for symbols never collected.
+        An explicit range is fetched one UTC day at a time, so days that have
+        closed are served from the cache on later runs.
+
+        Returns:
+            Per-symbol cycle stats, as ``_collect_cycle``
+        """
+        use_watermarks = not start_date
         if not start_date:
             start_date = datetime.now(timezone.utc) - timedelta(days=7)
         if not end_date:
@@ -401,29 +475,12 @@ class FlowAlertsCollector:
         
         self.logger.info(f"Collecting flow alerts from {start_date} to {end_date}")
         
+        windows = [(None, None)] if use_watermarks else self.buckets.split(start_date, end_date)
+        self.credit_priority = HIGH if use_watermarks else LOW
         try:
-            for symbol in SYMBOLS:
-                self.logger.info(f"Collecting flow alerts for {symbol}")
-                
-                # Get flow alerts
-                alert_data = self.get_flow_alerts(symbol)
-                if not alert_data:
-                    self.logger.warning(f"No alert data received for {symbol}")
-                    continue
-                    
-                # Process alerts
-                alerts = self._process_alert_data(alert_data)
-                if not alerts.empty:
-                    # Filter by date range
-                    alerts = alerts[
-                        (alerts['timestamp'] >= start_date) &
-                        (alerts['timestamp'] <= end_date)
-                    ]
-                    if not alerts.empty:
-                        # Save to database
-                        self.save_alerts_to_db(alerts)
-                    
+            per_symbol = self._collect_cycle(windows, start_date, end_date, use_watermarks)
             self.logger.info("Flow alerts collection completed for all symbols")
+            return per_symbol
         except Exception as e:
             self.logger.error(f"Error in flow alerts collection: {str(e)}")
             raise
@@ -432,31 +489,21 @@ class FlowAlertsCollector:
         """Run the flow alerts collector."""
         self.logger.info("Starting flow alerts collector")
         
+        self.credit_priority = HIGH
         try:
-            for symbol in SYMBOLS:
-                self.logger.info(f"Collecting flow alerts for {symbol}")
-                
-                # Get flow alerts
-                alert_data = self.get_flow_alerts(symbol)
-                if not alert_data:
-                    self.logger.warning(f"No alert data received for {symbol}")
-                    continue
-                    
-                # Process alerts
-                alerts = self._process_alert_data(alert_data)
-                if not alerts.empty:
-                    # Save to database
-                    self.save_alerts_to_db(alerts)
-                    
+            self._collect_cycle([(None, None)])
             self.logger.info("Flow alerts collection completed for all symbols")
         except Exception as e:
             self.logger.error(f"Error in flow alerts collector: {str(e)}")
             time.sleep(60)  # Sleep for 1 minute before retrying
+        finally:
+            self.logger.info(f"Rate limiter: {self.rate_limiter.stats()}")
             
     def __del__(self):
         """Clean up resources."""
-        if self.db_conn:
-            self.db_conn.close()
+        if self.db_conn is not None:
+            get_pg_pool(self.db_config).putconn(self.db_conn)
+            self.db_conn = None
             
     def backfill(self, start_date=None, end_date=None, days=7):
         """Backfill flow alerts for the specified date range."""
@@ -473,6 +520,7 @@ def main():
     parser = argparse.ArgumentParser(description='Collect flow alerts data')
     parser.add_argument('--env', type=str, default='prod', help='Environment to use (local, prod)')
     parser.add_argument('--symbol', type=str, help='Symbol to collect data for')
+    parser.add_argument('--sequential', action='store_true', help='Collect symbols one after another')
     args = parser.parse_args()
     
     # Load environment variables for direct script execution
@@ -481,9 +529,11 @@ def main():
     
     # Initialize collector
     collector = FlowAlertsCollector(get_db_config(), UW_API_TOKEN)
+    collector.concurrent = not args.sequential
     
     if args.symbol:
-        collector.collect(symbol=args.symbol)
+        collector.symbols = [args.symbol]
+        collector.collect()
     else:
         collector.run()
 
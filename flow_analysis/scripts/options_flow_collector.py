@@ -1,26 +1,18 @@
 #!/usr/bin/env python3
 
-import os
+import argparse
 import sys
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from logging.handlers import RotatingFileHandler
 from datetime import datetime, timedelta
 import pandas as pd
 from pathlib import Path
 import pytz
-from typing import Optional, Dict, List, Tuple, Union
-import psycopg2
+from typing import Optional, Dict
 from psycopg2.extras import execute_values
 import requests
-import argparse
-import json
-from collections import deque
-from threading import Lock
-import numpy as np
-from scipy.stats import norm
-import math
-from sqlalchemy import create_engine
 
 # Add the project root to the Python path
 project_root = Path(__file__).parent.parent.parent
@@ -29,184 +21,41 @@ sys.path.append(str(project_root))
 from flow_analysis.config.api_config import (
     UW_API_TOKEN, UW_BASE_URL, 
     OPTION_CONTRACTS_ENDPOINT, OPTION_FLOW_ENDPOINT,
-    EXPIRY_BREAKDOWN_ENDPOINT, DEFAULT_HEADERS, 
-    REQUEST_TIMEOUT, REQUEST_RATE_LIMIT
+    EXPIRY_BREAKDOWN_ENDPOINT, DEFAULT_HEADERS
 )
-from flow_analysis.config.db_config import DB_CONFIG, SCHEMA_NAME
+from flow_analysis.config.db_config import get_db_config
 from flow_analysis.config.watchlist import MARKET_OPEN, MARKET_CLOSE, SYMBOLS, MARKET_HOLIDAYS, EASTERN
+from collectors.utils.records import OptionFlow, decode_records, to_arrays
+from collectors.utils.db_pool import get_pg_pool
+from collectors.utils.http_client import UWClient
+from collectors.utils.credit_ledger import CreditBudgetExceeded, credit_ledger
+from collectors.utils.rate_limiter import shared_limiter
 
 # Constants
 MIN_PREMIUM = 25000  # Increased minimum premium to $25k to focus on significant flows
 BATCH_SIZE = 100  # Number of records to insert at once
 
-# Rate limiting constants
-MAX_REQUESTS_PER_MINUTE = 60  # Maximum requests per minute
-MAX_REQUESTS_PER_HOUR = 3000  # Maximum requests per hour
-RATE_LIMIT_WINDOW = 3600  # Time window for rate limiting (1 hour)
-MIN_REQUEST_INTERVAL = 1.0  # Minimum time between requests in seconds
-BACKOFF_FACTOR = 2  # Factor to increase backoff time
-MAX_BACKOFF = 300  # Maximum backoff time in seconds (5 minutes)
-REQUEST_HISTORY_SIZE = 3600  # Size of request history (1 hour worth of seconds)
-
-# Set up logging
-log_dir = Path("logs")
-log_dir.mkdir(exist_ok=True)
-log_file = log_dir / "options_flow_collector.log"
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        RotatingFileHandler(
-            log_file,
-            maxBytes=5*1024*1024,  # 5MB
-            backupCount=5
-        ),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
-# Database connection setup
-DB_CONFIG = {
-    'dbname': 'defaultdb',
-    'user': 'doadmin',
-    'password': 'AVNS_SrG4Bo3B7uCNEPONkE4',
-    'host': 'vvv-trading-db-do-user-2110609-0.i.db.ondigitalocean.com',
-    'port': '25060'
-}
-
-# Create database URL
-DATABASE_URL = f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['dbname']}"
-
-# Create engine with SSL required
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={
-        'sslmode': 'require'
-    }
-)
 
-# Calculate timestamp for 24 hours ago
-twenty_four_hours_ago = datetime.now() - timedelta(hours=24)
-
-# Query dark pool trades from last 24 hours with enhanced metrics
-query = """
-SELECT 
-    t.*,
-    date_trunc('hour', t.executed_at) as trade_hour,
-    t.price - t.nbbo_bid as price_impact,
-    (t.price - t.nbbo_bid) / t.nbbo_bid as price_impact_pct,
-    CASE 
-        WHEN t.size >= 10000 THEN 'Block Trade'
-        WHEN t.premium >= 0.02 THEN 'High Premium'
-        ELSE 'Regular'
-    END as trade_type,
-    count(*) over (partition by t.symbol, date_trunc('hour', t.executed_at)) as trades_per_hour,
-    sum(t.size) over (partition by t.symbol, date_trunc('hour', t.executed_at)) as volume_per_hour
-FROM trading.darkpool_trades t
-WHERE t.executed_at >= :cutoff_time
-ORDER BY t.executed_at DESC
-"""
-
-# Fetch trades
-print("Fetching dark pool trades from last 24 hours...")
-trades_df = pd.read_sql_query(
-    query, 
-    engine, 
-    params={'cutoff_time': twenty_four_hours_ago}
-)
-
-# Convert timestamp columns
-trades_df['executed_at'] = pd.to_datetime(trades_df['executed_at'])
-trades_df['collection_time'] = pd.to_datetime(trades_df['collection_time'])
-trades_df['trade_hour'] = pd.to_datetime(trades_df['trade_hour'])
-
-# Create data directory if it doesn't exist
-os.makedirs('data', exist_ok=True)
-
-# Generate filename with current timestamp
-timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-filename = f'data/darkpool_trades_24h_{timestamp}.csv'
-
-# Save to CSV
-trades_df.to_csv(filename, index=False)
-print(f"\nSaved {len(trades_df)} trades to {filename}")
-
-# Print summary statistics
-print("\nTrade summary by symbol:")
-print(trades_df.groupby('symbol').agg({
-    'size': ['count', 'sum', 'mean'],
-    'premium': ['mean', 'max'],
-    'price_impact_pct': 'mean'
-}).round(2))
-
-print("\nDate range of trades:")
-print(f"Earliest trade: {trades_df['executed_at'].min()}")
-print(f"Latest trade: {trades_df['executed_at'].max()}")
-print(f"Total number of trades: {len(trades_df)}")
-print(f"Total volume: {trades_df['size'].sum():,.0f}")
-
-# Additional time-based analysis
-print("\nHourly trade distribution:")
-hourly_stats = trades_df.groupby(trades_df['executed_at'].dt.hour).agg({
-    'size': ['count', 'sum'],
-    'premium': 'mean'
-}).round(2)
-print(hourly_stats)
-
-class RateLimiter:
-    def __init__(self):
-        self.request_times = deque(maxlen=REQUEST_HISTORY_SIZE)
-        self.lock = Lock()
-        self.current_backoff = MIN_REQUEST_INTERVAL
-        self.last_request_time = 0
-        
-    def _clean_old_requests(self, current_time: float) -> None:
-        """Remove requests older than the rate limit window"""
-        while self.request_times and (current_time - self.request_times[0]) > RATE_LIMIT_WINDOW:
-            self.request_times.popleft()
-            
-    def _get_requests_in_window(self, window: int, current_time: float) -> int:
-        """Get number of requests in the specified window"""
-        return sum(1 for t in self.request_times if current_time - t <= window)
-        
-    def wait_if_needed(self) -> None:
-        """Wait if necessary to comply with rate limits"""
-        with self.lock:
-            current_time = time.time()
-            self._clean_old_requests(current_time)
-            
-            # Check rate limits
-            requests_last_minute = self._get_requests_in_window(60, current_time)
-            requests_last_hour = len(self.request_times)
-            
-            if requests_last_minute >= MAX_REQUESTS_PER_MINUTE or requests_last_hour >= MAX_REQUESTS_PER_HOUR:
-                sleep_time = max(
-                    60 - (current_time - self.request_times[-MAX_REQUESTS_PER_MINUTE] if requests_last_minute >= MAX_REQUESTS_PER_MINUTE else 0),
-                    3600 - (current_time - self.request_times[0] if requests_last_hour >= MAX_REQUESTS_PER_HOUR else 0)
-                )
-                logger.warning(f"Rate limit approaching, sleeping for {sleep_time:.2f} seconds")
-                time.sleep(sleep_time)
-                
-            # Ensure minimum interval between requests
-            time_since_last = current_time - self.last_request_time
-            if time_since_last < self.current_backoff:
-                time.sleep(self.current_backoff - time_since_last)
-            
-            # Record this request
-            self.request_times.append(time.time())
-            self.last_request_time = time.time()
-            
-    def update_backoff(self, success: bool) -> None:
-        """Update backoff time based on request success"""
-        if success:
-            # On success, gradually reduce backoff time
-            self.current_backoff = max(MIN_REQUEST_INTERVAL, self.current_backoff / BACKOFF_FACTOR)
-        else:
-            # On failure, increase backoff time
-            self.current_backoff = min(MAX_BACKOFF, self.current_backoff * BACKOFF_FACTOR)
-            logger.warning(f"Increased backoff time to {self.current_backoff:.2f} seconds")
+def configure_logging():
+    """Log to a rotating file and the console; run as a script only, so imports have no side effects."""
+    log_dir = Path("logs")
+    log_dir.mkdir(exist_ok=True)
+    log_file = log_dir / "options_flow_collector.log"
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            RotatingFileHandler(
+                log_file,
+                maxBytes=5*1024*1024,  # 5MB
+                backupCount=5
+            ),
+            logging.StreamHandler()
+        ]
+    )
 
 class OptionsFlowCollector:
     """Collects options flow data for specified symbols."""
@@ -239,7 +88,13 @@ class OptionsFlowCollector:
         
         self.base_url = UW_BASE_URL
         self.headers = DEFAULT_HEADERS
-        self.rate_limiter = RateLimiter()
+        self.symbols = list(SYMBOLS)
+        self.concurrent = True  # Fetch symbols in parallel, sharing one API rate budget
+        self.max_workers = len(self.symbols)
+        self.rate_limiter = shared_limiter('uw')  # One budget across collector processes
+        self.credits = credit_ledger()
+        self.client = UWClient(headers=self.headers, base_url=self.base_url, throttle=self.rate_limiter.acquire,
+                               observe=self.rate_limiter.observe, reserve=self.credits.reserver('options_flow'))
         
         # Initialize database connection
         self.db_conn = None
@@ -286,48 +141,27 @@ class OptionsFlowCollector:
         """Connect to the database."""
         try:
             if self.db_conn is None or self.db_conn.closed:
-                self.db_conn = psycopg2.connect(**self.db_config)
-                self.logger.info("Successfully connected to database")
+                pool = get_pg_pool(self.db_config)
+                if self.db_conn is not None:
+                    pool.putconn(self.db_conn, close=True)
+                self.db_conn = pool.getconn()
+                self.logger.info("Checked out pooled database connection")
         except Exception as e:
             self.logger.error(f"Error connecting to database: {str(e)}")
             raise
 
-    def _rate_limit(self) -> None:
-        """Enforce rate limiting between API requests."""
-        self.rate_limiter.wait_if_needed()
-
     def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Optional[Dict]:
-        """Make an API request with retry logic."""
-        max_retries = 3
-        retry_count = 0
-        backoff_time = 1.0  # Initial backoff time in seconds
-        
-        while retry_count < max_retries:
-            try:
-                self._rate_limit()
-                self.logger.info(f"Making request to: {endpoint}")
-                response = requests.get(
-                    endpoint,
-                    headers=self.headers,
-                    params=params,
-                    timeout=REQUEST_TIMEOUT
-                )
-                response.raise_for_status()
-                data = response.json()
-                self.rate_limiter.update_backoff(True)
-                return data
-            except (requests.exceptions.RequestException, ValueError) as e:
-                retry_count += 1
-                self.rate_limiter.update_backoff(False)
-                if retry_count == max_retries:
-                    self.logger.error(f"Failed to make request after {max_retries} retries: {str(e)}")
-                    return None
-                
-                self.logger.warning(f"Request failed (attempt {retry_count}/{max_retries}): {str(e)}")
-                time.sleep(backoff_time)
-                backoff_time *= 2  # Exponential backoff
-                
-        return None
+        """Make an API request through the shared client, which retries transient failures."""
+        self.logger.info(f"Making request to: {endpoint}")
+        try:
+            data = self.client.get_json(endpoint, params=params)
+        except CreditBudgetExceeded as e:
+            self.logger.warning(f"Request refused: {str(e)}")
+            return None
+        except (requests.exceptions.RequestException, ValueError) as e:
+            self.logger.error(f"Failed to make request after {self.client.max_retries} attempts: {str(e)}")
+            return None
+        return data
 
     def get_expiry_breakdown(self, symbol: str) -> Optional[Dict]:
         """Get expiry breakdown for a symbol."""
@@ -351,7 +185,8 @@ class OptionsFlowCollector:
                 self.logger.warning("No flow data received")
                 return pd.DataFrame()
 
-            flows = pd.DataFrame(flow_data['data'])
+            records = decode_records(flow_data['data'], OptionFlow)
+            flows = pd.DataFrame(to_arrays(records, OptionFlow.__slots__))
             if flows.empty:
                 return flows
 
@@ -540,36 +375,74 @@ class OptionsFlowCollector:
             next_day = datetime.now(self.eastern) + timedelta(days=1)
             return datetime.combine(next_day.date(), MARKET_OPEN)
 
+    def _fetch_symbol(self, symbol: str) -> pd.DataFrame:
+        """Fetch and filter one symbol's flows; makes no database calls, so symbols can run in parallel."""
+        # Get expiry breakdown
+        expiry_data = self.get_expiry_breakdown(symbol)
+        if not expiry_data:
+            return pd.DataFrame()
+
+        # Get option contracts
+        contracts_data = self.get_option_contracts(symbol)
+        if not contracts_data:
+            return pd.DataFrame()
+
+        # Get option flow
+        flow_data = self.get_option_flow(symbol)
+        if not flow_data:
+            return pd.DataFrame()
+
+        return self._process_flow_data(flow_data)
+
+    def collect_cycle(self) -> Dict[str, Dict]:
+        """Fetch every symbol's flows, then save them all in one write.
+
+        Symbols are fetched on a thread pool when ``self.concurrent`` is set,
+        all drawing requests from the shared rate limiter. A symbol that fails
+        is logged and left out of the write.
+
+        Returns:
+            Dict of symbol -> ``seconds`` spent fetching, ``flows`` kept and any ``error``
+        """
+        def fetch(symbol):
+            symbol_start = time.monotonic()
+            try:
+                flows, error = self._fetch_symbol(symbol), None
+            except Exception as e:
+                self.logger.error(f"Error processing symbol {symbol}: {str(e)}")
+                flows, error = pd.DataFrame(), str(e)
+            return symbol, flows, time.monotonic() - symbol_start, error
+
+        if self.concurrent and len(self.symbols) > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='options_flow') as executor:
+                results = list(executor.map(fetch, self.symbols))
+        else:
+            results = [fetch(symbol) for symbol in self.symbols]
+
+        frames = [flows for _, flows, _, _ in results if not flows.empty]
+        write_start = time.monotonic()
+        if frames:
+            self.save_flows_to_db(pd.concat(frames, ignore_index=True))
+        write_seconds = time.monotonic() - write_start
+
+        per_symbol = {}
+        for symbol, flows, seconds, error in results:
+            per_symbol[symbol] = {'seconds': round(seconds, 3), 'flows': len(flows)}
+            if error is not None:
+                per_symbol[symbol]['error'] = error
+        self.logger.info(f"Options flow cycle: {sum(len(f) for f in frames)} flows, "
+                         f"write {write_seconds:.3f}s, concurrent={self.concurrent}, per symbol: {per_symbol}")
+        return per_symbol
+
     def run(self) -> None:
         """Run the collector continuously."""
         try:
             while True:
                 if self.is_market_open():
-                    for symbol in SYMBOLS:
-                        try:
-                            # Get expiry breakdown
-                            expiry_data = self.get_expiry_breakdown(symbol)
-                            if not expiry_data:
-                                continue
-
-                            # Get option contracts
-                            contracts_data = self.get_option_contracts(symbol)
-                            if not contracts_data:
-                                continue
-
-                            # Get option flow
-                            flow_data = self.get_option_flow(symbol)
-                            if not flow_data:
-                                continue
-
-                            # Process and save flows
-                            flows = self._process_flow_data(flow_data)
-                            if not flows.empty:
-                                self.save_flows_to_db(flows)
-
-                        except Exception as e:
-                            self.logger.error(f"Error processing symbol {symbol}: {str(e)}")
-                            continue
+                    try:
+                        self.collect_cycle()
+                    except Exception as e:
+                        self.logger.error(f"Error saving flows: {str(e)}")
 
                     time.sleep(self.REQUEST_INTERVAL)
                 else:
@@ -582,14 +455,23 @@ class OptionsFlowCollector:
         except Exception as e:
             self.logger.error(f"Error in collector run loop: {str(e)}")
             raise
+        finally:
+            self.logger.info(f"Rate limiter: {self.rate_limiter.stats()}")
 
     def __del__(self):
         """Clean up resources on deletion."""
-        if hasattr(self, 'db_conn') and self.db_conn is not None and not self.db_conn.closed:
-            self.db_conn.close()
+        if getattr(self, 'db_conn', None) is not None:
+            get_pg_pool(self.db_config).putconn(self.db_conn)
+            self.db_conn = None
 
 def main():
-    collector = OptionsFlowCollector(DB_CONFIG, UW_API_TOKEN)
+    parser = argparse.ArgumentParser(description='Collect options flow data')
+    parser.add_argument('--sequential', action='store_true', help='Collect symbols one after another')
+    args = parser.parse_args()
+
+    configure_logging()
+    collector = OptionsFlowCollector(get_db_config(), UW_API_TOKEN)
+    collector.concurrent = not args.sequential
     collector.run()
 
 if __name__ == "__main__":
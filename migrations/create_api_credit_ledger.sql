@@ -0,0 +1,11 @@
+-- Migration: Daily API credit ledger shared by all collectors (see collectors/utils/credit_ledger.py)
+CREATE TABLE IF NOT EXISTS trading.api_credit_ledger (
+    day DATE NOT NULL,
+    collector VARCHAR(50) NOT NULL,
+    endpoint VARCHAR(100) NOT NULL,
+    credits INTEGER NOT NULL DEFAULT 0,
+    refused INTEGER NOT NULL DEFAULT 0,
+    first_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (day, collector, endpoint)
+);
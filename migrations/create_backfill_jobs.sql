@@ -0,0 +1,25 @@
+-- Migration: Work queue for distributed backfills, claimed with FOR UPDATE SKIP LOCKED
+CREATE TABLE IF NOT EXISTS trading.backfill_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    collector VARCHAR(50) NOT NULL,
+    symbol VARCHAR(20) NOT NULL,
+    window_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    window_end TIMESTAMP WITH TIME ZONE NOT NULL,
+    status VARCHAR(10) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    claimed_by VARCHAR(100),
+    claimed_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE,
+    rows_fetched INTEGER,
+    rows_inserted INTEGER,
+    seconds DOUBLE PRECISION,
+    last_error TEXT,
+    not_before TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (collector, symbol, window_start, window_end)
+);
+
+CREATE INDEX IF NOT EXISTS idx_backfill_jobs_claimable
+ON trading.backfill_jobs (collector, window_start)
+WHERE status IN ('pending', 'running');
@@ -0,0 +1,27 @@
+-- Migration: Per-collector coverage bitmaps (one BIT(288) of 5-minute slots per stream per UTC day)
+CREATE TABLE IF NOT EXISTS trading.collector_coverage (
+    collector VARCHAR(50) NOT NULL,
+    stream_key VARCHAR(100) NOT NULL,
+    day DATE NOT NULL,
+    slots BIT(288) NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (collector, stream_key, day)
+);
+
+-- Seed from existing trades: a slot is covered if it holds at least one trade
+INSERT INTO trading.collector_coverage (collector, stream_key, day, slots)
+SELECT
+    'darkpool',
+    symbol,
+    (executed_at AT TIME ZONE 'UTC')::date,
+    bit_or(
+        ('1' || repeat('0', 287))::bit(288) >> (
+            EXTRACT(HOUR FROM executed_at AT TIME ZONE 'UTC') * 12
+            + FLOOR(EXTRACT(MINUTE FROM executed_at AT TIME ZONE 'UTC') / 5)
+        )::int
+    )
+FROM trading.darkpool_trades
+GROUP BY symbol, (executed_at AT TIME ZONE 'UTC')::date
+ON CONFLICT (collector, stream_key, day) DO UPDATE
+SET slots = trading.collector_coverage.slots | EXCLUDED.slots,
+    updated_at = NOW();
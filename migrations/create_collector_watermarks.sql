@@ -0,0 +1,21 @@
+-- Migration: Per-collector high-watermarks used to resolve incremental fetch windows
+CREATE TABLE IF NOT EXISTS trading.collector_watermarks (
+    collector VARCHAR(50) NOT NULL,
+    stream_key VARCHAR(100) NOT NULL,
+    watermark TIMESTAMP WITH TIME ZONE NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (collector, stream_key)
+);
+
+-- Seed from existing data so the first incremental run doesn't refetch history
+INSERT INTO trading.collector_watermarks (collector, stream_key, watermark)
+SELECT 'darkpool', symbol, MAX(executed_at)
+FROM trading.darkpool_trades
+GROUP BY symbol
+ON CONFLICT (collector, stream_key) DO NOTHING;
+
+INSERT INTO trading.collector_watermarks (collector, stream_key, watermark)
+SELECT 'news', 'all', MAX(created_at)
+FROM trading.news_headlines
+HAVING MAX(created_at) IS NOT NULL
+ON CONFLICT (collector, stream_key) DO NOTHING;
@@ -0,0 +1,7 @@
+-- Migration: Story ids for near-duplicate headlines (assigned at ingest by collectors/utils/story_index.py)
+ALTER TABLE trading.news_headlines
+    ADD COLUMN IF NOT EXISTS story_id BIGINT;
+
+-- Headlines stored before this migration keep a NULL story_id; group them by id instead
+CREATE INDEX IF NOT EXISTS news_headlines_story_id
+ON trading.news_headlines (story_id, created_at);
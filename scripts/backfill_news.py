@@ -12,6 +12,7 @@ project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
 from collectors.news.newscollector import NewsCollector
+from collectors.utils.credit_ledger import LOW
 
 # Configure logging
 logging.basicConfig(
@@ -46,6 +47,8 @@ def backfill_news(start_date: str = None, end_date: str = None, days: int = None
         
         # Create collector and run backfill
         collector = NewsCollector()
+        # Backfills stop short of the daily credit cap, leaving the rest for live collection
+        collector.client.reserve = collector.credits.reserver('news_backfill', LOW)
         collector.collect(start_date=start_date, end_date=end_date)
         
     except ValueError as e:
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark dark pool payload decoding: the old dict path against typed records.
+
+The dict path is what the collector did before ``collectors.utils.records``:
+``response.json()`` followed by per-field ``float()``/``int()``/
+``datetime.fromisoformat(...replace('Z', '+00:00'))`` for every trade. The
+record path decodes response bytes straight into slotted ``DarkPoolTrade``
+records. Both end at the row tuples the COPY writer consumes.
+
+    python scripts/benchmark_decoding.py --trades 500 --repeat 20
+"""
+
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from collectors.utils.records import DarkPoolTrade, decode, loads, orjson, to_arrays
+
+
+def synthetic_payload(count: int, seed: int = 7) -> bytes:
+    """A ``/darkpool/{ticker}`` response body with ``count`` trades."""
+    rng = random.Random(seed)
+    start = datetime(2025, 5, 1, 13, 30, tzinfo=timezone.utc)
+    trades = []
+    for i in range(count):
+        price = round(rng.uniform(400, 600), 4)
+        size = rng.randint(100, 50000)
+        executed_at = start + timedelta(microseconds=rng.randint(0, 6 * 3600 * 10 ** 6))
+        trades.append({
+            'tracking_id': 10 ** 12 + i,
+            'ticker': 'SPY',
+            'price': str(price),
+            'size': size,
+            'volume': rng.randint(10 ** 6, 10 ** 8),
+            'premium': str(round(price * size, 2)),
+            'executed_at': executed_at.isoformat().replace('+00:00', 'Z'),
+            'nbbo_ask': str(round(price + 0.01, 2)),
+            'nbbo_bid': str(round(price - 0.01, 2)),
+            'nbbo_ask_quantity': rng.randint(1, 5000),
+            'nbbo_bid_quantity': rng.randint(1, 5000),
+            'market_center': 'L',
+            'sale_cond_codes': None,
+            'ext_hour_sold_codes': None,
+            'trade_code': None,
+            'trade_settlement': 'regular_settlement',
+            'canceled': False,
+        })
+    return json.dumps({'data': trades}).encode()
+
+
+def dict_rows(payload: bytes, collection_time: datetime) -> list:
+    """The pre-records path: json dicts converted field by field."""
+    rows = []
+    for trade in json.loads(payload).get('data', []):
+        rows.append((
+            trade['tracking_id'],
+            trade['ticker'],
+            float(trade['price']),
+            int(trade['size']),
+            int(trade['volume']),
+            float(trade['premium']),
+            datetime.fromisoformat(trade['executed_at'].replace('Z', '+00:00')),
+            float(trade['nbbo_ask']) if trade['nbbo_ask'] else None,
+            float(trade['nbbo_bid']) if trade['nbbo_bid'] else None,
+            int(trade['nbbo_ask_quantity']) if trade['nbbo_ask_quantity'] else None,
+            int(trade['nbbo_bid_quantity']) if trade['nbbo_bid_quantity'] else None,
+            trade['market_center'],
+            trade['sale_cond_codes'],
+            trade['ext_hour_sold_codes'],
+            trade['trade_code'],
+            trade['trade_settlement'],
+            trade['canceled'],
+            collection_time
+        ))
+    return rows
+
+
+def record_rows(payload: bytes, collection_time: datetime) -> list:
+    return [trade.as_row(collection_time) for trade in decode(payload, DarkPoolTrade)]
+
+
+def best_of(func, repeat: int) -> float:
+    # GC off while timing, as timeit does
+    timings = []
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return min(timings)
+
+
+def retained_bytes(func) -> int:
+    """Bytes still allocated by the object ``func`` returns."""
+    tracemalloc.start()
+    result = func()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark dict vs typed-record decoding')
+    parser.add_argument('--trades', type=int, default=500, help='Trades per payload (default: 500, one API page)')
+    parser.add_argument('--repeat', type=int, default=20, help='Timing repetitions, best is kept (default: 20)')
+    args = parser.parse_args()
+
+    payload = synthetic_payload(args.trades)
+    collection_time = datetime.now(timezone.utc)
+    assert dict_rows(payload, collection_time) == record_rows(payload, collection_time)
+
+    cases = [
+        ('dicts -> rows', lambda: dict_rows(payload, collection_time)),
+        ('records -> rows', lambda: record_rows(payload, collection_time)),
+        ('records -> arrays', lambda: to_arrays(decode(payload, DarkPoolTrade))),
+    ]
+    held = [
+        ('dicts held', lambda: loads(payload)['data']),
+        ('records held', lambda: decode(payload, DarkPoolTrade)),
+    ]
+
+    print(f"{args.trades} trades, {len(payload):,} bytes, parser: {'orjson' if orjson else 'json'}")
+    baseline = None
+    for name, func in cases:
+        seconds = best_of(func, args.repeat)
+        baseline = baseline or seconds
+        print(f"  {name:<18} {seconds * 1000:8.2f} ms  {args.trades / seconds:>10,.0f} trades/s  "
+              f"x{baseline / seconds:.2f}")
+    for name, func in held:
+        print(f"  {name:<18} {retained_bytes(func) / 1024:8.1f} KiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark import time of the collector modules, as a regression check.
+
+Each module is imported ``--repeat`` times in a fresh interpreter with
+``-X importtime``; the reported time is the median cumulative import time
+of the module itself, so interpreter startup is excluded. Work done at
+module level (connecting to the database, running queries, writing files)
+shows up here: ``options_flow_collector`` used to run a 24h dark pool report
+on import, which is now ``flow_analysis/scripts/darkpool_24h_report.py``.
+
+    python scripts/benchmark_imports.py --repeat 5 --max-ms 1500
+
+Exits with status 1 when a module fails to import or its median exceeds
+``--max-ms``.
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+project_root = Path(__file__).parent.parent
+
+COLLECTOR_MODULES = [
+    'collectors.news.newscollector',
+    'collectors.darkpool_collector',
+    'collectors.options.options_flow_collector',
+    'flow_analysis.scripts.options_flow_collector',
+    'flow_analysis.scripts.flow_alerts_collector',
+    'flow_analysis.scripts.data_validation',
+]
+
+# "import time: self [us] | cumulative | imported package"
+_IMPORTTIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def import_once(module: str) -> Tuple[float, Dict[str, int]]:
+    """
+    Import ``module`` in a fresh interpreter.
+
+    Returns:
+        Tuple of (cumulative milliseconds, self microseconds per imported module)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=project_root, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'import failed')
+    cumulative = None
+    self_us = {}
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if not match:
+            continue
+        self_us[match.group(4)] = int(match.group(1))
+        if match.group(4) == module:
+            cumulative = int(match.group(2))
+    if cumulative is None:
+        raise RuntimeError(f'{module} missing from -X importtime output')
+    return cumulative / 1000, self_us
+
+
+def heaviest(self_us: Dict[str, int], count: int) -> List[Tuple[str, int]]:
+    return sorted(self_us.items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark collector module import times')
+    parser.add_argument('modules', nargs='*', default=COLLECTOR_MODULES,
+                        help='Modules to import (default: the collector modules)')
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh imports per module (default: 5)')
+    parser.add_argument('--max-ms', type=float, default=None,
+                        help='Fail when a median import time exceeds this many milliseconds')
+    parser.add_argument('--top', type=int, default=3, help='Heaviest imports to list per module (default: 3)')
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        try:
+            runs = [import_once(module) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"{module:50s}  FAILED  {e}")
+            failed = True
+            continue
+        median = statistics.median(ms for ms, _ in runs)
+        over = args.max_ms is not None and median > args.max_ms
+        failed = failed or over
+        print(f"{module:50s} {median:8.1f} ms{'  OVER BUDGET' if over else ''}")
+        for name, us in heaviest(runs[-1][1], args.top):
+            print(f"    {name:46s} {us / 1000:8.1f} ms self")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
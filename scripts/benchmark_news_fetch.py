@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark NewsCollector.fetch_data for a backfill: serial against concurrent day buckets.
+
+The API is simulated by a session that sleeps ``--latency`` seconds per call
+and serves ``--per-day`` headlines a day, so the run measures the collector's
+own pacing: both paths wait only on the token bucket, the serial one
+fetching a day at a time and the concurrent one ``max_parallel_requests``
+days at once. Both
+runs start with an empty cache and a full bucket, and must return the same
+articles.
+
+    python scripts/benchmark_news_fetch.py --days 7 --latency 0.4
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from collectors.news.newscollector import NewsCollector
+from collectors.utils.cache_store import CacheStore
+from collectors.utils.rate_limiter import UW_REQUESTS_PER_MINUTE, TokenBucket
+
+TIME_FORMAT = '%Y-%m-%dT%H:%M:%S%z'
+
+
+class SimulatedResponse:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+
+class SimulatedNewsAPI:
+    """Stands in for ``requests.Session``: ``per_day`` headlines a day, newest first."""
+
+    def __init__(self, per_day: int, latency: float):
+        self.per_day = per_day
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def request(self, method, url, params=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        newer = datetime.strptime(params['newer_than'], TIME_FORMAT)
+        older = datetime.strptime(params['older_than'], TIME_FORMAT)
+        day = newer.replace(hour=0, minute=0, second=0)
+        step = 86400 // (self.per_day + 1)
+        stamps = [day + timedelta(seconds=step * (i + 1)) for i in range(self.per_day)]
+        stamps = sorted((t for t in stamps if newer <= t <= older), reverse=True)
+        first = params['page'] * params['limit']
+        articles = [{
+            'headline': f"Headline {t:%Y-%m-%d %H:%M:%S}",
+            'source': 'Simulated',
+            'created_at': t.isoformat(),
+            'tags': [],
+            'tickers': ['SPY'],
+            'is_major': False,
+            'sentiment': 'neutral',
+            'meta': {},
+        } for t in stamps[first:first + params['limit']]]
+        return SimulatedResponse(json.dumps({'data': articles}).encode())
+
+
+def run(concurrent: bool, args, start: datetime, end: datetime, cache_dir: Path):
+    api = SimulatedNewsAPI(args.per_day, args.latency)
+    collector = NewsCollector(engine=MagicMock(), session=api)
+    collector.cache = CacheStore(cache_dir / f"news-{'concurrent' if concurrent else 'serial'}.sqlite3")
+    collector.client.throttle = TokenBucket(args.rate_per_minute).acquire
+    collector.concurrent = concurrent
+    collector.max_parallel_requests = args.workers
+
+    started = time.perf_counter()
+    articles = collector.fetch_data(start, end)
+    return articles, time.perf_counter() - started, api.calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark serial vs concurrent news fetching')
+    parser.add_argument('--days', type=int, default=7, help='Backfill length in days (default: 7)')
+    parser.add_argument('--per-day', type=int, default=120, help='Headlines per day (default: 120)')
+    parser.add_argument('--latency', type=float, default=0.4, help='Seconds per simulated API call (default: 0.4)')
+    parser.add_argument('--workers', type=int, default=2, help='max_parallel_requests (default: 2)')
+    parser.add_argument('--rate-per-minute', type=float, default=UW_REQUESTS_PER_MINUTE,
+                        help=f'Token bucket rate (default: {UW_REQUESTS_PER_MINUTE})')
+    args = parser.parse_args()
+
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(days=args.days)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        serial, serial_seconds, serial_calls = run(False, args, start, end, Path(cache_dir))
+        concurrent, concurrent_seconds, concurrent_calls = run(True, args, start, end, Path(cache_dir))
+    assert concurrent == serial, "concurrent fetch returned different articles"
+
+    print(f"{args.days} days, {len(serial)} articles, {args.latency:.2f}s latency, "
+          f"{args.rate_per_minute:g} requests/min")
+    print(f"  serial       {serial_seconds:7.2f} s  {serial_calls:4d} calls")
+    print(f"  concurrent   {concurrent_seconds:7.2f} s  {concurrent_calls:4d} calls  "
+          f"x{serial_seconds / concurrent_seconds:.2f} ({args.workers} workers)")
+
+
+if __name__ == '__main__':
+    main()
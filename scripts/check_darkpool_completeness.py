@@ -3,18 +3,21 @@
 import os
 import sys
 from pathlib import Path
-import pandas as pd
 from datetime import datetime, timedelta
 import pytz
 import logging
 from dotenv import load_dotenv
 import psycopg2
-from collections import defaultdict
 
 # Add the project root to the Python path
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
+from collectors.utils.coverage import CoverageIndex, covered_fraction, missing_windows
+
+SYMBOLS = ['SPY', 'QQQ', 'TSLA']
+coverage = CoverageIndex('darkpool')
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -51,112 +54,72 @@ def get_market_hours(start_date, end_date):
     
     return market_hours
 
+def get_session_windows(market_hours):
+    """Convert naive ET market sessions into UTC windows."""
+    eastern = pytz.timezone('America/New_York')
+    return [
+        (eastern.localize(market_open).astimezone(pytz.UTC), eastern.localize(market_close).astimezone(pytz.UTC))
+        for market_open, market_close in market_hours
+    ]
+
 def analyze_data_completeness():
-    """Analyze data completeness and generate backfill commands."""
+    """Analyze data completeness from the coverage index and generate backfill commands."""
     try:
         with get_db_connection() as conn:
-            # Get trades for selected symbols
-            query = """
-                SELECT 
-                    symbol,
-                    date_trunc('hour', executed_at AT TIME ZONE 'UTC' AT TIME ZONE 'America/New_York') as hour,
-                    COUNT(*) as trade_count
-                FROM trading.darkpool_trades
-                WHERE symbol IN ('SPY', 'QQQ', 'TSLA')
-                GROUP BY symbol, date_trunc('hour', executed_at AT TIME ZONE 'UTC' AT TIME ZONE 'America/New_York')
-                ORDER BY symbol, hour
-            """
-            
-            df = pd.read_sql_query(query, conn)
-            
-            if df.empty:
-                logger.info("No trades found for selected symbols")
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT MIN(day), MAX(day)
+                    FROM trading.collector_coverage
+                    WHERE collector = 'darkpool' AND stream_key IN %s
+                """, (tuple(SYMBOLS),))
+                start_date, end_date = cur.fetchone()
+
+            if start_date is None:
+                logger.info("No coverage recorded for selected symbols")
                 return
-            
-            # Convert hour to datetime (assume naive, localize to NY)
-            eastern = pytz.timezone('America/New_York')
-            if df['hour'].dt.tz is None:
-                df['hour'] = df['hour'].apply(lambda x: eastern.localize(x))
-            else:
-                df['hour'] = df['hour'].dt.tz_convert('America/New_York')
-            
-            # Get overall time range
-            start_date = df['hour'].min().date()
-            end_date = df['hour'].max().date()
-            
+
             print("\nData Completeness Analysis:")
             print("=" * 50)
             print(f"Analysis Period: {start_date} to {end_date}")
-            
+
+            sessions = get_session_windows(get_market_hours(start_date, end_date))
+            if not sessions:
+                print("No market sessions in the analysis period")
+                return
+            eastern = pytz.timezone('America/New_York')
+
             # Analyze each symbol
-            for symbol in ['SPY', 'QQQ', 'TSLA']:
-                symbol_df = df[df['symbol'] == symbol]
-                
-                if symbol_df.empty:
-                    print(f"\n{symbol}: No trades found")
+            for symbol in SYMBOLS:
+                masks = coverage.load(conn, symbol, sessions[0][0], sessions[-1][1])
+                if not masks:
+                    print(f"\n{symbol}: No coverage recorded")
                     continue
-                
-                # Get market hours for the period
-                market_hours = get_market_hours(start_date, end_date)
-                
-                # Create a set of all market hours
-                all_hours = set()
-                for market_open, market_close in market_hours:
-                    current = market_open
-                    while current <= market_close:
-                        # Properly localize to NY timezone
-                        current_tz = eastern.localize(current)
-                        all_hours.add(current_tz)
-                        current += timedelta(hours=1)
-                
-                # Get hours with data
-                hours_with_data = set(symbol_df['hour'].dt.floor('h'))
-                
-                # Debug prints
-                print(f"\n{symbol} - Sample of generated market hours:")
-                for h in sorted(all_hours)[:5]:
-                    print(f"  {h}")
-                print(f"\n{symbol} - Sample of hours with data:")
-                for h in sorted(hours_with_data)[:5]:
-                    print(f"  {h}")
-                
-                # Find missing hours
-                missing_hours = all_hours - hours_with_data
-                
-                # Group missing hours into continuous periods
+
+                # Find missing windows inside market hours only
                 missing_periods = []
-                if missing_hours:
-                    sorted_hours = sorted(missing_hours)
-                    period_start = sorted_hours[0]
-                    period_end = sorted_hours[0]
-                    
-                    for hour in sorted_hours[1:]:
-                        if hour == period_end + timedelta(hours=1):
-                            period_end = hour
-                        else:
-                            missing_periods.append((period_start, period_end))
-                            period_start = hour
-                            period_end = hour
-                    
-                    missing_periods.append((period_start, period_end))
-                
+                covered = 0.0
+                for session_start, session_end in sessions:
+                    covered += covered_fraction(masks, session_start, session_end)
+                    missing_periods.extend(missing_windows(masks, session_start, session_end))
+                missing_hours = sum((end - start).total_seconds() for start, end in missing_periods) / 3600
+
                 # Print analysis
                 print(f"\n{symbol}:")
-                print(f"Total Trades: {symbol_df['trade_count'].sum():,}")
-                print(f"Hours with Data: {len(hours_with_data):,}")
-                print(f"Total Market Hours: {len(all_hours):,}")
-                print(f"Missing Hours: {len(missing_hours):,}")
-                
+                print(f"Market Sessions: {len(sessions):,}")
+                print(f"Coverage: {covered / len(sessions):.1%}")
+                print(f"Missing Hours: {missing_hours:.1f}")
+
                 if missing_periods:
                     print("\nMissing Periods:")
                     for start, end in missing_periods:
+                        start, end = start.astimezone(eastern), end.astimezone(eastern)
                         duration = end - start
                         hours = duration.total_seconds() / 3600
                         print(f"  {start} to {end} ({hours:.1f} hours)")
-                        
+
                         # Generate backfill command
                         if hours <= 24:
-                            print(f"  Command: python collectors/darkpool/darkpool_collector.py --backfill --hours {int(hours)} --symbol {symbol}")
+                            print(f"  Command: python collectors/darkpool/darkpool_collector.py --backfill --hours {max(int(hours), 1)} --symbol {symbol}")
                         else:
                             # Split into 24-hour chunks
                             current = start
@@ -167,7 +130,7 @@ def analyze_data_completeness():
                                 current = chunk_end
                 else:
                     print("No missing periods found")
-            
+
     except Exception as e:
         logger.error(f"Error analyzing data completeness: {str(e)}")
         raise
@@ -8,16 +8,15 @@ from datetime import datetime, timedelta, timezone
 import pandas as pd
 from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
-import requests
 import time
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from tenacity import retry, stop_after_attempt, wait_exponential
 
 # Add the project root to the Python path
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
+from collectors.utils.http_client import UWClient
+from collectors.utils.records import DarkPoolTrade, decode
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -48,16 +47,8 @@ class DarkPoolDataManager:
             "Accept": "application/json"
         }
         
-        # Set up requests session with retry strategy
-        self.session = requests.Session()
-        retry_strategy = Retry(
-            total=3,  # number of retries
-            backoff_factor=1,  # wait 1, 2, 4 seconds between retries
-            status_forcelist=[429, 500, 502, 503, 504]  # HTTP status codes to retry on
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("https://", adapter)
-        self.session.mount("http://", adapter)
+        # Shared keep-alive session; the client retries 429/5xx with exponential backoff
+        self.client = UWClient(headers=self.headers)
         
         # Get database connection
         db_config = get_db_config()
@@ -87,11 +78,6 @@ class DarkPoolDataManager:
             logger.error(f"Error getting last execution time for {symbol}: {str(e)}")
             return datetime.now(timezone.utc) - timedelta(hours=24)
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        reraise=True
-    )
     def fetch_trades(self, symbol: str, start_time: datetime, end_time: datetime) -> list:
         """Fetch trades for a symbol with retry logic."""
         api_url = self.api_url_template.format(ticker=symbol)
@@ -101,9 +87,8 @@ class DarkPoolDataManager:
             "older_than": end_time.isoformat()
         }
         
-        response = self.session.get(api_url, headers=self.headers, params=params)
-        response.raise_for_status()
-        return response.json().get("data", [])
+        response = self.client.get(api_url, params=params)
+        return decode(response.content, DarkPoolTrade)
 
     def collect_recent_trades(self):
         """Collect dark pool trades incrementally for all tickers in the watch list."""
@@ -130,12 +115,10 @@ class DarkPoolDataManager:
                     logger.info(f"Retrieved {len(trades)} trades for {symbol}")
                     
                     if trades:
-                        df = pd.DataFrame(trades)
-                        df = df.rename(columns={'ticker': 'symbol'})
-                        df['collection_time'] = datetime.now(timezone.utc)
+                        collection_time = datetime.now(timezone.utc)
                         
                         with self.engine.connect() as conn:
-                            for _, row in df.iterrows():
+                            for trade in trades:
                                 insert_query = """
                                 INSERT INTO trading.darkpool_trades (
                                     tracking_id, symbol, price, size, volume, executed_at,
@@ -152,10 +135,12 @@ class DarkPoolDataManager:
                                 )
                                 ON CONFLICT (tracking_id) DO NOTHING
                                 """
+                                row = trade.as_dict()
+                                row['collection_time'] = collection_time
                                 try:
-                                    conn.execute(text(insert_query), row.to_dict())
+                                    conn.execute(text(insert_query), row)
                                 except Exception as e:
-                                    logger.error(f"Error inserting trade {row.get('tracking_id', 'N/A')}: {str(e)}")
+                                    logger.error(f"Error inserting trade {trade.tracking_id}: {str(e)}")
                                     continue
                             conn.commit()
                         total_trades += len(trades)
@@ -0,0 +1,82 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from collectors.utils.adaptive_polling import AdaptivePollScheduler, allocate_budget
+
+
+def make_scheduler(symbols=('SPY', 'QQQ', 'TSLA'), session='regular', **kwargs):
+    return AdaptivePollScheduler(symbols, session=lambda now: session, clock=lambda: 0.0, **kwargs)
+
+
+def test_allocate_budget_is_proportional_within_bounds():
+    allocation = allocate_budget({'a': 3.0, 'b': 1.0}, budget=4.0, low=0.1, high=10.0)
+    assert allocation == pytest.approx({'a': 3.0, 'b': 1.0})
+
+
+def test_allocate_budget_pins_and_redistributes():
+    allocation = allocate_budget({'hot': 100.0, 'warm': 10.0, 'cold': 0.01}, budget=6.0, low=0.5, high=4.0)
+
+    assert allocation['hot'] == 4.0
+    assert allocation['cold'] == 0.5
+    assert allocation['warm'] == pytest.approx(1.5)
+    assert sum(allocation.values()) == pytest.approx(6.0)
+
+
+def test_hot_symbol_gets_shorter_interval():
+    scheduler = make_scheduler(polls_per_minute=12, min_interval=5, max_interval=600)
+    for symbol in scheduler.symbols:
+        scheduler.record(symbol, 0, now=0.0)
+    scheduler.record('SPY', 600, now=60.0)
+    scheduler.record('QQQ', 60, now=60.0)
+    scheduler.record('TSLA', 0, now=60.0)
+
+    intervals = scheduler.intervals(now=60.0)
+
+    assert intervals['SPY'] < intervals['QQQ'] < intervals['TSLA']
+    assert sum(60.0 / i for i in intervals.values()) == pytest.approx(12)
+
+
+def test_ewma_smooths_toward_new_rate():
+    scheduler = make_scheduler(symbols=['SPY'], half_life=60)
+    scheduler.record('SPY', 0, now=0.0)
+    scheduler.record('SPY', 100, now=60.0)
+    assert scheduler.rates['SPY'] == pytest.approx(100.0)
+
+    scheduler.record('SPY', 0, now=120.0)
+    assert scheduler.rates['SPY'] == pytest.approx(50.0)
+
+
+def test_failed_poll_only_resets_timer():
+    scheduler = make_scheduler(symbols=['SPY'])
+    scheduler.record('SPY', 0, now=0.0)
+    scheduler.record('SPY', None, now=60.0)
+    assert scheduler.rates['SPY'] is None
+    assert scheduler.last_poll['SPY'] == 60.0
+
+
+def test_due_respects_intervals_and_closed_session():
+    scheduler = make_scheduler(polls_per_minute=6, min_interval=5, max_interval=600)
+    assert scheduler.due(now=0.0) == ['SPY', 'QQQ', 'TSLA']
+    for symbol in scheduler.symbols:
+        scheduler.record(symbol, 0, now=0.0)
+    # 6 polls/min across 3 equal symbols -> every 30s
+    assert scheduler.due(now=29.0) == []
+    assert scheduler.due(now=30.0) == ['SPY', 'QQQ', 'TSLA']
+
+    closed = make_scheduler(session='closed')
+    assert closed.due(now=0.0) == []
+    assert closed.metrics(now=0.0)['symbols']['SPY']['interval_seconds'] is None
+
+
+def test_off_hours_session_shrinks_budget():
+    regular = make_scheduler(session='regular').intervals(now=0.0)
+    pre_market = make_scheduler(session='pre_market').intervals(now=0.0)
+    assert pre_market['SPY'] > regular['SPY']
+
+
+def test_session_is_resolved_from_wall_clock():
+    seen = []
+    scheduler = AdaptivePollScheduler(['SPY'], session=lambda now: seen.append(now) or 'regular')
+    scheduler.session(now=0.0)
+    assert seen == [datetime(1970, 1, 1, tzinfo=timezone.utc)]
@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta, timezone
+
+from collectors.utils import backfill_jobs
+
+
+class FakeCursor:
+    """Minimal psycopg2 cursor stand-in returning queued results."""
+
+    def __init__(self, results=None, rowcount=1):
+        self.statements = []
+        self.results = list(results or [])
+        self.rowcount = rowcount
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.statements.append((' '.join(sql.split()), params))
+
+    def fetchone(self):
+        return self.results.pop(0)
+
+    def fetchall(self):
+        return self.results.pop(0)
+
+
+class FakeConnection:
+    def __init__(self, cur):
+        self.cur = cur
+        self.commits = 0
+
+    def cursor(self):
+        return self.cur
+
+    def commit(self):
+        self.commits += 1
+
+
+T0 = datetime(2025, 5, 1, 14, 0, tzinfo=timezone.utc)
+
+
+def test_split_windows_aligns_to_window_grid():
+    windows = backfill_jobs.split_windows(T0 + timedelta(minutes=20), T0 + timedelta(hours=2, minutes=10))
+    assert windows == [
+        (T0 + timedelta(minutes=20), T0 + timedelta(hours=1)),
+        (T0 + timedelta(hours=1), T0 + timedelta(hours=2)),
+        (T0 + timedelta(hours=2), T0 + timedelta(hours=2, minutes=10)),
+    ]
+    assert backfill_jobs.split_windows(T0, T0) == []
+
+
+def test_enqueue_counts_only_new_jobs_and_commits():
+    conn = FakeConnection(FakeCursor(rowcount=1))
+    windows = backfill_jobs.split_windows(T0, T0 + timedelta(hours=2))
+
+    created = backfill_jobs.enqueue(conn, 'darkpool', ['SPY', 'QQQ'], windows)
+
+    assert created == 4
+    assert conn.commits == 1
+    assert all('ON CONFLICT' in sql for sql, _ in conn.cur.statements)
+
+
+def test_claim_uses_skip_locked_and_returns_job():
+    row = (7, 'SPY', T0, T0 + timedelta(hours=1), 1)
+    conn = FakeConnection(FakeCursor(results=[row]))
+
+    job = backfill_jobs.claim(conn, 'darkpool', 'host:1')
+
+    sql, params = conn.cur.statements[0]
+    assert 'FOR UPDATE SKIP LOCKED' in sql
+    assert params == {'worker_id': 'host:1', 'collector': 'darkpool',
+                      'stale_after': backfill_jobs.DEFAULT_STALE_AFTER}
+    assert job.id == 7 and job.symbol == 'SPY' and job.attempts == 1
+    assert conn.commits == 1
+
+
+def test_claim_returns_none_when_drained():
+    conn = FakeConnection(FakeCursor(results=[None]))
+    assert backfill_jobs.claim(conn, 'darkpool', 'host:1') is None
+
+
+def test_claim_expires_stale_last_attempts_and_honours_backoff():
+    conn = FakeConnection(FakeCursor(results=[None]))
+    backfill_jobs.claim(conn, 'darkpool', 'host:1')
+
+    sql, _ = conn.cur.statements[0]
+    expire, claim = sql.split(') UPDATE', 1)
+    assert "SET status = 'failed'" in expire and 'attempts >= max_attempts' in expire
+    assert "(not_before IS NULL OR not_before <= NOW())" in claim
+
+
+def test_fail_delays_the_retry():
+    conn = FakeConnection(FakeCursor())
+
+    backfill_jobs.fail(conn, 7, 'x' * 2000, backoff=timedelta(seconds=30))
+
+    sql, params = conn.cur.statements[0]
+    assert 'not_before = NOW() + %s * POWER(2, attempts - 1)' in sql
+    assert params == (timedelta(seconds=30), 'x' * 1000, 7)
+    assert conn.commits == 1
+
+
+def test_report_aggregates_statuses_and_worker_throughput():
+    status_rows = [
+        ('SPY', 'done', 3, 300, 250),
+        ('SPY', 'pending', 2, 0, 0),
+        ('QQQ', 'failed', 1, 0, 0),
+    ]
+    worker_rows = [('host:1', 3, 250, 12.0, T0, T0 + timedelta(seconds=10))]
+    conn = FakeConnection(FakeCursor(results=[status_rows, worker_rows]))
+
+    result = backfill_jobs.report(conn, 'darkpool')
+
+    assert result['jobs'] == {'done': 3, 'pending': 2, 'failed': 1}
+    assert result['symbols']['SPY']['rows_inserted'] == 250
+    assert result['workers']['host:1']['rows_per_second'] == 25.0
@@ -0,0 +1,84 @@
+from datetime import datetime, timezone
+
+from collectors.utils.bulk_copy import rows_to_csv, copy_merge
+
+
+class FakeCursor:
+    """Minimal psycopg2 cursor stand-in that records statements."""
+
+    def __init__(self, rowcount):
+        self.statements = []
+        self.copied = None
+        self._rowcount = rowcount
+        self.rowcount = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.statements.append(' '.join(sql.split()))
+        if sql.strip().startswith('INSERT'):
+            self.rowcount = self._rowcount
+
+    def copy_expert(self, sql, buffer):
+        self.statements.append(sql)
+        self.copied = buffer.read()
+
+
+class FakeConnection:
+    def __init__(self, rowcount):
+        self.cur = FakeCursor(rowcount)
+
+    def cursor(self):
+        return self.cur
+
+
+def test_rows_to_csv_formats_nulls_bools_and_datetimes():
+    executed_at = datetime(2025, 5, 1, 14, 30, tzinfo=timezone.utc)
+    buffer, count = rows_to_csv([
+        ('1', 'SPY', 500.5, None, True, executed_at),
+        ('2', 'QQQ', 'a,b', '', False, executed_at),
+    ])
+    assert count == 2
+    lines = buffer.getvalue().splitlines()
+    assert lines[0] == '1,SPY,500.5,,t,2025-05-01T14:30:00+00:00'
+    assert lines[1] == '2,QQQ,"a,b","",f,2025-05-01T14:30:00+00:00'
+
+
+def test_rows_to_csv_keeps_empty_strings_apart_from_nulls():
+    buffer, _ = rows_to_csv([(None, '', 'say "hi"', 'two\nlines', '\\.')])
+
+    # COPY ... CSV reads only the unquoted empty field as NULL
+    assert buffer.getvalue() == ',"","say ""hi""","two\nlines","\\."\n'
+
+
+def test_copy_merge_reports_inserted_and_duplicates():
+    conn = FakeConnection(rowcount=2)
+    inserted, duplicates = copy_merge(
+        conn, 'trading.darkpool_trades', ['tracking_id', 'symbol'],
+        [('1', 'SPY'), ('2', 'SPY'), ('3', 'QQQ')], ['tracking_id']
+    )
+    assert (inserted, duplicates) == (2, 1)
+    statements = conn.cur.statements
+    assert statements[0] == 'DROP TABLE IF EXISTS stage_darkpool_trades'
+    assert 'CREATE TEMP TABLE stage_darkpool_trades ON COMMIT DROP' in statements[1]
+    assert statements[2].startswith('COPY stage_darkpool_trades (tracking_id, symbol) FROM STDIN')
+    assert 'ON CONFLICT (tracking_id) DO NOTHING' in statements[3]
+    assert conn.cur.copied == '1,SPY\n2,SPY\n3,QQQ\n'
+
+
+def test_copy_merge_skips_empty_batches():
+    conn = FakeConnection(rowcount=0)
+    assert copy_merge(conn, 'trading.darkpool_trades', ['tracking_id'], [], ['tracking_id']) == (0, 0)
+    assert conn.cur.statements == []
+
+
+def test_rows_to_csv_formats_arrays_and_json():
+    buffer, _ = rows_to_csv([(['AAPL', 'say "hi"', None], {'url': 'https://x', 'n': 1}), ([], {})])
+
+    lines = buffer.getvalue().splitlines()
+    assert lines[0] == '"{""AAPL"",""say \\""hi\\"""",NULL}","{""url"": ""https://x"", ""n"": 1}"'
+    assert lines[1] == '{},{}'
@@ -0,0 +1,93 @@
+import pytest
+
+from collectors.utils.cache_store import NO_EXPIRY, CacheStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def make_store(tmp_path, clock, **kwargs):
+    return CacheStore(tmp_path / 'cache' / 'test.sqlite3', clock=clock, **kwargs)
+
+
+def test_round_trip_and_counters(tmp_path, clock):
+    store = make_store(tmp_path, clock)
+
+    assert store.get('a') is None
+    store.set('a', [{'headline': 'Fed holds', 'tickers': ['SPY']}])
+
+    assert store.get('a') == [{'headline': 'Fed holds', 'tickers': ['SPY']}]
+    stats = store.stats()
+    assert (stats['entries'], stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 1, 0.5)
+
+
+def test_entries_expire_and_are_cleaned_up_on_write(tmp_path, clock):
+    store = make_store(tmp_path, clock, ttl=60)
+    store.set('old', [1])
+    store.set('short', [2], ttl=10)
+
+    clock.now += 30
+    assert store.get('short') is None
+    assert store.get('old') == [1]
+
+    clock.now += 60
+    store.set('new', [3])
+
+    stats = store.stats()
+    assert stats['entries'] == 1
+    assert stats['expirations'] == 2
+    assert stats['bytes'] == len(b'[3]')
+
+
+def test_lru_eviction_under_byte_budget(tmp_path, clock):
+    store = make_store(tmp_path, clock, max_bytes=30)
+    for key in 'abc':
+        store.set(key, 'x' * 8)  # 10 bytes of JSON each
+        clock.now += 1
+    assert store.get('a') is not None  # a is now the most recently used
+    clock.now += 1
+
+    store.set('d', 'x' * 8)
+
+    assert store.get('b') is None
+    assert all(store.get(key) is not None for key in 'acd')
+    assert store.stats()['evictions'] == 1
+    assert store.stats()['bytes'] == 30
+
+
+def test_replacing_a_key_keeps_the_byte_total(tmp_path, clock):
+    store = make_store(tmp_path, clock)
+    store.set('a', 'x' * 100)
+    store.set('a', 'y')
+
+    assert store.stats()['bytes'] == len(b'"y"')
+
+
+def test_cache_is_shared_through_the_file(tmp_path, clock):
+    make_store(tmp_path, clock).set('a', {'n': 1})
+
+    other = make_store(tmp_path, clock)
+
+    assert other.get('a') == {'n': 1}
+    assert other.stats()['bytes'] == len(b'{"n": 1}')
+
+
+def test_no_expiry_entries_outlive_the_ttl(tmp_path, clock):
+    store = make_store(tmp_path, clock, ttl=60)
+    store.set('closed-day', [1], ttl=NO_EXPIRY)
+
+    clock.now += 365 * 86400
+    store.set('new', [2])
+
+    assert store.get('closed-day') == [1]
+    assert store.stats()['expirations'] == 0
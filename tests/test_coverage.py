@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta, timezone
+
+from collectors.utils.coverage import (
+    SLOTS_PER_DAY, CoverageIndex, batch_coverage, bits_to_mask, covered_fraction,
+    mask_to_bits, missing_windows, slot_of, window_masks
+)
+
+DAY = datetime(2025, 5, 1, tzinfo=timezone.utc)
+
+
+def at(hour, minute=0, second=0, day=DAY):
+    return day + timedelta(hours=hour, minutes=minute, seconds=second)
+
+
+def test_slot_of_uses_utc_five_minute_slots():
+    assert slot_of(at(0)) == (DAY.date(), 0)
+    assert slot_of(at(14, 34, 59)) == (DAY.date(), 14 * 12 + 6)
+    assert slot_of(at(23, 59, 59)) == (DAY.date(), SLOTS_PER_DAY - 1)
+
+
+def test_bits_round_trip_with_slot_zero_leftmost():
+    mask = (1 << 0) | (1 << 5) | (1 << (SLOTS_PER_DAY - 1))
+    bits = mask_to_bits(mask)
+    assert len(bits) == SLOTS_PER_DAY
+    assert bits[0] == '1' and bits[5] == '1' and bits[-1] == '1'
+    assert bits_to_mask(bits) == mask
+
+
+def test_window_masks_full_only_drops_partial_slots():
+    start, end = at(14, 2), at(14, 20)
+    assert window_masks(start, end) == {DAY.date(): 0b1111 << 168}
+    assert window_masks(start, end, full_only=True) == {DAY.date(): 0b111 << 169}
+
+
+def test_batch_coverage_groups_by_key_and_day():
+    rows = [('SPY', at(14, 1)), ('SPY', at(14, 4)), ('SPY', at(14, 6)), ('QQQ', at(1)), ('QQQ', None)]
+    assert batch_coverage(rows, 0, 1) == {
+        ('SPY', DAY.date()): 0b11 << 168,
+        ('QQQ', DAY.date()): 1 << 12,
+    }
+
+
+def test_missing_windows_merges_gaps_and_clips_to_window():
+    masks = {DAY.date(): window_masks(at(14, 10), at(14, 30))[DAY.date()]}
+
+    assert missing_windows(masks, at(14, 2), at(14, 45)) == [
+        (at(14, 2), at(14, 10)),
+        (at(14, 30), at(14, 45)),
+    ]
+    assert missing_windows(masks, at(14, 10), at(14, 30)) == []
+
+
+def test_missing_windows_merges_across_midnight():
+    next_day = DAY + timedelta(days=1)
+    assert missing_windows({}, at(23, 50), at(0, 10, day=next_day)) == [(at(23, 50), at(0, 10, day=next_day))]
+
+
+def test_covered_fraction():
+    masks = window_masks(at(14), at(14, 30))
+    assert covered_fraction(masks, at(14), at(15)) == 0.5
+    assert covered_fraction({}, at(14), at(14)) == 1.0
+
+
+class FakeCursor:
+    def __init__(self):
+        self.statements = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.statements.append((' '.join(sql.split()), params))
+
+
+class FakeConnection:
+    def __init__(self):
+        self.cur = FakeCursor()
+
+    def cursor(self):
+        return self.cur
+
+
+def test_mark_window_upserts_one_row_per_day():
+    conn = FakeConnection()
+    CoverageIndex('darkpool').mark_window(conn, 'SPY', at(23, 50), at(0, 10, day=DAY + timedelta(days=1)))
+
+    params = [params for _, params in conn.cur.statements]
+    assert [p[:3] for p in params] == [
+        ('darkpool', 'SPY', DAY.date()),
+        ('darkpool', 'SPY', (DAY + timedelta(days=1)).date()),
+    ]
+    assert bits_to_mask(params[0][3]) == 0b11 << (SLOTS_PER_DAY - 2)
+    assert bits_to_mask(params[1][3]) == 0b11
@@ -0,0 +1,150 @@
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+
+import pytest
+
+from collectors.utils import credit_ledger as ledger_module
+from collectors.utils.credit_ledger import HIGH, LOW, CreditBudgetExceeded, CreditLedger
+
+NOW = datetime(2025, 5, 8, 15, 0, tzinfo=timezone.utc)
+
+
+class FakeLedgerDB:
+    """Applies RESERVE_SQL's rule: the day total grows only while it stays within the cap."""
+
+    def __init__(self):
+        self.total = 0
+        self.rows = {}
+        self.fail = False
+
+    @contextmanager
+    def connect(self, config=None):
+        if self.fail:
+            raise ConnectionError('db down')
+        yield self
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params):
+        key = (params['collector'], params['endpoint'])
+        credits, refused = self.rows.get(key, (0, 0))
+        if self.total + params['credits'] <= params['cap']:
+            self.total += params['credits']
+            self.rows[key] = (credits + params['credits'], refused)
+            self.result = self.total
+        else:
+            self.rows[key] = (credits, refused + 1)
+            self.result = None
+
+    def fetchone(self):
+        return (self.result,)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeLedgerDB()
+    monkeypatch.setattr(ledger_module, 'pg_connection', db.connect)
+    return db
+
+
+def make_ledger(daily_credits=10):
+    return CreditLedger(daily_credits, low_priority_share=0.5, clock=lambda: NOW)
+
+
+def test_low_priority_work_stops_short_of_the_cap(db):
+    ledger = make_ledger()
+
+    assert [ledger.reserve('darkpool_backfill', '/darkpool/{ticker}', priority=LOW) for _ in range(5)] == [1, 2, 3, 4, 5]
+    with pytest.raises(CreditBudgetExceeded):
+        ledger.reserve('darkpool_backfill', '/darkpool/{ticker}', priority=LOW)
+
+    # Live work uses the rest of the day
+    assert [ledger.reserve('news', '/news/headlines') for _ in range(5)] == [6, 7, 8, 9, 10]
+    with pytest.raises(CreditBudgetExceeded):
+        ledger.reserve('news', '/news/headlines')
+
+    assert db.rows[('darkpool_backfill', '/darkpool/{ticker}')] == (5, 1)
+    assert db.rows[('news', '/news/headlines')] == (5, 1)
+    assert ledger.stats() == {'reserved': 10, 'refused': 2, 'unrecorded': 0}
+
+
+def test_unreachable_ledger_lets_live_work_through(db, monkeypatch):
+    ledger = make_ledger()
+    db.fail = True
+
+    assert ledger.reserve('news', '/news/headlines', priority=HIGH) is None
+    with pytest.raises(CreditBudgetExceeded):
+        ledger.reserve('darkpool_backfill', '/darkpool/{ticker}', priority=LOW)
+
+    db.fail = False  # Still inside the outage backoff: not retried yet
+    assert ledger.reserve('news', '/news/headlines') is None
+    assert ledger.stats() == {'reserved': 0, 'refused': 1, 'unrecorded': 2}
+
+    monkeypatch.setattr(ledger_module, 'OUTAGE_BACKOFF', 0)
+    ledger._unavailable_until = 0.0
+    assert ledger.reserve('news', '/news/headlines') == 1
+
+
+def test_reserver_picks_priority_per_endpoint(db):
+    ledger = make_ledger(daily_credits=2)
+    reserve = ledger.reserver('earnings', lambda endpoint: HIGH if endpoint.endswith('/afterhours') else LOW)
+
+    assert reserve('/earnings/{ticker}') == 1
+    with pytest.raises(CreditBudgetExceeded):
+        reserve('/earnings/{ticker}')
+    assert reserve('/earnings/afterhours') == 2
+
+
+class UsageCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params):
+        self.params = params
+
+    def fetchall(self):
+        return self.rows
+
+
+class UsageConn:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def cursor(self):
+        return UsageCursor(self.rows)
+
+
+def test_usage_projects_exhaustion_from_burn_rate():
+    ledger = CreditLedger(15000, clock=lambda: NOW)
+    first_at = datetime(2025, 5, 8, 10, 0, tzinfo=timezone.utc)
+    conn = UsageConn([
+        ('*', '*', 10000, 0, first_at, NOW),
+        ('darkpool', '/darkpool/{ticker}', 7000, 0, first_at, NOW),
+        ('news', '/news/headlines', 3000, 4, first_at, NOW),
+    ])
+
+    usage = ledger.usage(conn)
+
+    assert usage['used'] == 10000
+    assert usage['remaining'] == 5000
+    assert usage['burn_per_hour'] == 2000.0
+    assert usage['projected_exhaustion'] == '2025-05-08T17:30:00+00:00'
+    assert [row['collector'] for row in usage['endpoints']] == ['darkpool', 'news']
+
+    # At a slower burn the budget outlasts the day
+    conn.rows[0] = ('*', '*', 1000, 0, first_at, NOW)
+    assert ledger.usage(conn)['projected_exhaustion'] is None
+    assert ledger.usage(conn, day=date(2025, 5, 7))['burn_per_hour'] == 0.0
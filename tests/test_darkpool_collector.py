@@ -43,9 +43,9 @@ def test_make_request(collector):
     """Test _make_request method"""
     mock_response = Mock()
     mock_response.status_code = 200
-    mock_response.json.return_value = {"data": []}
+    mock_response.content = b'{"data": []}'
     
-    with patch('requests.get', return_value=mock_response):
+    with patch('requests.Session.request', return_value=mock_response):
         response = collector._make_request("test_endpoint")
         assert response == {"data": []}
 
@@ -302,12 +302,12 @@ def test_rate_limit_error_handling(collector):
 
 def test_make_request_retry_logic(collector):
     """Test _make_request retry logic"""
-    # Mock requests.get to fail first, then succeed
+    # Mock the shared session to fail first, then succeed
     mock_response = Mock()
     mock_response.status_code = 200
-    mock_response.json.return_value = {"data": []}
+    mock_response.content = b'{"data": []}'
     
-    with patch('requests.get', side_effect=[
+    with patch('requests.Session.request', side_effect=[
         requests.exceptions.RequestException("First attempt failed"),
         mock_response
     ]) as mock_get:
@@ -317,14 +317,14 @@ def test_make_request_retry_logic(collector):
 
 def test_make_request_timeout(collector):
     """Test _make_request timeout handling"""
-    with patch('requests.get', side_effect=requests.exceptions.Timeout("Request timed out")) as mock_get:
+    with patch('requests.Session.request', side_effect=requests.exceptions.Timeout("Request timed out")) as mock_get:
         response = collector._make_request("test_endpoint")
         assert response is None
         assert mock_get.call_count == 3  # Should have retried 3 times
 
 def test_make_request_connection_error(collector):
     """Test _make_request connection error handling"""
-    with patch('requests.get', side_effect=requests.exceptions.ConnectionError("Connection error")) as mock_get:
+    with patch('requests.Session.request', side_effect=requests.exceptions.ConnectionError("Connection error")) as mock_get:
         response = collector._make_request("test_endpoint")
         assert response is None
         assert mock_get.call_count == 3  # Should have retried 3 times
@@ -333,9 +333,9 @@ def test_make_request_invalid_json(collector):
     """Test _make_request invalid JSON response handling"""
     mock_response = Mock()
     mock_response.status_code = 200
-    mock_response.json.side_effect = ValueError("Invalid JSON")
+    mock_response.content = b'not json'
     
-    with patch('requests.get', return_value=mock_response) as mock_get:
+    with patch('requests.Session.request', return_value=mock_response) as mock_get:
         response = collector._make_request("test_endpoint")
         assert response is None
         mock_get.assert_called_once()
@@ -0,0 +1,217 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from collectors.darkpool import backfill_worker
+from collectors.darkpool_collector import DarkPoolCollector
+from collectors.utils.cache_store import CacheStore
+from collectors.utils.credit_ledger import HIGH, LOW
+from collectors.utils.recent_ids import RecentIdFilter
+from collectors.utils.records import DarkPoolTrade, RecordBatch
+from collectors.utils.time_buckets import TimeBuckets
+
+
+def make_trade(tracking_id, executed_at):
+    return DarkPoolTrade(tracking_id=tracking_id, symbol='SPY', executed_at=executed_at)
+
+
+@pytest.fixture
+def collector():
+    """DarkPoolCollector without env/DB setup."""
+    collector = DarkPoolCollector.__new__(DarkPoolCollector)
+    collector.page_limit = 2
+    collector.pipeline_depth = 1
+    collector.bulk_write = True
+    collector.engine = MagicMock()
+    collector.recent_ids = RecentIdFilter()
+    collector.window_buckets = TimeBuckets(timedelta(days=1))
+    collector.window_cache = None
+    collector.credits = MagicMock()
+    collector.rate_limiter = MagicMock()
+    return collector
+
+
+def test_iter_trade_pages_walks_older_than_backwards(collector):
+    end = datetime(2025, 5, 1, 15, 0, tzinfo=timezone.utc)
+    start = end - timedelta(minutes=10)
+    pages = [
+        [make_trade(4, end - timedelta(minutes=1)), make_trade(3, end - timedelta(minutes=2))],
+        [make_trade(2, end - timedelta(minutes=3)), make_trade(1, end - timedelta(minutes=4))],
+        [make_trade(0, end - timedelta(minutes=5))],
+    ]
+    collector._fetch_trades = MagicMock(side_effect=pages)
+
+    result = list(collector._iter_trade_pages('SPY', start, end))
+
+    assert result == pages
+    upper_bounds = [call.args[2] for call in collector._fetch_trades.call_args_list]
+    assert upper_bounds == [end, end - timedelta(minutes=2), end - timedelta(minutes=4)]
+
+
+def test_iter_trade_pages_stops_when_cursor_stalls(collector):
+    end = datetime(2025, 5, 1, 15, 0, tzinfo=timezone.utc)
+    same = end - timedelta(minutes=1)
+    page = [make_trade(1, same), make_trade(2, same)]
+    collector._fetch_trades = MagicMock(side_effect=[page, page, page])
+
+    stats = {'stalled': 0}
+    result = list(collector._iter_trade_pages('SPY', end - timedelta(minutes=10), end, stats))
+
+    assert result == [page, page]
+    assert stats['stalled'] == 1
+
+
+def test_stalled_windows_are_not_marked_covered(collector, monkeypatch):
+    monkeypatch.setattr('collectors.darkpool_collector.log_error', MagicMock())
+    end = datetime(2025, 5, 1, 15, 0, tzinfo=timezone.utc)
+    collector.lookback_minutes = 10
+    collector._get_latest_executed_at = MagicMock(return_value=None)
+    collector._mark_window_covered = MagicMock()
+    collector._get_missing_windows = MagicMock(return_value=[(end - timedelta(hours=1), end)])
+    stats = {'pages': 2, 'fetched': 4, 'inserted': 4, 'duplicates': 0, 'stalled': 1,
+             'fetch_seconds': 0.1, 'write_seconds': 0.1}
+    collector._collect_window = MagicMock(side_effect=lambda *args: dict(stats))
+
+    assert collector._collect_symbol('SPY', end)['stalled'] == 1
+    assert collector._backfill_symbol('SPY', end - timedelta(hours=1), end)['stalled'] == 1
+    collector._mark_window_covered.assert_not_called()
+
+    stats['stalled'] = 0
+    collector._collect_symbol('SPY', end)
+    collector._mark_window_covered.assert_called_once()
+
+
+def test_iter_trade_pages_counts_skipped_trades_toward_full_page(collector):
+    end = datetime(2025, 5, 1, 15, 0, tzinfo=timezone.utc)
+    start = end - timedelta(minutes=10)
+    first = RecordBatch([make_trade(2, end - timedelta(minutes=1))])
+    first.skipped = 1  # One malformed trade dropped from a full page
+    second = [make_trade(1, end - timedelta(minutes=3))]
+    collector._fetch_trades = MagicMock(side_effect=[first, second])
+
+    result = list(collector._iter_trade_pages('SPY', start, end))
+
+    assert result == [first, second]
+
+
+def test_fetch_trades_caches_closed_windows_only(collector, tmp_path):
+    collector.window_cache = CacheStore(tmp_path / 'darkpool.sqlite3')
+    collector.client = MagicMock()
+    collector.client.get.return_value.content = (
+        b'{"data": [{"tracking_id": 7, "ticker": "SPY", "price": "510.5", "size": 100, "volume": 100, '
+        b'"premium": "51050", "executed_at": "2025-05-01T14:00:00Z", "canceled": false}]}'
+    )
+    closed_end = datetime(2025, 5, 1, 15, 0, tzinfo=timezone.utc)
+    open_end = datetime.now(timezone.utc)
+
+    first = collector._fetch_trades('SPY', closed_end - timedelta(hours=1), closed_end)
+    again = collector._fetch_trades('SPY', closed_end - timedelta(hours=1), closed_end)
+    collector._fetch_trades('SPY', open_end - timedelta(minutes=10), open_end)
+    collector._fetch_trades('SPY', open_end - timedelta(minutes=10), open_end)
+
+    assert [trade.tracking_id for trade in again] == [trade.tracking_id for trade in first] == [7]
+    assert collector.client.get.call_count == 3  # the closed window was fetched once
+    assert collector.window_cache.stats()['entries'] == 1
+
+
+def test_collect_window_writes_every_page(collector):
+    collector._iter_trade_pages = MagicMock(return_value=iter([[1, 2], [3, 4], [5]]))
+    collector._save_trades = MagicMock(side_effect=lambda page, marks: (len(page) - 1, 1))
+
+    stats = collector._collect_window('SPY', None, None)
+
+    assert stats['pages'] == 3
+    assert stats['fetched'] == 5
+    assert stats['inserted'] == 2
+    assert stats['duplicates'] == 3
+    assert collector._save_trades.call_count == 3
+
+
+def test_collect_window_raises_writer_errors(collector):
+    collector._iter_trade_pages = MagicMock(return_value=iter([[1], [2]]))
+    collector._save_trades = MagicMock(side_effect=RuntimeError('db down'))
+
+    with pytest.raises(RuntimeError, match='db down'):
+        collector._collect_window('SPY', None, None)
+
+
+def test_watermarks_wait_for_the_whole_window(collector):
+    end = datetime(2025, 5, 1, 15, 0, tzinfo=timezone.utc)
+    newest = [make_trade(2, end - timedelta(minutes=1)), make_trade(1, end - timedelta(minutes=2))]
+    collector.watermarks = MagicMock()
+    collector._copy_trades = MagicMock(return_value=(2, 0))
+
+    def fail_on_older_page():
+        yield newest
+        raise RuntimeError('reset')
+
+    collector._iter_trade_pages = MagicMock(return_value=fail_on_older_page())
+    with pytest.raises(RuntimeError, match='reset'):
+        collector._collect_window('SPY', end - timedelta(minutes=10), end)
+    assert collector._copy_trades.call_args.args[1] == {}  # written, but not advanced
+    collector.watermarks.advance_many.assert_not_called()
+
+    collector.recent_ids = RecentIdFilter()
+    collector._iter_trade_pages = MagicMock(return_value=iter([newest]))
+    collector._collect_window('SPY', end - timedelta(minutes=10), end)
+    collector.watermarks.advance_many.assert_called_once()
+    assert collector.watermarks.advance_many.call_args.args[1] == {'SPY': end - timedelta(minutes=1)}
+
+
+def test_save_trades_skips_recently_written_ids(collector):
+    now = datetime(2025, 5, 1, 15, 0, tzinfo=timezone.utc)
+    collector._copy_trades = MagicMock(side_effect=lambda rows, marks: (len(rows), 0))
+
+    assert collector._save_trades([make_trade(1, now), make_trade(2, now)]) == (2, 0)
+    assert collector._save_trades([make_trade(2, now), make_trade(3, now)]) == (1, 1)
+    assert collector._save_trades([make_trade(1, now), make_trade(3, now)]) == (0, 2)
+
+    written = [[row[0] for row in call.args[0]] for call in collector._copy_trades.call_args_list]
+    assert written == [[1, 2], [3]]  # the all-overlap page sent no SQL
+    assert collector.recent_ids.stats()['hit_rate'] == 0.5
+
+
+def test_failed_writes_are_not_remembered(collector):
+    now = datetime(2025, 5, 1, 15, 0, tzinfo=timezone.utc)
+    collector._copy_trades = MagicMock(side_effect=[RuntimeError('db down'), (1, 0)])
+
+    with pytest.raises(RuntimeError):
+        collector._save_trades([make_trade(1, now)])
+
+    assert collector._save_trades([make_trade(1, now)]) == (1, 0)
+
+
+def test_run_per_symbol_times_each_symbol_concurrently(collector):
+    collector.symbols = ['SPY', 'QQQ', 'TSLA']
+    collector.concurrent = True
+    collector.max_workers = 3
+    stats = {'pages': 1, 'fetched': 2, 'inserted': 2, 'duplicates': 0,
+             'fetch_seconds': 0.1, 'write_seconds': 0.1}
+
+    per_symbol = collector._run_per_symbol(lambda symbol: None if symbol == 'TSLA' else dict(stats))
+    totals, details = collector._summarize(per_symbol)
+
+    assert set(per_symbol) == {'SPY', 'QQQ'}
+    assert totals['inserted'] == 4
+    assert set(details['symbols']) == {'SPY', 'QQQ'}
+    assert 'seconds' in details['symbols']['SPY']
+
+
+def test_backfills_charge_credits_at_low_priority(collector, monkeypatch):
+    for name in ('log_heartbeat', 'log_collector_summary'):
+        monkeypatch.setattr(f'collectors.darkpool_collector.{name}', MagicMock())
+    monkeypatch.setattr(backfill_worker, 'log_collector_summary', MagicMock())
+    monkeypatch.setattr(backfill_worker.backfill_jobs, 'claim', MagicMock(return_value=None))
+    collector.credit_priority = HIGH
+    seen = []
+    collector._run_per_symbol = lambda fetch, symbols=None: seen.append(collector.credit_priority) or {}
+    collector._summarize = MagicMock(return_value=(Counter(), {}))
+
+    collector.backfill_trades(hours=1)
+    collector.collect_trades()
+    assert seen == [LOW, HIGH]
+
+    backfill_worker.run_worker(collector, 'host:1')
+    assert collector.credit_priority == LOW
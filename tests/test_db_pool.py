@@ -0,0 +1,109 @@
+import threading
+
+import pytest
+
+from collectors.utils.db_pool import PgPool, _redact, dsn_from_config
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.commits = 0
+        self.rollbacks = 0
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = 1
+
+
+def make_pool(maxconn=2, timeout=0.05):
+    opened = []
+
+    def connect(dsn):
+        conn = FakeConnection()
+        opened.append(conn)
+        return conn
+
+    return PgPool('postgresql://u:secret@db:5432/trading', maxconn=maxconn, timeout=timeout, connect=connect), opened
+
+
+def test_dsn_from_config_quotes_credentials():
+    dsn = dsn_from_config({'user': 'collector', 'password': 'p@ss/word', 'host': 'db', 'port': '5432',
+                           'dbname': 'trading', 'sslmode': 'require'})
+
+    assert dsn == 'postgresql://collector:p%40ss%2Fword@db:5432/trading?sslmode=require'
+    assert _redact(dsn) == 'postgresql://collector:***@db:5432/trading?sslmode=require'
+
+
+def test_connections_are_reused():
+    pool, opened = make_pool()
+
+    with pool.connection() as conn:
+        pass
+    with pool.connection() as again:
+        pass
+
+    assert again is conn
+    assert len(opened) == 1
+    assert conn.commits == 2
+    assert pool.status()['checked_out'] == 0
+    assert pool.status()['checkouts'] == 2
+
+
+def test_exhausted_pool_waits_then_times_out():
+    pool, _ = make_pool(maxconn=1)
+    held = pool.getconn()
+
+    with pytest.raises(TimeoutError):
+        pool.getconn()
+    assert pool.status()['timeouts'] == 1
+
+    releaser = threading.Timer(0.01, pool.putconn, args=(held,))
+    pool.timeout = 1.0
+    releaser.start()
+    assert pool.getconn() is held
+    releaser.join()
+
+
+def test_closed_connections_are_replaced():
+    pool, opened = make_pool()
+    conn = pool.getconn()
+    conn.close()
+    pool.putconn(conn)
+
+    replacement = pool.getconn()
+
+    assert replacement is not conn
+    assert len(opened) == 2
+    assert pool.status()['open'] == 1
+
+
+def test_error_rolls_back_and_returns_connection():
+    pool, _ = make_pool()
+
+    with pytest.raises(RuntimeError):
+        with pool.connection() as conn:
+            raise RuntimeError('boom')
+
+    assert conn.commits == 0
+    assert conn.rollbacks >= 1
+    assert pool.status()['idle'] == 1
+
+
+def test_reset_after_fork_drops_parent_connections_without_closing():
+    pool, opened = make_pool()
+    parent_conn = pool.getconn()
+    pool.putconn(pool.getconn())
+
+    pool.reset_after_fork()
+    pool.putconn(parent_conn)  # Checked out before the fork: ignored
+
+    status = pool.status()
+    assert not any(conn.closed for conn in opened)
+    assert (status['open'], status['idle'], status['checked_out'], status['checkouts']) == (0, 0, 0, 0)
+    assert pool.getconn() not in opened[:2]
@@ -0,0 +1,75 @@
+import threading
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from flow_analysis.scripts.flow_alerts_collector import FlowAlertsCollector
+from flow_analysis.scripts.options_flow_collector import OptionsFlowCollector
+
+WATERMARK = datetime(2025, 5, 8, 14, 30, tzinfo=timezone.utc)
+
+
+def make_collector(cls, symbols, concurrent=True):
+    """Collector without env/DB setup."""
+    collector = cls.__new__(cls)
+    collector.symbols = symbols
+    collector.concurrent = concurrent
+    collector.max_workers = len(symbols)
+    collector.logger = MagicMock()
+    collector.db_conn = None
+    return collector
+
+
+def frame(symbol, rows):
+    return pd.DataFrame({'symbol': [symbol] * rows, 'premium': [30000.0] * rows})
+
+
+def test_flow_alert_symbols_are_fetched_together_and_saved_once():
+    collector = make_collector(FlowAlertsCollector, ['SPY', 'QQQ', 'TSLA'])
+    collector._get_watermark = MagicMock(side_effect=lambda symbol: WATERMARK if symbol == 'SPY' else None)
+    collector.save_alerts_to_db = MagicMock()
+    barrier = threading.Barrier(3, timeout=5)  # Passes only with every symbol in flight at once
+    watermarks = {}
+
+    def fetch(symbol, windows, start_date, end_date, watermark):
+        barrier.wait()
+        watermarks[symbol] = watermark
+        if symbol == 'TSLA':
+            raise ValueError('bad payload')
+        return frame(symbol, 2)
+
+    collector._fetch_symbol = fetch
+    per_symbol = collector._collect_cycle([(None, None)])
+
+    assert collector.save_alerts_to_db.call_count == 1
+    saved = collector.save_alerts_to_db.call_args[0][0]
+    assert sorted(saved['symbol'].unique()) == ['QQQ', 'SPY']
+    assert watermarks == {'SPY': WATERMARK, 'QQQ': None, 'TSLA': None}
+    assert per_symbol['SPY']['alerts'] == 2
+    assert per_symbol['TSLA']['alerts'] == 0
+    assert per_symbol['TSLA']['error'] == 'bad payload'
+    assert all('seconds' in stats for stats in per_symbol.values())
+
+
+def test_options_flow_cycle_writes_once_for_all_symbols():
+    collector = make_collector(OptionsFlowCollector, ['SPY', 'QQQ'], concurrent=False)
+    collector.save_flows_to_db = MagicMock()
+    collector._fetch_symbol = lambda symbol: frame(symbol, 3 if symbol == 'SPY' else 1)
+
+    per_symbol = collector.collect_cycle()
+
+    collector.save_flows_to_db.assert_called_once()
+    assert len(collector.save_flows_to_db.call_args[0][0]) == 4
+    assert {symbol: stats['flows'] for symbol, stats in per_symbol.items()} == {'SPY': 3, 'QQQ': 1}
+
+
+def test_options_flow_cycle_skips_the_write_without_flows():
+    collector = make_collector(OptionsFlowCollector, ['SPY', 'QQQ'])
+    collector.save_flows_to_db = MagicMock()
+    collector._fetch_symbol = lambda symbol: pd.DataFrame()
+
+    per_symbol = collector.collect_cycle()
+
+    collector.save_flows_to_db.assert_not_called()
+    assert per_symbol['QQQ']['flows'] == 0
@@ -0,0 +1,180 @@
+import pytest
+import requests
+
+from collectors.utils.http_client import (
+    LatencyHistogram, UWClient, endpoint_template, latency_stats, timeout_for
+)
+from collectors.utils.rate_limiter import RateLimitStatus
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, content=b'{"data": []}', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error", response=self)
+
+
+class FakeSession:
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def make_client(*outcomes, **kwargs):
+    sleeps = []
+    client = UWClient(headers={'Authorization': 'Bearer t'}, session=FakeSession(*outcomes),
+                      sleep=sleeps.append, **kwargs)
+    return client, sleeps
+
+
+def test_endpoint_template_collapses_tickers_and_dates():
+    assert endpoint_template('https://api.unusualwhales.com/api/darkpool/SPY?limit=5') == '/darkpool/{ticker}'
+    assert endpoint_template('https://api.unusualwhales.com/api/stock/BRK.B/expiry-breakdown') == \
+        '/stock/{ticker}/expiry-breakdown'
+    assert endpoint_template('https://api.unusualwhales.com/api/market/2025-05-01/flow') == '/market/{date}/flow'
+    assert endpoint_template('https://api.unusualwhales.com/api/news/headlines') == '/news/headlines'
+
+
+def test_timeout_for_uses_longest_prefix():
+    timeouts = {'/stock/': (1.0, 10.0), '/stock/{ticker}/flow': (1.0, 60.0)}
+
+    assert timeout_for('/stock/{ticker}/flow-recent', timeouts) == (1.0, 60.0)
+    assert timeout_for('/stock/{ticker}/greeks', timeouts) == (1.0, 10.0)
+    assert timeout_for('/news/headlines', {}) == (5.0, 30.0)
+
+
+def test_get_json_sends_headers_and_endpoint_timeout():
+    client, _ = make_client(FakeResponse(content=b'{"data": [1]}'), timeouts={'/darkpool/': (2.0, 9.0)})
+
+    assert client.get_json('/darkpool/QQQ', params={'limit': 1}) == {'data': [1]}
+
+    method, url, kwargs = client.session.calls[0]
+    assert (method, url) == ('GET', 'https://api.unusualwhales.com/api/darkpool/QQQ')
+    assert kwargs['headers'] == {'Authorization': 'Bearer t'}
+    assert kwargs['timeout'] == (2.0, 9.0)
+    assert kwargs['params'] == {'limit': 1}
+
+
+def test_transient_errors_are_retried_with_backoff():
+    throttled = []
+    client, sleeps = make_client(
+        requests.exceptions.ConnectionError('reset'),
+        FakeResponse(503),
+        FakeResponse(),
+        backoff=0.5,
+        throttle=lambda: throttled.append(1),
+    )
+
+    response = client.get('/darkpool/IWM', endpoint='/test/retried')
+
+    assert response.status_code == 200
+    assert sleeps == [0.5, 1.0]
+    assert len(throttled) == 3  # every attempt goes through the limiter
+    stats = latency_stats()['/test/retried']
+    assert (stats['count'], stats['errors'], stats['retries']) == (3, 2, 2)
+
+
+def test_retry_after_is_honoured():
+    client, sleeps = make_client(FakeResponse(429, headers={'Retry-After': '7'}), FakeResponse())
+
+    client.get('/news/headlines')
+
+    assert sleeps == [7.0]
+
+
+def test_client_errors_are_not_retried():
+    client, sleeps = make_client(FakeResponse(404), FakeResponse())
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        client.get('/darkpool/NOPE')
+
+    assert sleeps == []
+    assert len(client.session.calls) == 1
+
+
+def test_retries_are_exhausted():
+    client, sleeps = make_client(*[requests.exceptions.Timeout('slow')] * 3)
+
+    with pytest.raises(requests.exceptions.Timeout):
+        client.get('/darkpool/SPY')
+
+    assert len(sleeps) == 2
+
+
+def test_latency_histogram_buckets_and_quantiles():
+    hist = LatencyHistogram(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.05, 0.5, 3.0):
+        hist.observe(seconds)
+
+    stats = hist.as_dict()
+
+    assert stats['buckets'] == {'le_0.1': 2, 'le_1': 1, 'le_inf': 1}
+    assert stats['p50_seconds'] == 0.1
+    assert stats['p95_seconds'] == 3.0
+    assert stats['max_seconds'] == 3.0
+
+
+def test_reserve_runs_before_every_attempt_and_can_refuse():
+    reserved = []
+    client, _ = make_client(FakeResponse(status_code=503), FakeResponse(), reserve=reserved.append)
+
+    client.get('/darkpool/SPY')
+    assert reserved == ['/darkpool/{ticker}', '/darkpool/{ticker}']
+
+    def refuse(endpoint):
+        raise RuntimeError('budget used up')
+
+    client, _ = make_client(FakeResponse(), reserve=refuse)
+    with pytest.raises(RuntimeError):
+        client.get('/darkpool/SPY')
+    assert client.session.calls == []
+
+
+def test_rate_limit_headers_are_passed_to_observe():
+    observed = []
+    headers = {
+        'x-uw-req-per-minute-limit': '120',
+        'x-uw-req-per-minute-remaining': '7',
+        'x-uw-req-per-minute-reset': '1500',
+        'x-uw-daily-req-count': '42',
+        'x-uw-token-req-limit': '20000',
+    }
+    client, _ = make_client(FakeResponse(headers=headers), FakeResponse(), observe=observed.append)
+
+    client.get_json('/darkpool/SPY')
+    client.get_json('/darkpool/SPY')  # no headers, nothing observed
+
+    assert observed == [RateLimitStatus(limit=120, remaining=7, reset=1.5, daily_count=42, daily_limit=20000)]
+
+
+def test_rate_limited_retry_waits_for_the_window_reset():
+    observed = []
+    limited = FakeResponse(429, headers={'x-uw-req-per-minute-remaining': '0',
+                                         'x-uw-req-per-minute-reset': '4000'})
+    client, sleeps = make_client(limited, FakeResponse(), observe=observed.append)
+
+    assert client.get_json('/darkpool/SPY') == {'data': []}
+    assert sleeps == [4.0]
+    assert observed == [RateLimitStatus(remaining=0, reset=4.0)]
+
+
+def test_unparseable_rate_limit_headers_are_ignored():
+    observed = []
+    headers = {'x-uw-req-per-minute-remaining': object(), 'x-uw-req-per-minute-reset': 'soon',
+               'Retry-After': object()}
+    client, sleeps = make_client(FakeResponse(503, headers=headers), FakeResponse(), observe=observed.append)
+
+    assert client.get_json('/darkpool/SPY') == {'data': []}
+    assert observed == []
+    assert sleeps == [1.0]
@@ -0,0 +1,36 @@
+import ast
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Calls allowed at module level: path setup and loggers, nothing that does I/O
+ALLOWED_CALLS = {'Path', 'str', 'sys.path.append', 'logging.getLogger'}
+
+
+def _dotted(node):
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return f"{_dotted(node.value)}.{node.attr}"
+    return '<expr>'
+
+
+def module_level_calls(path):
+    """Names of functions called while a module is imported (definitions and the __main__ block excluded)."""
+    calls = set()
+    for statement in ast.parse(path.read_text()).body:
+        if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            calls.update(_dotted(d.func if isinstance(d, ast.Call) else d)
+                         for d in statement.decorator_list if isinstance(d, ast.Call))
+            continue
+        if isinstance(statement, ast.If) and '__main__' in ast.dump(statement.test):
+            continue
+        calls.update(_dotted(node.func) for node in ast.walk(statement) if isinstance(node, ast.Call))
+    return calls
+
+
+@pytest.mark.parametrize('module', ['flow_analysis/scripts/options_flow_collector.py'])
+def test_collector_import_has_no_side_effects(module):
+    assert module_level_calls(PROJECT_ROOT / module) <= ALLOWED_CALLS
@@ -0,0 +1,270 @@
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from collectors.news.newscollector import NewsCollector
+from collectors.utils.cache_store import CacheStore
+from collectors.utils.credit_ledger import HIGH, LOW
+from collectors.utils.story_index import StoryIndex
+from collectors.utils.time_buckets import TimeBuckets
+
+NOW = datetime(2025, 5, 8, 15, 0, tzinfo=timezone.utc)
+
+
+class FakeCursor:
+    def __init__(self, rowcount):
+        self.statements = []
+        self.copied = None
+        self._rowcount = rowcount
+        self.rowcount = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.statements.append(' '.join(sql.split()))
+        if sql.strip().startswith('INSERT'):
+            self.rowcount = self._rowcount
+
+    def copy_expert(self, sql, buffer):
+        self.copied = buffer.read()
+
+
+def article(headline, created_at):
+    return {
+        'headline': headline, 'source': 'Benzinga', 'created_at': created_at,
+        'tags': ['earnings'], 'tickers': ['AAPL', 'MSFT'], 'is_major': False,
+        'sentiment': 'positive', 'meta': {'url': 'https://example.com'},
+    }
+
+
+@pytest.fixture
+def collector():
+    """NewsCollector without API/DB setup."""
+    collector = NewsCollector.__new__(NewsCollector)
+    collector.engine = MagicMock()
+    collector.watermarks = MagicMock()
+    collector.stories = StoryIndex()
+    return collector
+
+
+def test_save_headlines_writes_one_batch(collector):
+    cur = FakeCursor(rowcount=1)
+    raw_conn = collector.engine.raw_connection.return_value
+    raw_conn.cursor.return_value = cur
+
+    result = collector.save_headlines([
+        article('Apple beats', '2025-05-01T20:05:00Z'),
+        article('Microsoft beats', '2025-05-01T20:10:00Z'),
+    ])
+
+    assert result == (1, 1)
+    assert cur.copied.count('\n') == 2
+    assert '"{""AAPL"",""MSFT""}"' in cur.copied
+    assert any('ON CONFLICT (headline, source, created_at) DO NOTHING' in sql for sql in cur.statements)
+    newest = datetime(2025, 5, 1, 20, 10, tzinfo=timezone.utc)
+    collector.watermarks.advance.assert_called_once_with(raw_conn, 'all', newest)
+    raw_conn.commit.assert_called_once()
+    collector.watermarks.remember.assert_called_once_with('all', newest)
+
+
+def test_rewritten_headlines_share_a_story_id(collector):
+    cur = FakeCursor(rowcount=2)
+    collector.engine.raw_connection.return_value.cursor.return_value = cur
+
+    collector.save_headlines([
+        article('Apple beats Q2 estimates as iPhone sales jump', '2025-05-01T20:05:00Z'),
+        article('Apple beats Q2 estimates as iPhone sales jump 5%', '2025-05-01T20:07:00Z'),
+        article('Fed holds rates steady', '2025-05-01T20:10:00Z'),
+    ])
+
+    story_ids = [line.rsplit(',', 1)[1] for line in cur.copied.splitlines()]
+    assert story_ids[0] == story_ids[1] != story_ids[2]
+
+
+def test_failed_save_rolls_back_and_keeps_watermark(collector):
+    raw_conn = collector.engine.raw_connection.return_value
+    raw_conn.cursor.side_effect = RuntimeError('db down')
+
+    with pytest.raises(RuntimeError):
+        collector.save_headlines([article('Apple beats', '2025-05-01T20:05:00Z')])
+
+    raw_conn.rollback.assert_called_once()
+    collector.watermarks.remember.assert_not_called()
+
+
+def test_save_headlines_skips_empty_batches(collector):
+    assert collector.save_headlines([]) == (0, 0)
+    collector.engine.raw_connection.assert_not_called()
+
+
+class FakeNewsClient:
+    """Serves ``per_day`` articles a day, newest first, with random latency."""
+
+    def __init__(self, per_day):
+        self.per_day = per_day
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get_json(self, endpoint, params=None, timeout=None):
+        with self.lock:
+            self.calls.append(params)
+        time.sleep(random.uniform(0, 0.005))
+        newer = datetime.strptime(params['newer_than'], '%Y-%m-%dT%H:%M:%S%z')
+        older = datetime.strptime(params['older_than'], '%Y-%m-%dT%H:%M:%S%z')
+        day = newer.replace(hour=0, minute=0, second=0)
+        stamps = [day + timedelta(seconds=(i + 1) * 86400 // (self.per_day + 1)) for i in range(self.per_day)]
+        stamps = sorted((t for t in stamps if newer <= t <= older), reverse=True)
+        page = stamps[params['page'] * params['limit']:(params['page'] + 1) * params['limit']]
+        return {'data': [article(f"{t:%Y%m%d%H%M%S}", t.isoformat()) for t in page]}
+
+
+def fetching_collector(tmp_path, per_day, concurrent):
+    collector = NewsCollector.__new__(NewsCollector)
+    collector.client = FakeNewsClient(per_day)
+    collector.api_endpoint = '/news/headlines'
+    collector.request_timeout = 30
+    collector.batch_size = 50
+    collector.max_pages = 10
+    collector.daily_request_count = 0
+    collector.credits = MagicMock()
+    collector.rate_limiter = MagicMock()
+    collector.concurrent = concurrent
+    collector.max_parallel_requests = 3
+    collector.buckets = TimeBuckets(timedelta(days=1), clock=lambda: NOW)
+    collector.cache = CacheStore(tmp_path / f'news-{concurrent}.sqlite3')
+    collector._counter_lock = threading.Lock()
+    collector.stories = StoryIndex()
+    return collector
+
+
+@pytest.mark.parametrize('per_day,capped', [(25, False), (250, True)])  # vs the 1000 article cap
+def test_concurrent_fetch_matches_serial(tmp_path, per_day, capped):
+    start = NOW - timedelta(days=7)
+    serial = fetching_collector(tmp_path, per_day, concurrent=False)
+    concurrent = fetching_collector(tmp_path, per_day, concurrent=True)
+
+    expected = serial.fetch_data(start, NOW)
+    result = concurrent.fetch_data(start, NOW)
+
+    assert result == expected
+    assert (len(expected) >= 1000) == capped
+    assert concurrent.daily_request_count == len(concurrent.client.calls)
+
+
+def test_closed_days_are_served_from_cache(tmp_path):
+    collector = fetching_collector(tmp_path, 25, concurrent=True)
+    start = NOW - timedelta(days=3)
+
+    first = collector.fetch_data(start, NOW)
+    calls = len(collector.client.calls)
+    again = collector.fetch_data(start, NOW)
+
+    assert again == first
+    # Only the open day (May 8) is requested again
+    assert {params['newer_than'][:10] for params in collector.client.calls[calls:]} == {'2025-05-08'}
+
+
+@pytest.fixture
+def quiet_logs(monkeypatch):
+    for name in ('log_heartbeat', 'log_collector_summary', 'log_error'):
+        monkeypatch.setattr(f'collectors.news.newscollector.{name}', MagicMock())
+
+
+def test_collect_streams_pages_and_advances_watermark_per_day(tmp_path, quiet_logs):
+    collector = fetching_collector(tmp_path, 120, concurrent=True)  # 3 pages a day: 50, 50, 20
+    writes = []
+    collector._write_rows = lambda rows, watermark: writes.append((len(rows), watermark)) or (len(rows), 0)
+    start = datetime(2025, 5, 5, tzinfo=timezone.utc)
+
+    collector.collect(start, NOW)
+
+    assert collector.total_articles == 3 * 120 + 75  # May 8 up to 15:00
+    assert [count for count, _ in writes] == [50, 50, 20] * 3 + [50, 25]
+    watermarks = [watermark for _, watermark in writes if watermark is not None]
+    assert [w.date().isoformat() for w in watermarks] == ['2025-05-05', '2025-05-06', '2025-05-07', '2025-05-08']
+
+
+def test_incomplete_day_holds_back_later_watermarks(tmp_path, quiet_logs):
+    collector = fetching_collector(tmp_path, 120, concurrent=False)
+    serve = collector.client.get_json
+
+    def fail_on_first_day_second_page(endpoint, params=None, timeout=None):
+        if params['newer_than'].startswith('2025-05-05') and params['page'] == 1:
+            raise requests.exceptions.ConnectionError('reset')
+        return serve(endpoint, params, timeout)
+
+    collector.client.get_json = fail_on_first_day_second_page
+    start = datetime(2025, 5, 5, tzinfo=timezone.utc)
+    end = datetime(2025, 5, 7, tzinfo=timezone.utc)
+
+    pages = list(collector.iter_pages(start, end))
+
+    # May 6 was fetched whole, but May 5 wasn't: neither may move the watermark
+    assert sum(len(page) for page, _ in pages) == 50 + 120
+    assert [day_done for _, day_done in pages] == [None] * len(pages)
+
+
+def test_page_cap_leaves_the_day_incomplete(tmp_path, quiet_logs):
+    collector = fetching_collector(tmp_path, 120, concurrent=False)
+    collector.max_pages = 2  # 100 of each day's 120 articles
+    start = datetime(2025, 5, 5, tzinfo=timezone.utc)
+    end = datetime(2025, 5, 7, tzinfo=timezone.utc)
+
+    pages = list(collector.iter_pages(start, end))
+
+    assert sum(len(page) for page, _ in pages) == 2 * 100
+    assert [day_done for _, day_done in pages] == [None] * len(pages)
+
+
+def test_backfill_charges_credits_at_low_priority(tmp_path, quiet_logs):
+    collector = fetching_collector(tmp_path, 25, concurrent=False)
+    collector.credit_priority = HIGH
+    collector.total_articles = collector.total_credits_used = 0
+    collector.watermarks = MagicMock()
+    collector.watermarks.cached.return_value = None
+    collector.watermarks.get.return_value = None
+    collector.engine = MagicMock()
+    seen = []
+    collector.collect = lambda start_date, end_date: seen.append(collector.credit_priority)
+
+    collector.backfill(days=1)
+
+    assert seen == [LOW]
+    assert collector.credit_priority == HIGH
+
+
+def test_interrupted_collect_resumes_from_cache(tmp_path, quiet_logs):
+    collector = fetching_collector(tmp_path, 120, concurrent=False)
+    writes = []
+    failures = [RuntimeError('db down')]
+
+    def fail_on_second_day(rows, watermark):
+        if len(writes) == 3 and failures:
+            raise failures.pop()
+        writes.append(watermark)
+        return len(rows), 0
+
+    collector._write_rows = fail_on_second_day
+    start = datetime(2025, 5, 5, tzinfo=timezone.utc)
+    end = datetime(2025, 5, 7, tzinfo=timezone.utc)
+
+    with pytest.raises(RuntimeError):
+        collector.collect(start, end)
+    assert [w for w in writes if w is not None] == [writes[2]]  # only May 5 completed
+    calls = len(collector.client.calls)
+
+    collector.collect(writes[2] + timedelta(seconds=1), end)
+
+    # May 6 was fetched whole before its first write failed: the rerun costs no requests
+    assert len(collector.client.calls) == calls
+    assert len(writes) == 3 + 3
+    assert writes[-1].date().isoformat() == '2025-05-06'
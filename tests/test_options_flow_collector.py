@@ -45,11 +45,11 @@ def test_initialization(collector):
 
 def test_make_request(collector):
     """Test the _make_request method"""
-    with patch('requests.get') as mock_get:
+    with patch('requests.Session.request') as mock_get:
         # Test successful request
         mock_response = Mock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {'data': [{'test': 'data'}]}
+        mock_response.content = b'{"data": [{"test": "data"}]}'
         mock_get.return_value = mock_response
         
         result = collector._make_request('test_endpoint')
@@ -0,0 +1,203 @@
+import multiprocessing
+import threading
+
+import pytest
+
+from collectors.utils.rate_limiter import (
+    FileBackend, GcraLimiter, MemoryBackend, RateLimitStatus, Tier, TokenBucket, backend_from_url,
+    shared_bucket,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_burst_then_refill():
+    clock = FakeClock()
+    bucket = TokenBucket(rate_per_minute=60, burst=2, clock=clock, sleep=clock.sleep)
+
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == pytest.approx(1.0)
+
+    clock.now += 0.5
+    assert bucket.try_acquire() == pytest.approx(0.5)
+
+
+def test_acquire_sleeps_until_token_available():
+    clock = FakeClock()
+    bucket = TokenBucket(rate_per_minute=120, burst=1, clock=clock, sleep=clock.sleep)
+
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert bucket.total_wait == pytest.approx(0.5)
+    assert clock.now == pytest.approx(0.5)
+
+
+def test_tokens_never_exceed_burst():
+    clock = FakeClock()
+    bucket = TokenBucket(rate_per_minute=60, burst=3, clock=clock, sleep=clock.sleep)
+    clock.now += 3600
+    for _ in range(3):
+        assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() > 0
+
+
+def test_concurrent_acquire_admits_only_burst():
+    bucket = TokenBucket(rate_per_minute=0.001, burst=5)
+    admitted = []
+
+    def worker():
+        if bucket.try_acquire() == 0.0:
+            admitted.append(1)
+
+    threads = [threading.Thread(target=worker) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(admitted) == 5
+
+
+def test_shared_bucket_is_process_wide():
+    assert shared_bucket('test-shared') is shared_bucket('test-shared')
+    assert shared_bucket('test-shared') is not shared_bucket('test-other')
+
+
+def test_invalid_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate_per_minute=0)
+
+
+def make_limiter(tiers, clock):
+    return GcraLimiter('test', tiers, MemoryBackend(clock=clock), sleep=clock.sleep, clock=clock)
+
+
+def test_gcra_burst_then_interval():
+    clock = FakeClock()
+    limiter = make_limiter([Tier(60, 60, burst=2)], clock)
+
+    assert limiter.try_acquire() == 0.0
+    assert limiter.try_acquire() == 0.0
+    assert limiter.try_acquire() == pytest.approx(1.0)
+    assert limiter.acquire() == pytest.approx(1.0)
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_gcra_enforces_every_tier():
+    clock = FakeClock()
+    limiter = make_limiter([Tier(10, 60), Tier(15, 3600)], clock)
+
+    assert [limiter.try_acquire() for _ in range(10)] == [0.0] * 10
+    assert limiter.try_acquire() == pytest.approx(6.0)  # per-minute tier
+
+    clock.now += 60
+    assert [limiter.try_acquire() for _ in range(5)] == [0.0] * 5
+    assert limiter.try_acquire() == pytest.approx(16 * 240 - 3600 - 60)  # hourly tier
+
+
+def test_gcra_refuses_more_tokens_than_the_smallest_burst():
+    limiter = make_limiter([Tier(60, 60, burst=3)], FakeClock())
+
+    with pytest.raises(ValueError):
+        limiter.try_acquire(4)
+    with pytest.raises(ValueError):
+        GcraLimiter('test', [Tier(0, 60)])
+
+
+def test_observe_follows_the_windows_remaining_budget():
+    clock = FakeClock()
+    limiter = make_limiter([Tier(60, 60, burst=3), Tier(3000, 3600)], clock)
+    assert [limiter.try_acquire() for _ in range(3)] == [0.0] * 3
+    assert limiter.try_acquire() == pytest.approx(1.0)
+
+    # 50 requests left for the last 20 seconds: no need to wait
+    limiter.observe(RateLimitStatus(limit=60, remaining=50, reset=20))
+    assert limiter.try_acquire() == 0.0
+
+    # Window spent: wait for its reset
+    limiter.observe(RateLimitStatus(limit=60, remaining=0, reset=12))
+    assert limiter.try_acquire() == pytest.approx(12.0)
+
+
+def test_observe_adopts_the_apis_per_minute_limit():
+    limiter = make_limiter([Tier(60, 60, burst=3), Tier(3000, 3600)], FakeClock())
+    limiter.observe(RateLimitStatus(limit=120))
+
+    assert limiter.tiers == (Tier(120, 60, 3), Tier(3000, 3600))
+    assert limiter.stats()['server']['limit'] == 120
+
+
+def test_observed_limit_keeps_the_shared_key():
+    clock = FakeClock()
+    backend = MemoryBackend(clock=clock)
+    seen, unseen = (GcraLimiter('uw', [Tier(60, 60, burst=1)], backend, sleep=clock.sleep, clock=clock)
+                    for _ in range(2))
+    seen.observe(RateLimitStatus(limit=120))
+
+    assert seen.tiers[0].key('uw') == unseen.tiers[0].key('uw')
+    assert seen.try_acquire() == 0.0
+    assert unseen.try_acquire() > 0  # One budget, whether or not a process saw the header
+
+
+def test_stats_compare_waiting_with_fixed_pacing():
+    clock = FakeClock()
+    limiter = make_limiter([Tier(60, 60, burst=3)], clock)
+    for _ in range(3):
+        limiter.acquire()
+    # One request a second would have slept 0 + 1 + 2 seconds
+    assert limiter.stats()['idle_saved_seconds'] == pytest.approx(3.0)
+
+    limiter.observe(RateLimitStatus(remaining=0, reset=10))
+    assert limiter.acquire() == pytest.approx(10.0)
+    stats = limiter.stats()
+    assert stats['acquired'] == 4
+    assert stats['fixed_pacing_seconds'] == pytest.approx(6.0)
+    assert stats['idle_saved_seconds'] == pytest.approx(-4.0)
+
+
+def _take_tokens(path, attempts, admitted):
+    backend = FileBackend(path)
+    for _ in range(attempts):
+        if backend.admit('test', [Tier(5, 3600)], 1) == 0.0:
+            with admitted.get_lock():
+                admitted.value += 1
+
+
+def test_file_backend_is_one_budget_across_processes(tmp_path):
+    context = multiprocessing.get_context('spawn')
+    admitted = context.Value('i', 0)
+    workers = [context.Process(target=_take_tokens, args=(tmp_path / 'limits.json', 10, admitted))
+               for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert admitted.value == 5
+
+
+def test_file_backend_sync_sets_the_tiers_arrival_time(tmp_path):
+    clock = FakeClock()
+    tier = Tier(60, 60, burst=1)
+    backend = FileBackend(tmp_path / 'limits.json', clock=clock)
+
+    backend.sync('test', tier, 5.0)
+    assert backend.admit('test', [tier], 1) == pytest.approx(5.0)
+    backend.sync('test', tier, -1.0)
+    assert backend.admit('test', [tier], 1) == 0.0
+
+
+def test_backend_from_url(tmp_path):
+    assert isinstance(backend_from_url('memory'), MemoryBackend)
+    assert backend_from_url(f'file://{tmp_path}/limits.json').path == tmp_path / 'limits.json'
+    with pytest.raises(ValueError):
+        backend_from_url('zookeeper://localhost')
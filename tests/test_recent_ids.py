@@ -0,0 +1,83 @@
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from collectors.utils.recent_ids import RecentIdFilter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_filter(horizon=60, generations=4):
+    clock = Clock()
+    return RecentIdFilter(horizon, generations, clock=clock), clock
+
+
+def test_unseen_drops_known_ids_and_batch_repeats():
+    ids, _ = make_filter()
+    ids.add_many([1, 2])
+
+    fresh = ids.unseen([{'id': 2}, {'id': 3}, {'id': 3}, {'id': 4}], key=lambda row: row['id'])
+
+    assert fresh == [{'id': 3}, {'id': 4}]
+    assert 3 not in ids  # unseen never adds
+    assert ids.stats() == {'size': 2, 'checked': 4, 'dropped': 2, 'hit_rate': 0.5}
+
+
+def test_ids_expire_after_horizon():
+    ids, clock = make_filter(horizon=60, generations=4)
+    ids.add_many([1])
+
+    clock.now = 44.0  # 2 rotations of 15s: still remembered
+    ids.add_many([2])
+    assert 1 in ids
+
+    clock.now = 60.0  # 1 has aged through every generation
+    assert 1 not in ids
+    assert 2 in ids
+
+    clock.now = 500.0  # idle past the horizon: everything is forgotten
+    assert len(ids) == 0
+
+
+def test_warm_loads_ids_from_cursor():
+    ids, _ = make_filter()
+    conn = MagicMock()
+    cur = conn.cursor.return_value.__enter__.return_value
+    cur.__iter__.return_value = iter([(10,), (11,)])
+    since = datetime(2025, 5, 1, 14, tzinfo=timezone.utc)
+
+    assert ids.warm(conn, 'trading.darkpool_trades', since) == 2
+
+    assert ids.warmed
+    assert cur.execute.call_args.args == (
+        "SELECT tracking_id FROM trading.darkpool_trades WHERE executed_at >= %s", (since,)
+    )
+    assert ids.unseen([10, 11, 12]) == [12]
+
+
+def test_max_size_rotates_generations_early():
+    ids = RecentIdFilter(horizon=60, generations=4, clock=Clock(), max_size=8)
+
+    ids.add_many(range(10))  # generations of 2: 0-1 ... 8-9, only the newest 4 kept
+
+    assert len(ids) == 8
+    assert 1 not in ids and 2 in ids and 9 in ids
+    ids.add_many([9, 9])  # already held: no rotation
+    assert ids.stats()['early_rotations'] == 4
+    assert ids.stats()['max_size'] == 8
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        RecentIdFilter(horizon=0)
+    with pytest.raises(ValueError):
+        RecentIdFilter(generations=1)
+    with pytest.raises(ValueError):
+        RecentIdFilter(generations=4, max_size=3)
@@ -0,0 +1,107 @@
+import json
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from collectors.utils.records import (
+    DarkPoolTrade, FlowAlert, NewsHeadline, decode, decode_records, parse_timestamp, to_arrays
+)
+
+
+def raw_trade(**overrides):
+    trade = {
+        'tracking_id': 123, 'ticker': 'SPY', 'price': '512.34', 'size': 200,
+        'volume': '1000000', 'premium': '102468.0', 'executed_at': '2025-05-01T14:30:00.123Z',
+        'nbbo_ask': '512.35', 'nbbo_bid': '', 'nbbo_ask_quantity': 300, 'nbbo_bid_quantity': None,
+        'market_center': 'L', 'sale_cond_codes': None, 'ext_hour_sold_codes': None,
+        'trade_code': None, 'trade_settlement': 'regular_settlement', 'canceled': False,
+    }
+    trade.update(overrides)
+    return trade
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2025-05-01T14:30:00Z', datetime(2025, 5, 1, 14, 30, tzinfo=timezone.utc)),
+    ('2025-05-01T14:30:00.5Z', datetime(2025, 5, 1, 14, 30, 0, 500000, tzinfo=timezone.utc)),
+    ('2025-05-01T14:30:00.123456789Z', datetime(2025, 5, 1, 14, 30, 0, 123456, tzinfo=timezone.utc)),
+    ('2025-05-01T10:30:00-04:00', datetime(2025, 5, 1, 14, 30, tzinfo=timezone.utc)),
+    ('2025-05-01 14:30:00', datetime(2025, 5, 1, 14, 30, tzinfo=timezone.utc)),
+])
+def test_parse_timestamp(value, expected):
+    parsed = parse_timestamp(value)
+    assert parsed == expected
+    assert parsed.tzinfo is not None
+
+
+def test_decode_dark_pool_trades_from_bytes():
+    payload = json.dumps({'data': [raw_trade()]}).encode()
+
+    (trade,) = decode(payload, DarkPoolTrade)
+
+    assert trade.symbol == 'SPY'
+    assert trade.price == 512.34
+    assert trade.volume == 1000000
+    assert trade.executed_at == datetime(2025, 5, 1, 14, 30, 0, 123000, tzinfo=timezone.utc)
+    assert trade.nbbo_bid is None
+    assert trade.nbbo_bid_quantity is None
+    assert not hasattr(trade, '__dict__')
+
+
+def test_as_row_appends_collection_time():
+    collected = datetime(2025, 5, 1, 15, tzinfo=timezone.utc)
+    trade = DarkPoolTrade.from_api(raw_trade())
+
+    row = trade.as_row(collected)
+
+    assert row[:2] == (123, 'SPY')
+    assert row[-1] == collected
+    assert len(row) == len(DarkPoolTrade.__slots__) + 1
+
+
+def test_malformed_records_are_skipped_and_counted():
+    batch = decode_records([raw_trade(), raw_trade(price=None), raw_trade(executed_at='yesterday')], DarkPoolTrade)
+
+    assert len(batch) == 1
+    assert batch.skipped == 2
+    assert batch.received == 3
+
+
+def test_missing_required_keys_are_rejected():
+    trade = raw_trade()
+    del trade['ticker']
+    batch = decode_records([trade, raw_trade(tracking_id=None), raw_trade()], DarkPoolTrade)
+
+    assert len(batch) == 1
+    assert batch.skipped == 2
+    with pytest.raises(KeyError):
+        DarkPoolTrade.from_api(trade)
+    with pytest.raises(KeyError):
+        NewsHeadline.from_api({'created_at': '2025-05-01T14:30:00Z'})
+    with pytest.raises(ValueError):
+        FlowAlert.from_api({'ticker': None, 'created_at': '2025-05-01T14:30:00Z'})
+
+
+def test_news_defaults_and_flow_alert_dates():
+    headline = NewsHeadline.from_api({'headline': 'Fed holds', 'created_at': '2025-05-01T14:30:00Z'})
+    alert = FlowAlert.from_api({'ticker': 'SPY', 'created_at': '2025-05-01T14:30:00Z',
+                                'expiry': '2025-05-16', 'total_premium': '250000'})
+
+    assert headline.tags == [] and headline.meta == {} and headline.is_major is False
+    assert alert.expiry == date(2025, 5, 16)
+    assert alert.total_premium == 250000.0
+    assert alert.strike is None
+
+
+def test_to_arrays_is_columnar():
+    start = datetime(2025, 5, 1, 14, 30, tzinfo=timezone.utc)
+    trades = [
+        DarkPoolTrade.from_api(raw_trade(tracking_id=i, executed_at=(start + timedelta(seconds=i)).isoformat()))
+        for i in range(3)
+    ]
+
+    arrays = to_arrays(trades)
+
+    assert list(arrays) == list(DarkPoolTrade.__slots__)
+    assert arrays['tracking_id'] == [0, 1, 2]
+    assert to_arrays(trades, ['symbol']) == {'symbol': ['SPY'] * 3}
+    assert to_arrays([], ['symbol']) == {'symbol': []}
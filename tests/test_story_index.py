@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from collectors.utils.story_index import StoryIndex, minhash, shingles, similarity
+
+T0 = datetime(2025, 5, 1, 20, 0, tzinfo=timezone.utc)
+
+
+def test_rewrites_share_a_story():
+    stories = StoryIndex()
+
+    first = stories.assign('Apple beats Q2 estimates as iPhone sales jump', T0, ['AAPL'])
+    again = stories.assign('Apple Beats Q2 Estimates As iPhone Sales Jump 5%', T0 + timedelta(minutes=3), ['AAPL'])
+    other = stories.assign('Fed holds rates steady, signals two cuts this year', T0 + timedelta(minutes=5))
+
+    assert again == first
+    assert other != first
+    assert stories.stats()['matched'] == 1
+
+
+def test_ticker_disjoint_headlines_are_separate_stories():
+    stories = StoryIndex()
+
+    spy = stories.assign('SPY options volume surges ahead of CPI report', T0, ['SPY'])
+    qqq = stories.assign('QQQ options volume surges ahead of CPI report', T0, ['QQQ'])
+
+    assert spy != qqq
+
+
+def test_stories_end_with_the_window():
+    stories = StoryIndex(window=timedelta(hours=24))
+    headline = 'Tesla recalls 2 million vehicles over Autopilot'
+
+    first = stories.assign(headline, T0, ['TSLA'])
+    assert stories.assign(headline, T0 + timedelta(hours=23), ['TSLA']) == first
+    assert stories.assign(headline, T0 + timedelta(hours=49), ['TSLA']) != first
+    # Slices older than a window before the newest headline are dropped
+    assert stories.stats()['slices'] <= 6
+
+
+def test_lookups_compare_only_band_candidates():
+    stories = StoryIndex()
+    for i in range(500):
+        stories.assign(f'Company{i} announces product{i} launch in region{i}', T0 + timedelta(seconds=i))
+
+    before = stories.stats()
+
+    stories.assign('Company7 announces product7 launch in region7 today', T0 + timedelta(minutes=10))
+
+    after = stories.stats()
+    assert after['matched'] == before['matched'] + 1
+    assert after['compared'] - before['compared'] < 50
+
+
+def test_refetched_headlines_are_not_indexed_again():
+    stories = StoryIndex()
+    headlines = [(f'Company{i} announces product{i} launch in region{i}', T0 + timedelta(minutes=i))
+                 for i in range(50)]
+    ids = [stories.assign(headline, created_at) for headline, created_at in headlines]
+    compared = stories.stats()['compared']
+
+    for _ in range(20):
+        assert [stories.assign(headline, created_at) for headline, created_at in headlines] == ids
+
+    stats = stories.stats()
+    assert len(stories) == 50
+    assert stats['repeated'] == 1000
+    assert stats['compared'] == compared
+
+
+def test_similarity_estimates_jaccard():
+    left = shingles('Nvidia shares hit record high on AI chip demand')
+    right = shingles('Nvidia shares hit a record on strong AI chip demand')
+    jaccard = len(left & right) / len(left | right)
+
+    assert shingles('Earnings beats') == {'earning', 'beat'}
+    assert abs(similarity(minhash(left), minhash(right)) - jaccard) < 0.2
+
+
+def test_warm_keeps_stored_story_ids():
+    cur = MagicMock()
+    cur.__iter__.return_value = iter([('Apple beats Q2 estimates as iPhone sales jump', T0, ['AAPL'], 42)])
+    conn = MagicMock()
+    conn.cursor.return_value.__enter__.return_value = cur
+    stories = StoryIndex()
+
+    assert stories.warm(conn, T0 - timedelta(hours=24)) == 1
+    assert stories.warmed
+    assert stories.assign('Apple beats Q2 estimates, iPhone sales jump', T0 + timedelta(hours=1), ['AAPL']) == 42
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        StoryIndex(window=timedelta(0))
+    with pytest.raises(ValueError):
+        StoryIndex(threshold=0)
+    with pytest.raises(ValueError):
+        StoryIndex(bands=7)
@@ -0,0 +1,58 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from collectors.supervisor import CollectorJob, CollectorSupervisor
+
+
+def run_for(supervisor, seconds):
+    async def scenario():
+        task = asyncio.ensure_future(supervisor.run())
+        await asyncio.sleep(seconds)
+        supervisor.stop()
+        await task
+    asyncio.run(scenario())
+
+
+@patch('collectors.supervisor.log_heartbeat')
+def test_jobs_poll_on_their_own_cadence(_heartbeat):
+    fast = CollectorJob('fast', poll=lambda: None, open_interval=0.01, closed_interval=0.01)
+    slow = CollectorJob('slow', poll=lambda: None, open_interval=10, closed_interval=10)
+    supervisor = CollectorSupervisor([fast, slow], market_open=lambda: True)
+
+    run_for(supervisor, 0.2)
+
+    assert supervisor.poll_counts['fast'] > 3
+    assert supervisor.poll_counts['slow'] == 1
+
+
+@patch('collectors.supervisor.log_heartbeat')
+def test_market_hours_only_job_skips_when_closed(_heartbeat):
+    calls = []
+    job = CollectorJob('darkpool', poll=lambda: calls.append(1), open_interval=0.01,
+                       closed_interval=0.01, market_hours_only=True)
+    supervisor = CollectorSupervisor([job], market_open=lambda: False)
+
+    run_for(supervisor, 0.1)
+
+    assert calls == []
+
+
+@patch('collectors.supervisor.log_error')
+@patch('collectors.supervisor.log_heartbeat')
+def test_failing_poll_does_not_stop_the_job(_heartbeat, log_error):
+    def boom():
+        raise RuntimeError('api down')
+
+    job = CollectorJob('news', poll=boom, open_interval=0.01, closed_interval=0.01)
+    supervisor = CollectorSupervisor([job], market_open=lambda: True)
+
+    run_for(supervisor, 0.1)
+
+    assert log_error.call_count > 1
+
+
+def test_supervisor_requires_jobs():
+    with pytest.raises(ValueError):
+        CollectorSupervisor([])
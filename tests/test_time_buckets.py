@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from collectors.utils.time_buckets import TimeBuckets, as_utc
+
+NOW = datetime(2025, 5, 3, 14, 30, tzinfo=timezone.utc)
+
+
+def make_buckets(width=timedelta(days=1), settle=timedelta(minutes=15)):
+    return TimeBuckets(width, settle, clock=lambda: NOW)
+
+
+def test_split_aligns_to_utc_days():
+    buckets = make_buckets()
+    start = datetime(2025, 5, 1, 9, 45, tzinfo=timezone(timedelta(hours=-4)))  # 13:45 UTC
+
+    assert buckets.split(start, NOW) == [
+        (datetime(2025, 5, 1, tzinfo=timezone.utc), datetime(2025, 5, 2, tzinfo=timezone.utc)),
+        (datetime(2025, 5, 2, tzinfo=timezone.utc), datetime(2025, 5, 3, tzinfo=timezone.utc)),
+        (datetime(2025, 5, 3, tzinfo=timezone.utc), datetime(2025, 5, 4, tzinfo=timezone.utc)),
+    ]
+    assert buckets.split(NOW, NOW) == []
+
+
+def test_floor_handles_sub_day_widths_and_naive_times():
+    buckets = make_buckets(width=timedelta(hours=4))
+
+    assert buckets.floor(datetime(2025, 5, 3, 14, 30)) == datetime(2025, 5, 3, 12, tzinfo=timezone.utc)
+    assert as_utc(datetime(2025, 5, 3, 14, 30)).tzinfo is timezone.utc
+
+
+def test_open_windows_get_no_key():
+    buckets = make_buckets()
+
+    assert buckets.key('news', datetime(2025, 5, 3, tzinfo=timezone.utc), datetime(2025, 5, 4, tzinfo=timezone.utc)) is None
+    # Ended, but still inside the settle period
+    assert buckets.key('news', NOW - timedelta(hours=1), NOW - timedelta(minutes=5)) is None
+    assert buckets.is_closed(NOW - timedelta(minutes=15))
+
+
+def test_closed_window_keys_are_canonical():
+    buckets = make_buckets()
+    start = datetime(2025, 5, 1, tzinfo=timezone.utc)
+    end = datetime(2025, 5, 2, tzinfo=timezone.utc)
+    eastern = timezone(timedelta(hours=-4))
+
+    key = buckets.key('news', start, end, {'limit': 100, 'page': 0})
+
+    assert key.startswith('news:')
+    assert key == buckets.key('news', start.astimezone(eastern), end.astimezone(eastern), {'page': 0, 'limit': 100})
+    assert key != buckets.key('news', start, end, {'limit': 100, 'page': 1})
+    assert key != buckets.key('darkpool', start, end, {'limit': 100, 'page': 0})
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        TimeBuckets(timedelta(0))
+    with pytest.raises(ValueError):
+        TimeBuckets(timedelta(days=1), settle=timedelta(seconds=-1))
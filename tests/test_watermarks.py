@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta, timezone
+
+from collectors.utils.watermarks import WatermarkStore, batch_watermarks, watermark_store
+
+
+class FakeCursor:
+    """Minimal psycopg2 cursor stand-in backed by a dict of watermark rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+        self._result = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        sql = ' '.join(sql.split())
+        self.statements.append(sql)
+        if sql.startswith('SELECT watermark'):
+            value = self.rows.get(params)
+            self._result = (value,) if value is not None else None
+        elif sql.startswith('INSERT INTO trading.collector_watermarks'):
+            collector, key, value = params
+            current = self.rows.get((collector, key))
+            self.rows[(collector, key)] = value if current is None else max(current, value)
+
+    def fetchone(self):
+        return self._result
+
+
+class FakeConnection:
+    def __init__(self, rows=None):
+        self.cur = FakeCursor(rows if rows is not None else {})
+        self.commits = 0
+
+    def cursor(self):
+        return self.cur
+
+    def commit(self):
+        self.commits += 1
+
+
+T0 = datetime(2025, 5, 1, 14, 30, tzinfo=timezone.utc)
+
+
+def test_get_reads_row_then_serves_from_cache():
+    conn = FakeConnection({('darkpool', 'SPY'): T0})
+    store = WatermarkStore('darkpool')
+
+    assert store.get(conn, 'SPY') == T0
+    assert store.get(conn, 'SPY') == T0
+    assert len(conn.cur.statements) == 1
+
+
+def test_get_seeds_row_from_fallback_once():
+    conn = FakeConnection()
+    store = WatermarkStore('darkpool')
+    calls = []
+
+    def fallback():
+        calls.append(1)
+        return T0
+
+    assert store.get(conn, 'QQQ', fallback=fallback) == T0
+    assert conn.cur.rows[('darkpool', 'QQQ')] == T0
+    assert conn.commits == 1
+
+    # A fresh store (new process) finds the seeded row without the fallback
+    assert WatermarkStore('darkpool').get(conn, 'QQQ', fallback=fallback) == T0
+    assert len(calls) == 1
+
+
+def test_get_without_data_returns_none():
+    store = WatermarkStore('news')
+    assert store.get(FakeConnection(), 'all', fallback=lambda: None) is None
+    assert store.cached('all') is None
+
+
+def test_advance_only_moves_forward_and_leaves_commit_to_caller():
+    conn = FakeConnection()
+    store = WatermarkStore('darkpool')
+
+    store.advance(conn, 'SPY', T0)
+    store.advance(conn, 'SPY', T0 - timedelta(minutes=5))
+
+    assert conn.cur.rows[('darkpool', 'SPY')] == T0
+    assert conn.commits == 0
+    assert store.cached('SPY') is None
+
+    store.remember('SPY', T0)
+    store.remember('SPY', T0 - timedelta(minutes=5))
+    assert store.cached('SPY') == T0
+
+
+def test_batch_watermarks_takes_newest_per_key():
+    rows = [
+        ('SPY', T0),
+        ('QQQ', T0 + timedelta(seconds=1)),
+        ('SPY', T0 + timedelta(seconds=2)),
+        ('SPY', None),
+    ]
+    assert batch_watermarks(rows, 0, 1) == {
+        'SPY': T0 + timedelta(seconds=2),
+        'QQQ': T0 + timedelta(seconds=1),
+    }
+
+
+def test_watermark_store_is_shared_per_collector():
+    assert watermark_store('darkpool') is watermark_store('darkpool')
+    assert watermark_store('darkpool') is not watermark_store('news')
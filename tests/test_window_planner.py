@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from collectors.utils.records import RecordBatch
+from collectors.utils.window_planner import WindowPlanner
+
+T0 = datetime(2025, 5, 1, 14, 0, tzinfo=timezone.utc)
+
+
+def make_fetch(trade_times, limit):
+    """Fake capped endpoint: newest trades first, at most ``limit`` rows."""
+    def fetch(start, end):
+        rows = sorted((t for t in trade_times if start <= t < end), reverse=True)
+        return rows[:limit]
+    return fetch
+
+
+def test_saturated_window_is_bisected_until_complete():
+    trades = [T0 + timedelta(seconds=i) for i in range(0, 300, 1)]  # 300 trades in 5 minutes
+    planner = WindowPlanner(make_fetch(trades, limit=100), limit=100, initial_window=timedelta(minutes=5))
+
+    windows = list(planner.walk(T0, T0 + timedelta(minutes=5)))
+
+    captured = sorted(t for w in windows for t in w.rows)
+    assert captured == trades
+    assert not any(w.truncated for w in windows)
+    assert all(len(w.rows) < 100 for w in windows)
+    assert planner.bisections > 0
+
+
+def test_full_page_with_dropped_rows_is_still_bisected():
+    trades = [T0 + timedelta(seconds=i) for i in range(0, 300, 1)]
+    capped = make_fetch(trades, limit=100)
+
+    def fetch(start, end):
+        rows = capped(start, end)
+        page = RecordBatch(rows[1:])  # One malformed row dropped by decoding
+        page.skipped = 1 if rows else 0
+        return page
+
+    planner = WindowPlanner(fetch, limit=100, initial_window=timedelta(minutes=5))
+    windows = list(planner.walk(T0, T0 + timedelta(minutes=5)))
+
+    assert planner.bisections > 0
+    assert all(len(w.rows) < 99 for w in windows)
+
+
+def test_sparse_windows_grow_to_save_calls():
+    trades = [T0 + timedelta(hours=h) for h in range(24)]  # one trade an hour
+    planner = WindowPlanner(make_fetch(trades, limit=500), limit=500,
+                            initial_window=timedelta(minutes=5), max_window=timedelta(hours=6))
+
+    windows = list(planner.walk(T0, T0 + timedelta(hours=24)))
+
+    assert sorted(t for w in windows for t in w.rows) == trades
+    # Fixed 5-minute windows would need 288 calls
+    assert planner.calls < 20
+    assert windows[0].end - windows[0].start == timedelta(minutes=5)
+    assert max(w.end - w.start for w in windows) == timedelta(hours=6)
+
+
+def test_windows_tile_the_range_without_gaps():
+    trades = [T0 + timedelta(seconds=7 * i) for i in range(500)]
+    planner = WindowPlanner(make_fetch(trades, limit=50), limit=50)
+    end = T0 + timedelta(hours=1)
+
+    windows = list(planner.walk(T0, end))
+
+    assert windows[0].start == T0
+    assert windows[-1].end == end
+    assert all(a.end == b.start for a, b in zip(windows, windows[1:]))
+
+
+def test_dense_burst_at_min_window_is_flagged_truncated():
+    trades = [T0] * 20
+    planner = WindowPlanner(make_fetch(trades, limit=10), limit=10, min_window=timedelta(seconds=1))
+
+    windows = list(planner.walk(T0, T0 + timedelta(seconds=4)))
+
+    assert windows[0].truncated
+    assert windows[0].end - windows[0].start == timedelta(seconds=1)
+
+
+def test_limit_must_be_positive():
+    with pytest.raises(ValueError):
+        WindowPlanner(lambda s, e: [], limit=0)